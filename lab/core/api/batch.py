@@ -1,12 +1,14 @@
-from iexfinance.stocks import Stock, get_historical_data
-from datetime import datetime, time, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import colored
 from colored import stylize
 import requests
+import asyncio
 import sys
 import json
 import os
+from .client import iex_client
+from ..functions import chunks
 load_dotenv()
 
 
@@ -25,20 +27,12 @@ def companyBatchRequest(batch, sandbox=False):
     -------
     dict object of company info for 100 tickers
     """
-    domain = 'cloud.iexapis.com'
-    key = os.environ.get("IEX_TOKEN")
-    if (sandbox):
-        domain = 'sandbox.iexapis.com'
-        key = os.environ.get("IEX_SANDBOX_TOKEN")
     try:
-        batch = ",".join(batch)  # Convert to comma-separated string
-        url = 'https://{}/stable/stock/market/batch?symbols={}&types=quote,company&token={}'.format(
-            domain,
-            batch,
-            key
-        )
-        batch_request = requests.get(url).json()
-    except:
+        batch_request = iex_client(sandbox).get('stock/market/batch', {
+            'symbols': ",".join(batch),  # Convert to comma-separated string
+            'types': 'quote,company',
+        })
+    except (requests.exceptions.RequestException, ValueError):
         #print("Unexpected error:", sys.exc_info()[0])
         return {}
 
@@ -47,7 +41,7 @@ def companyBatchRequest(batch, sandbox=False):
 
 def batchPrice(batch, sandbox=False):
     """
-    Fetches company info for a batch of tickers. Max 100 tickers
+    Fetches only the latest price of a batch of tickers. Max 100 tickers
 
     Parameters
     ----------
@@ -58,22 +52,15 @@ def batchPrice(batch, sandbox=False):
 
     Returns
     -------
-    dict object of company info for 100 tickers
+    dict object of {ticker: {'quote': {'latestPrice': price}}} for 100 tickers
     """
-    domain = 'cloud.iexapis.com'
-    key = os.environ.get("IEX_TOKEN")
-    if (sandbox):
-        domain = 'sandbox.iexapis.com'
-        key = os.environ.get("IEX_SANDBOX_TOKEN")
     try:
-        batch = ",".join(batch)  # Convert to comma-separated string
-        url = 'https://{}/stable/stock/market/batch?symbols={}&types=quote&filter=latestPrice&token={}'.format(
-            domain,
-            batch,
-            key
-        )
-        batch_request = requests.get(url).json()
-    except:
+        batch_request = iex_client(sandbox).get('stock/market/batch', {
+            'symbols': ",".join(batch),  # Convert to comma-separated string
+            'types': 'quote',
+            'filter': 'latestPrice',
+        })
+    except (requests.exceptions.RequestException, ValueError):
         #print("Unexpected error:", sys.exc_info()[0])
         return {}
 
@@ -95,20 +82,12 @@ def batchQuote(batch, sandbox=False):
     -------
     dict object of company info for 100 tickers
     """
-    domain = 'cloud.iexapis.com'
-    key = os.environ.get("IEX_TOKEN")
-    if (sandbox):
-        domain = 'sandbox.iexapis.com'
-        key = os.environ.get("IEX_SANDBOX_TOKEN")
     try:
-        batch = ",".join(batch)  # Convert to comma-separated string
-        url = 'https://{}/stable/stock/market/batch?symbols={}&types=quote&token={}'.format(
-            domain,
-            batch,
-            key
-        )
-        batch_request = requests.get(url).json()
-    except:
+        batch_request = iex_client(sandbox).get('stock/market/batch', {
+            'symbols': ",".join(batch),  # Convert to comma-separated string
+            'types': 'quote',
+        })
+    except (requests.exceptions.RequestException, ValueError):
         #print("Unexpected error:", sys.exc_info()[0])
         return {}
 
@@ -130,21 +109,64 @@ def quoteStatsBatchRequest(batch, sandbox=False):
     -------
     dict object of quotes and key stats for 100 tickers
     """
-    domain = 'cloud.iexapis.com'
-    key = os.environ.get("IEX_TOKEN")
-    if (sandbox):
-        domain = 'sandbox.iexapis.com'
-        key = os.environ.get("IEX_SANDBOX_TOKEN")    
-    batch = ",".join(batch)  # Convert to comma-separated string
     try:
-        url = 'https://{}/stable/stock/market/batch?symbols={}&types=quote,stats&token={}'.format(
-            domain,
-            batch,
-            key
-        )
-        batch_request = requests.get(url).json()
-    except:
-        print(stylize("Unexpected error: "+sys.exc_info()[0], colored.fg("red")))
+        batch_request = iex_client(sandbox).get('stock/market/batch', {
+            'symbols': ",".join(batch),  # Convert to comma-separated string
+            'types': 'quote,stats',
+        })
+    except (requests.exceptions.RequestException, ValueError):
+        print(stylize("Unexpected error: "+str(sys.exc_info()[0]), colored.fg("red")))
         return {}
 
     return batch_request
+
+
+async def fetch_batches(request, tickers, size=100, sandbox=False):
+    """
+    Sends every batch request of a universe at once and yields each response as soon as it arrives.
+    Concurrency and rate limiting come from the shared IEX client, (see client.py).
+
+    Parameters
+    ----------
+    request     :function
+                 any batch request function in this module, (ex: quoteStatsBatchRequest)
+    tickers     :list
+    size        :int
+                 tickers per batch, max 100
+    sandbox     :bool
+
+    Returns
+    -------
+    async generator of batch responses, in the order they arrive
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=iex_client(sandbox).concurrency)
+    try:
+        pending = [loop.run_in_executor(executor, request, batch, sandbox) for batch in chunks(list(tickers), size)]
+        for response in asyncio.as_completed(pending):
+            yield await response
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_batches(request, tickers, size=100, sandbox=False):
+    """
+    Synchronous wrapper of fetch_batches(), for scanners that filter each batch with the Django ORM.
+    The event loop only runs between batches, so each batch is handled outside of it while the rest keep downloading.
+
+    Returns
+    -------
+    generator of batch responses, in the order they arrive
+    """
+    loop = asyncio.new_event_loop()
+    # Querysets are evaluated here, Django refuses to query from inside the event loop
+    batches = fetch_batches(request, list(tickers), size, sandbox)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(batches.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(batches.aclose())
+        loop.close()
@@ -4,23 +4,14 @@ import requests
 import sys
 import json
 import os
+from .client import iex_client
 load_dotenv()
 
 
 def get3mTreasury(sandbox=False):
-    domain = 'cloud.iexapis.com'
-    key = os.environ.get("IEX_TOKEN")
-    if (sandbox):
-        domain = 'sandbox.iexapis.com'
-        key = os.environ.get("IEX_SANDBOX_TOKEN")
-
     try:
-        url = 'https://{}/stable/time-series/treasury/DGS3MO?token={}'.format(
-            domain,
-            key,
-        )
-        treasury = requests.get(url).json()
-    except:
+        treasury = iex_client(sandbox).get('time-series/treasury/DGS3MO', cache='treasury')
+    except (requests.exceptions.RequestException, ValueError):
         #print("Unexpected error:", sys.exc_info()[0])
         return None
 
@@ -0,0 +1,294 @@
+from dotenv import load_dotenv
+import threading
+import atexit
+import requests
+import hashlib
+import redis
+import time
+import json
+import os
+from ...redisdb.connection import rdb_connection
+load_dotenv()
+
+# Request level response cache for reference data that is refetched many times a day, (price targets, key stats,
+# treasury yields, option chains, the symbol list). Each endpoint has a TTL, and for a while after it a stale response
+# is still served while a background thread revalidates it, (with If-None-Match / If-Modified-Since when the server
+# sent an ETag or Last-Modified). A failed refresh falls back to the stale response.
+#
+# HTTP_CACHE        disk (default), redis or off
+# HTTP_CACHE_DIR    directory of the disk backend
+# HTTP_CACHE_MODE   live (default), record, (also writes every response to HTTP_FIXTURES), or replay, (answers every
+#                   request from HTTP_FIXTURES and never touches the network)
+# HTTP_FIXTURES     directory of recorded responses
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# endpoint: (ttl, stale), in seconds
+ENDPOINTS = {
+    'price-target': (DAY, DAY),
+    'stats': (DAY, DAY),
+    'ref-data': (DAY, 7 * DAY),
+    'treasury': (HOUR, DAY),
+    'chains': (5 * MINUTE, 5 * MINUTE),
+    'quote': (5, 25),
+}
+
+# Query parameters that never go into a cache key or a fixture
+SECRETS = ['token', 'apikey']
+
+# Seconds a finishing process waits for background revalidations, (most commands are one shot run.py calls)
+REVALIDATE_TIMEOUT = 10
+
+
+def request_key(endpoint, url, params=None):
+    """
+    Cache key of a request: sha1 of the endpoint, url and query, (secrets removed, so keys are shared across tokens).
+    """
+    query = sorted((key, str(value)) for key, value in (params if params else {}).items() if key not in SECRETS)
+    digest = hashlib.sha1(json.dumps([endpoint, url, query]).encode())
+
+    return digest.hexdigest()
+
+
+def public_params(params):
+    return {key: value for key, value in (params if params else {}).items() if key not in SECRETS}
+
+
+class DiskBackend:
+    """
+    One json file per cached response, under a directory per endpoint.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory if directory else os.environ.get('HTTP_CACHE_DIR', 'lab/core/storage/http/')
+
+    def path(self, endpoint, key):
+        return os.path.join(self.directory, str(endpoint), '{}.json'.format(key))
+
+    def load(self, endpoint, key):
+        try:
+            with open(self.path(endpoint, key)) as entryfile:
+                return json.load(entryfile)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, endpoint, key, entry, expires):
+        path = self.path(endpoint, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written aside and swapped in, so a concurrent reader never sees half a file
+        with open(path + '.tmp', 'w') as entryfile:
+            json.dump(entry, entryfile)
+        os.replace(path + '.tmp', path)
+
+
+class RedisBackend:
+    """
+    One string key per cached response, expiring once it is too old to be served stale.
+    """
+
+    def __init__(self, connection=None):
+        self.r = connection if connection else rdb_connection()
+
+    def load(self, endpoint, key):
+        try:
+            entry = self.r.get('http-{}-{}'.format(endpoint, key))
+        except redis.exceptions.ConnectionError:
+            return None
+
+        return json.loads(entry) if (entry) else None
+
+    def save(self, endpoint, key, entry, expires):
+        try:
+            self.r.set('http-{}-{}'.format(endpoint, key), json.dumps(entry), ex=max(int(expires), 1))
+        except redis.exceptions.ConnectionError:
+            pass
+
+
+class NoBackend:
+    def load(self, endpoint, key):
+        return None
+
+    def save(self, endpoint, key, entry, expires):
+        pass
+
+
+class ResponseCache:
+    """
+    Parameters
+    ----------
+    backend     :DiskBackend|RedisBackend|NoBackend
+                 defaults to HTTP_CACHE
+    mode        :str
+                 live, record or replay, defaults to HTTP_CACHE_MODE
+    fixtures    :str
+                 directory of recorded responses, defaults to HTTP_FIXTURES
+    """
+
+    def __init__(self, backend=None, mode=None, fixtures=None):
+        if (backend is None):
+            backend = {
+                'disk': DiskBackend,
+                'redis': RedisBackend,
+            }.get(os.environ.get('HTTP_CACHE', 'disk'), NoBackend)()
+        self.backend = backend
+        self.mode = mode if mode else os.environ.get('HTTP_CACHE_MODE', 'live')
+        self.fixtures = DiskBackend(fixtures if fixtures else os.environ.get('HTTP_FIXTURES', 'lab/core/storage/fixtures/'))
+        self.refreshing = set()
+        self.threads = []
+        self.lock = threading.Lock()
+        atexit.register(self.wait)
+
+    def request(self, endpoint, url, params=None, headers=None, fetch=None, parse='json'):
+        """
+        GET a url through the cache.
+
+        Parameters
+        ----------
+        endpoint    :str
+                     key of ENDPOINTS, anything else is never cached, (but is still recorded and replayed)
+        url         :str
+        params      :dict
+        headers     :dict
+        fetch       :function
+                     fetch(url, params=, headers=) returning a requests.Response, defaults to requests.get
+        parse       :str
+                     json or text
+
+        Returns
+        -------
+        parsed response body
+
+        Raises
+        ------
+        requests.exceptions.RequestException, ValueError
+            on a failed request with nothing cached, a missing fixture in replay mode, or a body that isn't json
+        """
+        fetch = fetch if (fetch) else requests.get
+        key = request_key(endpoint, url, params)
+
+        if (self.mode == 'replay'):
+            entry = self.fixtures.load(endpoint, key)
+            if (not entry):
+                raise requests.exceptions.ConnectionError('No recorded response for {} {}'.format(url, public_params(params)))
+            return self.decode(entry, parse)
+
+        if (endpoint not in ENDPOINTS):
+            return self.decode(self.refresh(endpoint, key, url, params, headers, fetch), parse)
+
+        ttl, stale = ENDPOINTS[endpoint]
+        entry = self.backend.load(endpoint, key)
+        age = time.time() - entry['stored'] if (entry) else None
+
+        if (entry and age < ttl):
+            return self.decode(self.served(endpoint, key, entry), parse)
+
+        if (entry and age < ttl + stale):
+            self.revalidate(endpoint, key, url, params, headers, fetch, entry)
+            return self.decode(self.served(endpoint, key, entry), parse)
+
+        try:
+            entry = self.refresh(endpoint, key, url, params, headers, fetch, entry)
+        except requests.exceptions.RequestException:
+            if (entry):
+                return self.decode(self.served(endpoint, key, entry), parse)
+            raise
+
+        return self.decode(entry, parse)
+
+    def refresh(self, endpoint, key, url, params, headers, fetch, entry=None):
+        """
+        Fetches a response, conditionally if the cached one has validators, and stores it.
+        """
+        headers = dict(headers if headers else {})
+        if (entry and entry.get('etag')):
+            headers['If-None-Match'] = entry['etag']
+        if (entry and entry.get('lastModified')):
+            headers['If-Modified-Since'] = entry['lastModified']
+
+        response = fetch(url, params=params, headers=headers)
+        if (entry and response.status_code == 304):
+            entry['stored'] = time.time()
+        else:
+            response.raise_for_status()
+            entry = {
+                'url': url,
+                'params': public_params(params),
+                'stored': time.time(),
+                'etag': response.headers.get('ETag'),
+                'lastModified': response.headers.get('Last-Modified'),
+                'body': response.text,
+            }
+
+        if (endpoint in ENDPOINTS):
+            self.backend.save(endpoint, key, entry, sum(ENDPOINTS[endpoint]))
+        if (self.mode == 'record'):
+            self.fixtures.save(endpoint, key, entry, 0)
+
+        return entry
+
+    def served(self, endpoint, key, entry):
+        """
+        A response answered from the cache, recorded as a fixture in record mode like a fetched one, (see refresh()).
+        """
+        if (self.mode == 'record'):
+            self.fixtures.save(endpoint, key, entry, 0)
+
+        return entry
+
+    def revalidate(self, endpoint, key, url, params, headers, fetch, entry):
+        """
+        Refreshes a stale response on a background thread, at most once at a time per request.
+        The process waits for outstanding refreshes before it exits, (see wait()).
+        """
+        with self.lock:
+            if (key in self.refreshing):
+                return
+            self.refreshing.add(key)
+
+        def work():
+            try:
+                self.refresh(endpoint, key, url, params, headers, fetch, entry)
+            except (requests.exceptions.RequestException, ValueError):
+                pass
+            finally:
+                with self.lock:
+                    self.refreshing.discard(key)
+
+        thread = threading.Thread(target=work, daemon=True)
+        with self.lock:
+            self.threads = [running for running in self.threads if (running.is_alive())] + [thread]
+        thread.start()
+
+    def wait(self, timeout=REVALIDATE_TIMEOUT):
+        """
+        Joins outstanding revalidations, giving up on all of them after `timeout` seconds.
+        """
+        deadline = time.time() + timeout
+        with self.lock:
+            threads = list(self.threads)
+        for thread in threads:
+            thread.join(max(deadline - time.time(), 0))
+
+    def decode(self, entry, parse):
+        if (parse == 'json'):
+            return json.loads(entry['body'])
+
+        return entry['body']
+
+
+shared_cache = None
+shared_lock = threading.Lock()
+
+
+def response_cache():
+    """
+    Shared ResponseCache, configured from the environment.
+    """
+    global shared_cache
+    with shared_lock:
+        if (shared_cache is None):
+            shared_cache = ResponseCache()
+
+        return shared_cache
@@ -0,0 +1,184 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from dotenv import load_dotenv
+import numpy as np
+import time
+import os
+from .options import getOptionChainTD
+from .cache import ENDPOINTS
+load_dotenv()
+
+# Option chains of many underlyings as one flat table. TD Ameritrade nests every contract under
+# callExpDateMap/putExpDateMap -> 'YYYY-MM-DD:dte' -> strike -> [contract]. The nesting is walked once per chain,
+# then every contract is a row of plain NumPy columns, so filters across the whole universe are array expressions.
+# Normalized tables are kept on disk, (.npz), for as long as the raw chains are cached, (see cache.py).
+# A contract missing its daysToExpiration gets the dte of its expiration key, one missing its expirationDate gets -1,
+# (int columns have no nan).
+
+COLUMNS = {
+    'underlying': 'U12',
+    'expiry': 'datetime64[D]',
+    'expiration': 'int64',
+    'dte': 'int64',
+    'strike': 'float64',
+    'side': 'U1',
+    'bid': 'float64',
+    'ask': 'float64',
+    'last': 'float64',
+    'mark': 'float64',
+    'volume': 'float64',
+    'openInterest': 'float64',
+    'volatility': 'float64',
+}
+
+# column: TD contract field
+CONTRACT_FIELDS = {
+    'expiration': 'expirationDate',
+    'dte': 'daysToExpiration',
+    'strike': 'strikePrice',
+    'bid': 'bid',
+    'ask': 'ask',
+    'last': 'last',
+    'mark': 'mark',
+    'volume': 'totalVolume',
+    'openInterest': 'openInterest',
+    'volatility': 'volatility',
+}
+
+
+def empty_table():
+    return {column: np.zeros(0, dtype=dtype) for column, dtype in COLUMNS.items()}
+
+
+def normalize_chain(chain, ticker=None):
+    """
+    Flattens a TD Ameritrade chain into columns.
+
+    Parameters
+    ----------
+    chain       :dict
+                 as returned by getOptionChainTD()
+    ticker      :str
+                 defaults to the chain's symbol
+
+    Returns
+    -------
+    dict of np.ndarray
+        one row per contract, (see COLUMNS), side is C or P, expiration is -1 where TD left it out
+    """
+    if (not isinstance(chain, dict)):
+        return empty_table()
+
+    rows = {column: [] for column in COLUMNS}
+    underlying = ticker if (ticker) else chain.get('symbol', '')
+    for side, key in [('C', 'callExpDateMap'), ('P', 'putExpDateMap')]:
+        for expir, strikes in (chain.get(key) or {}).items():
+            expiry, dte = (expir.split(':') + [None])[:2]
+            for strike, contracts in strikes.items():
+                for contract in contracts:
+                    rows['underlying'].append(underlying)
+                    rows['expiry'].append(expiry)
+                    rows['side'].append(side)
+                    for column, field in CONTRACT_FIELDS.items():
+                        value = contract.get(field)
+                        if (column == 'strike' and value is None):
+                            value = strike
+                        if (column == 'dte' and value is None):
+                            value = dte
+                        rows[column].append(np.nan if (value in [None, 'NaN']) else value)
+
+    table = {}
+    for column, dtype in COLUMNS.items():
+        if (dtype == 'int64'):
+            table[column] = np.nan_to_num(np.array(rows[column], dtype=np.float64), nan=-1).astype(np.int64)
+        else:
+            table[column] = np.array(rows[column], dtype=dtype)
+
+    return table
+
+
+def concat_tables(tables):
+    tables = [table for table in tables if (len(table['strike']))]
+    if (not tables):
+        return empty_table()
+
+    return {column: np.concatenate([table[column] for table in tables]) for column in COLUMNS}
+
+
+def chain_cache_path(ticker, timeRange):
+    directory = os.environ.get('CHAIN_CACHE', 'lab/core/storage/chains/')
+    os.makedirs(directory, exist_ok=True)
+    fromDate, toDate = [datetime.strftime(date, '%Y%m%d') for date in timeRange]
+
+    return os.path.join(directory, '{}-{}-{}.npz'.format(ticker.upper(), fromDate, toDate))
+
+
+def read_chain_table(ticker, timeRange):
+    """
+    Normalized chain from disk, None if it isn't stored or is older than the chains TTL.
+    """
+    path = chain_cache_path(ticker, timeRange)
+    if (not os.path.exists(path) or time.time() - os.path.getmtime(path) > ENDPOINTS['chains'][0]):
+        return None
+    with np.load(path) as stored:
+        return {column: stored[column] for column in COLUMNS}
+
+
+def write_chain_table(ticker, timeRange, table):
+    path = chain_cache_path(ticker, timeRange)
+    with open(path + '.tmp', 'wb') as tablefile:
+        np.savez(tablefile, **table)
+    os.replace(path + '.tmp', path)
+
+
+def getChainTable(ticker, timeRange, cache=True):
+    """
+    One underlying's option chain, normalized.
+
+    Parameters
+    ----------
+    ticker      :str
+    timeRange   :list
+                 [fromDate, toDate], each as datetime.datetime
+    cache       :bool
+
+    Returns
+    -------
+    dict of np.ndarray, (see normalize_chain()), empty if the chain could not be fetched
+    """
+    table = read_chain_table(ticker, timeRange) if (cache) else None
+    if (table is not None):
+        return table
+
+    chain = getOptionChainTD(ticker, timeRange)
+    if (chain is None):
+        return empty_table()
+
+    table = normalize_chain(chain, ticker.upper())
+    if (cache and len(table['strike'])):
+        write_chain_table(ticker, timeRange, table)
+
+    return table
+
+
+def getChainTables(tickers, timeRange, workers=8, cache=True):
+    """
+    Option chains of many underlyings, fetched concurrently and normalized into one table.
+
+    Parameters
+    ----------
+    tickers     :list
+    timeRange   :list
+                 [fromDate, toDate], each as datetime.datetime
+    workers     :int
+    cache       :bool
+
+    Returns
+    -------
+    dict of np.ndarray
+        every contract of every underlying, (see normalize_chain()), select one with table['underlying'] == ticker
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        tables = list(pool.map(lambda ticker: getChainTable(ticker, timeRange, cache), tickers))
+
+    return concat_tables(tables)
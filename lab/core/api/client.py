@@ -0,0 +1,182 @@
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
+import requests
+import time
+import os
+from .cache import response_cache
+load_dotenv()
+
+
+class TokenBucket:
+    """
+    Thread safe token bucket. Allows bursts of up to `capacity` calls, then `rate` calls per second.
+
+    Parameters
+    ----------
+    rate       :float
+                tokens added per second
+    capacity   :int
+                most tokens the bucket holds
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity else rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self, tokens=1):
+        """
+        Takes `tokens` if they are available, without blocking.
+
+        Returns
+        -------
+        float
+            0 if the tokens were taken, otherwise seconds until they will be available
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if (self.tokens >= tokens):
+                self.tokens -= tokens
+                return 0
+
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        """
+        Blocks until `tokens` are available, then takes them.
+        """
+        wait = self.take(tokens)
+        while (wait):
+            time.sleep(wait)
+            wait = self.take(tokens)
+
+
+class IEXClient:
+    """
+    One pooled, keep-alive session for every IEX Cloud call.
+    Failed calls, (connection errors, 429s and 5xxs), are retried with exponential backoff, and every call
+    takes a token from a shared bucket so concurrent scans stay under the plan's rate limit without fixed sleeps.
+
+    Parameters
+    ----------
+    sandbox      :bool
+                  Sets the IEX environment to sandbox mode to make limitless API calls for testing.
+    rate         :float
+                  requests per second, defaults to IEX_RATE_LIMIT or 100, (IEX's per IP limit)
+    concurrency  :int
+                  pooled connections and worker threads in get_many(), defaults to IEX_CONCURRENCY or 8
+    retries      :int
+    backoff      :float
+                  seconds, doubled after each retry
+    timeout      :float
+                  seconds
+
+    Set API_MOCK_URL to send every call to a local mock server instead, (see mock.py).
+    """
+
+    def __init__(self, sandbox=False, rate=None, concurrency=None, retries=3, backoff=0.5, timeout=10):
+        self.domain = 'cloud.iexapis.com'
+        self.key = os.environ.get("IEX_TOKEN")
+        if (sandbox):
+            self.domain = 'sandbox.iexapis.com'
+            self.key = os.environ.get("IEX_SANDBOX_TOKEN")
+        self.base = 'https://{}'.format(self.domain)
+        if (os.environ.get('API_MOCK_URL')):
+            self.base = os.environ.get('API_MOCK_URL').rstrip('/')
+
+        self.rate = float(rate if rate else os.environ.get('IEX_RATE_LIMIT', 100))
+        self.concurrency = int(concurrency if concurrency else os.environ.get('IEX_CONCURRENCY', 8))
+        self.timeout = timeout
+        self.bucket = TokenBucket(self.rate)
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=['GET'],
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def url(self, path):
+        return '{}/stable/{}'.format(self.base, path.lstrip('/'))
+
+    def get(self, path, params=None, cache=None):
+        """
+        GET an IEX endpoint. Every call goes through the response cache, (see cache.py), so it can be recorded and
+        replayed, but only calls naming a cached endpoint are served from it.
+
+        Parameters
+        ----------
+        path     :str
+                  path after /stable/, ex: stock/aapl/quote
+        params   :dict
+                  query string, the token is added
+        cache    :str
+                  key of cache.ENDPOINTS, ex: price-target
+
+        Returns
+        -------
+        json response
+
+        Raises
+        ------
+        requests.exceptions.RequestException, ValueError
+            on a failed request or a response that isn't json
+        """
+        query = dict(params if params else {})
+        query['token'] = self.key
+
+        return response_cache().request(cache, self.url(path), query, fetch=self.fetch)
+
+    def fetch(self, url, params=None, headers=None):
+        self.bucket.acquire()
+
+        return self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+
+    def get_many(self, calls):
+        """
+        Runs many GETs concurrently on the pooled session. Failed calls come back as None.
+
+        Parameters
+        ----------
+        calls    :list
+                  list of (path, params) tuples
+
+        Returns
+        -------
+        list of json responses, in the same order as calls
+        """
+        def fetch(call):
+            try:
+                return self.get(*call)
+            except (requests.exceptions.RequestException, ValueError):
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            return list(pool.map(fetch, calls))
+
+
+clients = {}
+clients_lock = threading.Lock()
+
+
+def iex_client(sandbox=False):
+    """
+    Shared IEXClient per environment, so every module reuses the same connections and the same rate limit.
+    """
+    with clients_lock:
+        if (sandbox not in clients):
+            clients[sandbox] = IEXClient(sandbox)
+
+        return clients[sandbox]
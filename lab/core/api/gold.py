@@ -2,7 +2,9 @@ from datetime import datetime, time, timedelta
 import time
 from dotenv import load_dotenv
 import requests
-import redis
+from ..warehouse import bars_from_chart
+from ...redisdb.controller import reference_key
+from ...redisdb.series import append_series, series_last_day
 import sys
 import json
 import os
@@ -23,8 +25,11 @@ def goldForexPrice():
 
 
 def syncGoldPrices():
+    """
+    Appends the gold closes missing since the last saved day to the gold series, (see redisdb/series.py).
+    """
     print('Syncing gold prices... ')
-    r = redis.Redis(host='localhost', port=6379, db=0, charset="utf-8", decode_responses=True)
+    key = reference_key('gold')
 
     def goldapi_io_fetch(date):
         """
@@ -41,28 +46,32 @@ def syncGoldPrices():
         conn.request("GET", "/api/XAU/USD/"+date, payload, headers)
         res = conn.getresponse()
         data = res.read().decode("utf-8")
-        saveDate = datetime.strptime(date, '%Y%m%d').strftime('%Y-%m-%d')
         if ('price' in data):
-            r.set('gold-'+saveDate+'-close', json.loads(data)['price'])
+            return json.loads(data)['price']
         else:
             print(data, "www.goldapi.io"+"/api/XAU/USD/"+date)
 
-        return True
+        return None
 
-    today = datetime.today()
-    i = 0
-    while True:
-        day = (today - timedelta(days=i))
-        gprice = r.get('gold-'+day.strftime('%Y-%m-%d')+'-close')
+    last = series_last_day(key)
+    if (last is None):
+        print('No gold prices saved, seed them first, (lab/redisdb/seed/gold.py).')
+        return False
 
-        if (gprice):
-            print('Gold prices up to date.')
-            break
+    today = datetime.today().date()
+    day = last.astype(datetime) + timedelta(days=1)
+    while (day <= today):
+        gprice = goldapi_io_fetch(day.strftime('%Y%m%d'))
 
-        goldapi_io_fetch(day.strftime('%Y%m%d'))
+        if (gprice):
+            # Saved as it arrives, so an interrupted sync keeps what it fetched
+            append_series(key, bars_from_chart([{'date': day.strftime('%Y-%m-%d'), 'close': gprice}]))
 
         time.sleep(0.5)
-        i += 1
+        day += timedelta(days=1)
+
+    print('Gold prices up to date.')
+    return True
 
 
 # def metalsApi():
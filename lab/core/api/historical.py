@@ -4,32 +4,17 @@ import requests
 import sys
 import json
 import os
+from .client import iex_client
 load_dotenv()
 
 
 def getHistoricalData(ticker, timeframe, priceOnly=False, sandbox=False):
-    domain = 'cloud.iexapis.com'
-    key = os.environ.get("IEX_TOKEN")
-    if (sandbox):
-        domain = 'sandbox.iexapis.com'
-        key = os.environ.get("IEX_SANDBOX_TOKEN")
+    params = {}
+    if (priceOnly):
+        params['chartCloseOnly'] = 'true'
     try:
-        url = 'https://{}/stable/stock/{}/chart/{}?token={}'.format(
-            domain,
-            ticker,
-            timeframe,
-            key
-        )
-        if (priceOnly):
-            url = 'https://{}/stable/stock/{}/chart/{}?chartCloseOnly=true&token={}'.format(
-                domain,
-                ticker,
-                timeframe,
-                key
-            )
-
-        historicalData = requests.get(url).json()
-    except:
+        historicalData = iex_client(sandbox).get('stock/{}/chart/{}'.format(ticker, timeframe), params)
+    except (requests.exceptions.RequestException, ValueError):
         print("Unexpected error:", sys.exc_info()[0])
         return {}
 
@@ -37,31 +22,16 @@ def getHistoricalData(ticker, timeframe, priceOnly=False, sandbox=False):
 
 
 def batchHistoricalData(batch, timeframe, priceOnly=False, sandbox=False):
-    domain = 'cloud.iexapis.com'
-    key = os.environ.get("IEX_TOKEN")
-    if (sandbox):
-        domain = 'sandbox.iexapis.com'
-        key = os.environ.get("IEX_SANDBOX_TOKEN")
-
-    batch = ",".join(batch)  # Convert to comma-separated string
+    params = {
+        'symbols': ",".join(batch),  # Convert to comma-separated string
+        'types': 'chart',
+        'range': timeframe,
+    }
+    if (priceOnly):
+        params['chartCloseOnly'] = 'true'
     try:
-        url = 'https://{}/stable/stock/market/batch?symbols={}&types=chart&range={}&token={}'.format(
-            domain,
-            batch,
-            timeframe,
-            key
-        )
-        if (priceOnly):
-            url = 'https://{}/stable/stock/market/batch?symbols={}&types=chart&range={}&chartCloseOnly=true&token={}'.format(
-                domain,
-                batch,
-                timeframe,
-                key
-            )
-        print(url)
-        sys.exit()
-        batchrequest = requests.get(url).json()
-    except:
+        batchrequest = iex_client(sandbox).get('stock/market/batch', params)
+    except (requests.exceptions.RequestException, ValueError):
         # print("Unexpected error:", sys.exc_info()[0])
         return {}
 
@@ -69,20 +39,9 @@ def batchHistoricalData(batch, timeframe, priceOnly=False, sandbox=False):
 
 
 def getHistoricalEarnings(ticker, quarters=4, sandbox=False):
-    domain = 'cloud.iexapis.com'
-    key = os.environ.get("IEX_TOKEN")
-    if (sandbox):
-        domain = 'sandbox.iexapis.com'
-        key = os.environ.get("IEX_SANDBOX_TOKEN")
     try:
-        url = 'https://{}/stable/stock/{}/earnings/{}/?token={}'.format(
-            domain,
-            ticker,
-            quarters,
-            key
-        )
-        earnings = requests.get(url).json()
-    except:
+        earnings = iex_client(sandbox).get('stock/{}/earnings/{}/'.format(ticker, quarters))
+    except (requests.exceptions.RequestException, ValueError):
         #print("Unexpected error:", sys.exc_info()[0])
         return None
 
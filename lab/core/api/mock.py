@@ -0,0 +1,448 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import date, datetime, timedelta
+from urllib.parse import urlparse, parse_qsl
+from dotenv import load_dotenv
+import numpy as np
+import threading
+import requests
+import random
+import zlib
+import json
+import time
+import glob
+import os
+from .cache import public_params
+from .client import TokenBucket
+load_dotenv()
+
+# Local stand-in for the IEX Cloud and TD Ameritrade endpoints the scanners use. Point the clients at it with
+# API_MOCK_URL=http://localhost:<port>, (see client.py and options.py).
+# Requests are answered from responses recorded with HTTP_CACHE_MODE=record, (see cache.py), when one matches.
+# Anything else gets deterministic synthetic data, so a scan can run over a universe of any size.
+# Latency, random 429s and a rate limit can be added to benchmark throughput, concurrency and backoff.
+# The SSE quote channels stream synthetic ticks, (see stream.py).
+
+RANGE_DAYS = {
+    '5d': 5,
+    '1m': 21,
+    '3m': 63,
+    '6m': 126,
+    'ytd': 200,
+    '1y': 252,
+    '2y': 504,
+    '5y': 1260,
+    'max': 2520,
+}
+
+# SSE channel: seconds between events of the mock quote stream
+STREAM_INTERVALS = {
+    'stocksUS': 0.5,
+    'stocksUS1Second': 1,
+    'stocksUS5Second': 5,
+    'stocksUS1Minute': 60,
+}
+
+
+def mock_symbols(count):
+    """
+    Synthetic ticker symbols, ex: MAAA, MAAB...
+    """
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    symbols = []
+    for i in range(count):
+        symbol = ''
+        for n in range(3):
+            symbol = letters[i % 26] + symbol
+            i //= 26
+        symbols.append('M' + symbol)
+
+    return symbols
+
+
+def symbol_rng(symbol, salt=''):
+    return np.random.default_rng(zlib.crc32('{}{}'.format(symbol.upper(), salt).encode()))
+
+
+def mock_price(symbol):
+    return round(float(symbol_rng(symbol).uniform(2, 400)), 2)
+
+
+def mock_chart(symbol, timeframe='1m', closeOnly=False):
+    """
+    Random walk of daily bars ending today, oldest first, shaped like the IEX chart endpoint.
+    """
+    count = RANGE_DAYS.get(timeframe, 21)
+    rng = symbol_rng(symbol, 'chart')
+    # Walked backwards from today's mock price, so the chart ends where quotes are
+    returns = rng.normal(0, 0.02, count)
+    closes = mock_price(symbol) * np.exp(-np.append(np.cumsum(returns[::-1])[::-1][1:], 0))
+    volumes = rng.lognormal(13, 1, count)
+    days = np.busday_offset(np.datetime64(date.today()), -np.arange(count)[::-1], roll='backward')
+
+    chart = []
+    for i in range(count):
+        close = round(float(closes[i]), 2)
+        previous = float(closes[i - 1]) if (i) else close
+        bar = {
+            'date': str(days[i]),
+            'close': close,
+            'volume': int(volumes[i]),
+        }
+        if (not closeOnly):
+            bar.update({
+                'open': round(previous, 2),
+                'high': round(max(close, previous) * 1.01, 2),
+                'low': round(min(close, previous) * 0.99, 2),
+                'changePercent': round((close - previous) / previous, 4),
+            })
+        chart.append(bar)
+
+    return chart
+
+
+def mock_quote(symbol):
+    rng = symbol_rng(symbol, 'quote')
+    price = mock_price(symbol)
+    volume = int(rng.lognormal(13, 1))
+    change = float(rng.normal(0, 0.03))
+    previousVolume = int(volume * rng.uniform(0.2, 2))
+    week52High = mock_stats(symbol)['week52high']
+
+    # About 1 in 20 symbols is breaking out, (up 5% or more on 3x yesterday's volume, within 20% of its 52 week high),
+    # so the chase filters, (volume:chase and trend/stream.py), have something to find
+    if (rng.uniform() < 0.05):
+        change = float(rng.uniform(0.05, 0.12))
+        previousVolume = int(volume / rng.uniform(3, 6))
+        week52High = round(price * rng.uniform(1.01, 1.2), 2)
+
+    return {
+        'symbol': symbol.upper(),
+        'companyName': '{} Mock Corp'.format(symbol.upper()),
+        'latestPrice': price,
+        'previousClose': round(price / (1 + change), 2),
+        'changePercent': round(change, 4),
+        'volume': volume,
+        'previousVolume': previousVolume,
+        'avgTotalVolume': int(volume * rng.uniform(0.5, 1.5)),
+        'week52High': week52High,
+        'marketCap': int(price * rng.lognormal(18, 1.5)),
+    }
+
+
+def mock_stats(symbol):
+    rng = symbol_rng(symbol, 'stats')
+    price = mock_price(symbol)
+
+    return {
+        'companyName': '{} Mock Corp'.format(symbol.upper()),
+        'avg30Volume': int(rng.lognormal(13, 1)),
+        'day50MovingAvg': round(price * rng.uniform(0.8, 1.2), 2),
+        'day200MovingAvg': round(price * rng.uniform(0.7, 1.3), 2),
+        'week52high': round(price * rng.uniform(1, 1.6), 2),
+        'week52low': round(price * rng.uniform(0.4, 1), 2),
+        'day5ChangePercent': round(float(rng.normal(0, 0.05)), 4),
+        'month1ChangePercent': round(float(rng.normal(0, 0.1)), 4),
+        'month3ChangePercent': round(float(rng.normal(0, 0.2)), 4),
+        'ytdChangePercent': round(float(rng.normal(0, 0.3)), 4),
+        'sharesOutstanding': int(rng.lognormal(18, 1)),
+        'peRatio': round(float(rng.uniform(5, 60)), 2),
+    }
+
+
+def mock_price_target(symbol):
+    rng = symbol_rng(symbol, 'target')
+    price = mock_price(symbol)
+
+    return {
+        'symbol': symbol.upper(),
+        'updatedDate': str(date.today()),
+        'priceTargetAverage': round(price * rng.uniform(0.9, 1.4), 2),
+        'priceTargetHigh': round(price * rng.uniform(1.4, 2), 2),
+        'priceTargetLow': round(price * rng.uniform(0.5, 0.9), 2),
+        'numberOfAnalysts': int(rng.integers(1, 30)),
+    }
+
+
+def mock_chain(symbol, fromDate, toDate):
+    """
+    Option chain shaped like TD Ameritrade's chains endpoint: a weekly expiration every friday between the dates,
+    strikes within 20% of the underlying.
+    """
+    rng = symbol_rng(symbol, 'chain')
+    price = mock_price(symbol)
+    step = 10 ** max(np.floor(np.log10(price)) - 1, 0) * (2.5 if (price < 100) else 5)
+    strikes = np.arange(np.floor(price * 0.8 / step), np.ceil(price * 1.2 / step) + 1) * step
+    today = date.today()
+    start = max(date.fromisoformat(fromDate), today)
+
+    chain = {
+        'symbol': symbol.upper(),
+        'status': 'SUCCESS',
+        'underlyingPrice': price,
+        'callExpDateMap': {},
+        'putExpDateMap': {},
+    }
+    expiry = np.busday_offset(np.datetime64(start), 0, roll='forward', weekmask='Fri').astype(object)
+    while (expiry <= date.fromisoformat(toDate)):
+        dte = (expiry - today).days
+        precise = int(datetime.combine(expiry, datetime.min.time()).timestamp() * 1000)
+        for side, key in [('CALL', 'callExpDateMap'), ('PUT', 'putExpDateMap')]:
+            options = {}
+            for strike in strikes:
+                intrinsic = max(price - strike, 0) if (side == 'CALL') else max(strike - price, 0)
+                mark = intrinsic + price * 0.3 * np.sqrt(max(dte, 1) / 365) * np.exp(-abs(strike - price) / price * 5)
+                spread = max(mark * 0.05, 0.01)
+                options['{:.1f}'.format(strike)] = [{
+                    'putCall': side,
+                    'symbol': '{}_{}{}{:g}'.format(symbol.upper(), expiry.strftime('%m%d%y'), side[0], strike),
+                    'bid': round(float(max(mark - spread / 2, 0)), 2),
+                    'ask': round(float(mark + spread / 2), 2),
+                    'last': round(float(mark * rng.uniform(0.97, 1.03)), 2),
+                    'mark': round(float(mark), 2),
+                    'totalVolume': int(rng.lognormal(5, 2)),
+                    'openInterest': int(rng.lognormal(7, 2)),
+                    'strikePrice': float(strike),
+                    'expirationDate': precise,
+                    'daysToExpiration': dte,
+                }]
+            chain[key]['{}:{}'.format(expiry, dte)] = options
+        expiry += timedelta(days=7)
+
+    return chain
+
+
+def mock_quote_ticks(symbols, interval=1):
+    """
+    Endless synthetic quote stream shaped like IEX's SSE quote events: every interval each symbol's price takes a
+    small random step and its volume grows.
+
+    Returns
+    -------
+    generator of lists of quotes
+    """
+    quotes = {symbol: mock_quote(symbol) for symbol in symbols}
+    rng = np.random.default_rng()
+    while True:
+        time.sleep(interval)
+        now = int(time.time() * 1000)
+        for symbol, quote in quotes.items():
+            quote['latestPrice'] = round(quote['latestPrice'] * float(np.exp(rng.normal(0, 0.002))), 2)
+            quote['changePercent'] = round((quote['latestPrice'] - quote['previousClose']) / quote['previousClose'], 4)
+            quote['volume'] += int(rng.lognormal(6, 1))
+            quote['week52High'] = max(quote['week52High'], quote['latestPrice'])
+            quote['latestUpdate'] = now
+        yield list(quotes.values())
+
+
+def filtered(data, fields):
+    if (fields and isinstance(data, dict)):
+        return {key: value for key, value in data.items() if (key in fields)}
+
+    return data
+
+
+class MockAPI:
+    """
+    Answers a request path and query with (status, headers, json body).
+
+    Parameters
+    ----------
+    fixtures    :str
+                 directory of recorded responses, defaults to HTTP_FIXTURES
+    latency     :float
+                 seconds added to every response
+    jitter      :float
+                 up to this many more seconds, at random
+    errors      :float
+                 fraction of requests answered with a 429
+    rate        :float
+                 requests per second before answering with 429s, (0 for no limit)
+    universe    :int
+                 number of symbols in ref-data/iex/symbols
+    """
+
+    def __init__(self, fixtures=None, latency=0, jitter=0, errors=0, rate=0, universe=8000):
+        self.latency = latency
+        self.jitter = jitter
+        self.errors = errors
+        self.bucket = TokenBucket(rate) if (rate) else None
+        self.universe = universe
+        self.recorded = self.load_fixtures(fixtures if (fixtures) else os.environ.get('HTTP_FIXTURES', 'lab/core/storage/fixtures/'))
+        self.counts = {'requests': 0, 'recorded': 0, 'synthetic': 0, 'throttled': 0, 'missing': 0}
+        self.lock = threading.Lock()
+
+    def load_fixtures(self, directory):
+        recorded = {}
+        for path in glob.glob(os.path.join(directory, '*', '*.json')):
+            with open(path) as fixture:
+                entry = json.load(fixture)
+            recorded[self.request_key(urlparse(entry['url']).path, entry.get('params'))] = entry['body']
+
+        return recorded
+
+    def request_key(self, path, params):
+        return (path.rstrip('/'), tuple(sorted((key, str(value)) for key, value in public_params(params).items())))
+
+    def count(self, name):
+        with self.lock:
+            self.counts[name] += 1
+
+    def respond(self, path, params):
+        self.count('requests')
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+
+        if ((self.bucket and self.bucket.take()) or random.random() < self.errors):
+            self.count('throttled')
+            return 429, {'Retry-After': '1'}, json.dumps('Too many requests')
+
+        recorded = self.recorded.get(self.request_key(path, params))
+        if (recorded is not None):
+            self.count('recorded')
+            return 200, {}, recorded
+
+        body = self.synthesize(path.strip('/').split('/'), params)
+        if (body is None):
+            self.count('missing')
+            return 404, {}, json.dumps('Unknown mock endpoint')
+
+        self.count('synthetic')
+        return 200, {}, json.dumps(body)
+
+    def synthesize(self, parts, params):
+        fields = params['filter'].split(',') if (params.get('filter')) else None
+        closeOnly = params.get('chartCloseOnly') == 'true'
+
+        # TD Ameritrade
+        if (parts[-1] == 'chains'):
+            return mock_chain(params['symbol'], params['fromDate'], params['toDate'])
+
+        # IEX, paths after /stable/
+        parts = parts[1:] if (parts[0] in ['stable', 'v1']) else parts
+        if (parts == ['ref-data', 'iex', 'symbols']):
+            return [{'symbol': symbol, 'name': '{} Mock Corp'.format(symbol), 'isEnabled': True, 'type': 'cs'} for symbol in mock_symbols(self.universe)]
+        if (parts[:3] == ['stock', 'market', 'batch']):
+            types = {
+                'quote': mock_quote,
+                'stats': mock_stats,
+                'price-target': mock_price_target,
+                'chart': lambda symbol: mock_chart(symbol, params.get('range', '1m'), closeOnly),
+            }
+            batch = {}
+            for symbol in params.get('symbols', '').split(','):
+                if (symbol):
+                    batch[symbol.upper()] = {kind: filtered(types[kind](symbol), fields) for kind in params.get('types', '').split(',') if (kind in types)}
+            return batch
+        if (len(parts) >= 3 and parts[0] == 'stock'):
+            symbol, kind = parts[1], parts[2]
+            if (kind == 'chart'):
+                return mock_chart(symbol, parts[3] if (len(parts) > 3) else '1m', closeOnly)
+            if (kind == 'price'):
+                return mock_price(symbol)
+            singles = {'quote': mock_quote, 'stats': mock_stats, 'price-target': mock_price_target}
+            if (kind in singles):
+                return filtered(singles[kind](symbol), fields)
+
+        return None
+
+
+def mock_handler(api):
+    class MockHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = dict(parse_qsl(url.query))
+            channel = url.path.rstrip('/').split('/')[-1]
+            if (channel in STREAM_INTERVALS):
+                self.stream(params.get('symbols', '').split(','), STREAM_INTERVALS[channel])
+                return
+
+            status, headers, body = api.respond(url.path, params)
+            payload = body.encode()
+
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            for header, value in headers.items():
+                self.send_header(header, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def stream(self, symbols, interval):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.end_headers()
+            try:
+                for quotes in mock_quote_ticks([symbol for symbol in symbols if (symbol)], interval):
+                    self.wfile.write('data: {}\n\n'.format(json.dumps(quotes)).encode())
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockHandler
+
+
+def start_mock_server(api, port=8765):
+    """
+    Serves a MockAPI on a background thread.
+
+    Returns
+    -------
+    ThreadingHTTPServer
+        call shutdown() to stop it
+    """
+    server = ThreadingHTTPServer(('localhost', port), mock_handler(api))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+def benchmark_scan(universe=8000, types='quote,stats', **options):
+    """
+    Runs a full universe batch scan, (the same iter_batches() the scanners use), against a mock server on a free port
+    and reports throughput. Latency, errors and rate limit are passed to MockAPI.
+    """
+    from . import client
+    from .batch import iter_batches
+
+    api = MockAPI(universe=universe, **options)
+    server = start_mock_server(api, 0)
+    os.environ['API_MOCK_URL'] = 'http://localhost:{}'.format(server.server_address[1])
+    client.clients.clear()
+
+    def request(batch, sandbox=False):
+        try:
+            return client.iex_client(sandbox).get('stock/market/batch', {'symbols': ','.join(batch), 'types': types})
+        except (requests.exceptions.RequestException, ValueError):
+            return {}
+
+    started = time.perf_counter()
+    received = 0
+    for response in iter_batches(request, mock_symbols(universe)):
+        received += len(response)
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+    client.clients.clear()
+
+    results = dict(api.counts, tickers=received, seconds=round(elapsed, 3), tickersPerSecond=round(received / elapsed, 1))
+    print(json.dumps(results, indent=1))
+
+    return results
+
+
+def serve_mock(port=8765, **options):
+    """
+    Runs the mock server until interrupted, then prints what it answered.
+    """
+    api = MockAPI(**options)
+    server = start_mock_server(api, port)
+    print('Mock API on http://localhost:{}, ({} recorded responses)'.format(port, len(api.recorded)))
+    print('Point the clients at it with API_MOCK_URL=http://localhost:{}'.format(port))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(json.dumps(api.counts, indent=1))
@@ -4,6 +4,8 @@ import requests
 import sys
 import json
 import os
+from .client import iex_client
+from .cache import response_cache
 load_dotenv()
 
 
@@ -21,19 +23,9 @@ def getExpirations(ticker, sandbox=False):
     -------
     list of option expiration dates
     """
-    domain = 'cloud.iexapis.com'
-    key = os.environ.get("IEX_TOKEN")
-    if (sandbox):
-        domain = 'sandbox.iexapis.com'
-        key = os.environ.get("IEX_SANDBOX_TOKEN")
     try:
-        url = 'https://{}/stable/stock/{}/options?token={}'.format(
-            domain,
-            ticker,
-            key
-        )
-        options = requests.get(url).json()
-    except:
+        options = iex_client(sandbox).get('stock/{}/options'.format(ticker))
+    except (requests.exceptions.RequestException, ValueError):
         #print("Unexpected error:", sys.exc_info()[0])
         return None
 
@@ -64,24 +56,9 @@ def getOptionChain(ticker, date, sandbox=False):
             sys.exit()
 
     fdate = formatDate(date)
-    domain = 'cloud.iexapis.com'
-    key = os.environ.get("IEX_TOKEN")
-
-    if (sandbox):
-        domain = 'sandbox.iexapis.com'
-        key = os.environ.get("IEX_SANDBOX_TOKEN")
-
     try:
-        url = 'https://{}/stable/stock/{}/options/{}?token={}'.format(
-            domain,
-            ticker,
-            fdate,
-            key
-        )
-        print(url)
-        sys.exit()
-        chain = requests.get(url).json()
-    except:
+        chain = iex_client(sandbox).get('stock/{}/options/{}'.format(ticker, fdate))
+    except (requests.exceptions.RequestException, ValueError):
         #print("Unexpected error:", sys.exc_info()[0])
         return None
 
@@ -103,7 +80,8 @@ def getOptionChainTD(ticker, timeRange):
 
     Returns
     -------
-    list of option expiration dates
+    dict
+        TD Ameritrade option chain, None if it could not be fetched
     """
     def formatDate(dates):
         results = []
@@ -112,26 +90,38 @@ def getOptionChainTD(ticker, timeRange):
                 fdate = datetime.datetime.strftime(date, '%Y-%m-%d')
                 results.append(fdate)
             else:
-                print('Failure in getOptionChain(). Date param must be of type datetime.datetime. Closing program...')
-                sys.exit()
+                print('Failure in getOptionChainTD(). Date param must be of type datetime.datetime.')
+                return None
         return tuple(results)
 
-    fromDate, toDate = formatDate(timeRange)
+    dates = formatDate(timeRange)
+    if (not dates):
+        return None
+    fromDate, toDate = dates
     domain = 'api.tdameritrade.com/v1/marketdata'
     key = os.environ.get("TDAMER_KEY")
     headers = {
         'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML'
     }        
-    url = 'https://{}/chains?apikey={}&symbol={}&fromDate={}&toDate={}'.format(
-        domain,
-        key,
-        ticker,
-        fromDate,
-        toDate
-    )
-    chain = requests.get(url, headers=headers).json()
+    url = 'https://{}/chains'.format(domain)
+    if (os.environ.get('API_MOCK_URL')):
+        # Local stand-in, (see mock.py)
+        url = '{}/v1/marketdata/chains'.format(os.environ.get('API_MOCK_URL').rstrip('/'))
+    params = {
+        'apikey': key,
+        'symbol': ticker,
+        'fromDate': fromDate,
+        'toDate': toDate,
+    }
+    # Chains are cached for a few minutes, (see cache.py)
+    try:
+        chain = response_cache().request('chains', url, params, headers=headers)
+    except (requests.exceptions.RequestException, ValueError):
+        #print("Unexpected error:", sys.exc_info()[0])
+        return None
+
     if isinstance(chain, dict):
         return chain
-    else:        
+    else:
         print(chain)
-        sys.exit()
+        return None
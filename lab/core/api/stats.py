@@ -1,10 +1,10 @@
-from iexfinance.stocks import Stock, get_historical_data
 from datetime import datetime, time, timedelta
 from dotenv import load_dotenv
 import requests
 import sys
 import json
 import os
+from .client import iex_client
 load_dotenv()
 
 
@@ -22,36 +22,19 @@ def getCurrentPrice(ticker, sandbox=False):
     -------
     latest price as float 
     """
-    key = os.environ.get("IEX_TOKEN")
-    if (sandbox):
-        os.environ['IEX_API_VERSION'] = 'iexcloud-sandbox'
-        key = os.environ.get("IEX_SANDBOX_TOKEN")
     try:
-        stock = Stock(ticker, token=key)
-        price = stock.get_price()[ticker].iloc[0]
-    except:
+        price = iex_client(sandbox).get('stock/{}/price'.format(ticker), cache='quote')
+    except (requests.exceptions.RequestException, ValueError):
         #print("Unexpected error:", sys.exc_info()[0])
         return {}
 
-    if (sandbox):
-        os.environ['IEX_API_VERSION'] = 'v1'
     return price
 
 
 def getPriceTarget(ticker, sandbox=False):
-    domain = 'cloud.iexapis.com'
-    key = os.environ.get("IEX_TOKEN")
-    if (sandbox):
-        domain = 'sandbox.iexapis.com'
-        key = os.environ.get("IEX_SANDBOX_TOKEN")
     try:
-        url = 'https://{}/stable/stock/{}/price-target?token={}'.format(
-            domain,
-            ticker,
-            key
-        )
-        priceTarget = requests.get(url).json()
-    except:
+        priceTarget = iex_client(sandbox).get('stock/{}/price-target'.format(ticker), cache='price-target')
+    except (requests.exceptions.RequestException, ValueError):
         #print("Unexpected error:", sys.exc_info()[0])
         return None
 
@@ -73,29 +56,12 @@ def getQuoteData(ticker, filterResults=[], sandbox=False):
     -------
     dict object of IEX results
     """
-    domain = 'cloud.iexapis.com'
-    key = os.environ.get("IEX_TOKEN")
-    if (sandbox):
-        domain = 'sandbox.iexapis.com'
-        key = os.environ.get("IEX_SANDBOX_TOKEN")
+    params = {}
     if (filterResults):
-        filters = ",".join(filterResults) if (len(filterResults) > 1) else filterResults[0]
+        params['filter'] = ",".join(filterResults)
     try:
-        
-        url = 'https://{}/stable/stock/{}/quote?token={}'.format(
-            domain,
-            ticker,
-            key
-        )
-        if (filterResults):
-            url = 'https://{}/stable/stock/{}/quote?filter={}&token={}'.format(
-                domain,
-                ticker,
-                filters,
-                key
-            )
-        quote = requests.get(url).json()
-    except:
+        quote = iex_client(sandbox).get('stock/{}/quote'.format(ticker), params, cache='quote')
+    except (requests.exceptions.RequestException, ValueError):
         #print("Unexpected error:", sys.exc_info()[0])
         return None
 
@@ -117,28 +83,12 @@ def getKeyStats(ticker, filterResults=[], sandbox=False):
     -------
     dict object of IEX results
     """
-    domain = 'cloud.iexapis.com'
-    key = os.environ.get("IEX_TOKEN")
-    if (sandbox):
-        domain = 'sandbox.iexapis.com'
-        key = os.environ.get("IEX_SANDBOX_TOKEN")
+    params = {}
     if (filterResults):
-        filters = ",".join(filterResults) if (len(filterResults) > 1) else filterResults[0]
+        params['filter'] = ",".join(filterResults)
     try:
-        url = 'https://{}/stable/stock/{}/stats?token={}'.format(
-            domain,
-            ticker,
-            key
-        )
-        if (filterResults):
-            url = 'https://{}/stable/stock/{}/stats?filter={}&token={}'.format(
-                domain,
-                ticker,
-                filters,
-                key
-            )
-        keyStats = requests.get(url).json()
-    except:
+        keyStats = iex_client(sandbox).get('stock/{}/stats'.format(ticker), params, cache='stats')
+    except (requests.exceptions.RequestException, ValueError):
         #print("Unexpected error:", sys.exc_info()[0])
         return None
 
@@ -160,28 +110,12 @@ def getAdvancedStats(ticker, filterResults=[], sandbox=False):
     -------
     dict object of IEX results
     """
-    domain = 'cloud.iexapis.com'
-    key = os.environ.get("IEX_TOKEN")
-    if (sandbox):
-        domain = 'sandbox.iexapis.com'
-        key = os.environ.get("IEX_SANDBOX_TOKEN")
+    params = {}
     if (filterResults):
-        filters = ",".join(filterResults) if (len(filterResults) > 1) else filterResults[0]
+        params['filter'] = ",".join(filterResults)
     try:
-        url = 'https://{}/stable/stock/{}/advanced-stats?token={}'.format(
-            domain,
-            ticker,
-            key
-        )
-        if (filterResults):
-            url = 'https://{}/stable/stock/{}/advanced-stats?filter={}&token={}'.format(
-                domain,
-                ticker,
-                filters,
-                key
-            )
-        advancedStats = requests.get(url).json()
-    except:
+        advancedStats = iex_client(sandbox).get('stock/{}/advanced-stats'.format(ticker), params)
+    except (requests.exceptions.RequestException, ValueError):
         #print("Unexpected error:", sys.exc_info()[0])
         return None
 
@@ -189,19 +123,9 @@ def getAdvancedStats(ticker, filterResults=[], sandbox=False):
 
 
 def getFinancials(ticker, sandbox=False):
-    domain = 'cloud.iexapis.com'
-    key = os.environ.get("IEX_TOKEN")
-    if (sandbox):
-        domain = 'sandbox.iexapis.com'
-        key = os.environ.get("IEX_SANDBOX_TOKEN")
     try:
-        url = 'https://{}/stable/stock/{}/financials?token={}'.format(
-            domain,
-            ticker,
-            key
-        )
-        financials = requests.get(url).json()
-    except:
+        financials = iex_client(sandbox).get('stock/{}/financials'.format(ticker))
+    except (requests.exceptions.RequestException, ValueError):
         # print("Unexpected error:", sys.exc_info()[0])
         return None
 
@@ -209,19 +133,9 @@ def getFinancials(ticker, sandbox=False):
 
 
 def getCashFlow(ticker, sandbox=False):
-    domain = 'cloud.iexapis.com'
-    key = os.environ.get("IEX_TOKEN")
-    if (sandbox):
-        domain = 'sandbox.iexapis.com'
-        key = os.environ.get("IEX_SANDBOX_TOKEN")
     try:
-        url = 'https://{}/stable/stock/{}/cash-flow?token={}'.format(
-            domain,
-            ticker,
-            key
-        )
-        cashflow = requests.get(url).json()
-    except:
+        cashflow = iex_client(sandbox).get('stock/{}/cash-flow'.format(ticker))
+    except (requests.exceptions.RequestException, ValueError):
         # print("Unexpected error:", sys.exc_info()[0])
         return None
 
@@ -0,0 +1,131 @@
+from dotenv import load_dotenv
+import threading
+import requests
+import queue
+import time
+import json
+import gzip
+import os
+from ..functions import chunks
+load_dotenv()
+
+# IEX Cloud server sent events. Each connection streams up to 50 symbols, so a universe is split across connections
+# on their own threads, all feeding one queue. Events can be recorded to newline delimited json and replayed later.
+
+SSE_SYMBOLS = 50
+
+
+def open_stream(path, mode='rt'):
+    if (path.endswith('.gz')):
+        return gzip.open(path, mode)
+
+    return open(path, mode)
+
+
+def sse_events(url, params, session=None, timeout=30):
+    """
+    Parses a server sent event stream.
+
+    Returns
+    -------
+    generator of the json data of each event
+    """
+    session = session if (session) else requests.Session()
+    with session.get(url, params=params, stream=True, timeout=timeout, headers={'Accept': 'text/event-stream'}) as response:
+        response.raise_for_status()
+        data = []
+        for line in response.iter_lines(decode_unicode=True):
+            if (line is None):
+                continue
+            if (line.startswith('data:')):
+                data.append(line[5:].strip())
+            elif (not line and data):
+                yield json.loads('\n'.join(data))
+                data = []
+
+
+def stream_connection(tickers, channel, sandbox, events, stop, backoff=1):
+    """
+    Keeps one SSE connection open, reconnecting with exponential backoff, and puts its events on the queue.
+    """
+    domain = 'sandbox-sse.iexapis.com' if (sandbox) else 'cloud-sse.iexapis.com'
+    key = os.environ.get("IEX_SANDBOX_TOKEN") if (sandbox) else os.environ.get("IEX_TOKEN")
+    url = 'https://{}/stable/{}'.format(domain, channel)
+    if (os.environ.get('API_MOCK_URL')):
+        url = '{}/stable/{}'.format(os.environ.get('API_MOCK_URL').rstrip('/'), channel)
+    params = {'symbols': ','.join(tickers), 'token': key}
+
+    wait = backoff
+    while (not stop.is_set()):
+        try:
+            for event in sse_events(url, params):
+                events.put(event)
+                wait = backoff
+                if (stop.is_set()):
+                    return
+        except (requests.exceptions.RequestException, ValueError):
+            pass
+        stop.wait(wait)
+        wait = min(wait * 2, 60)
+
+
+def quote_stream(tickers, channel='stocksUS5Second', sandbox=False, record=None):
+    """
+    Streams quotes for a list of tickers until the generator is closed.
+
+    Parameters
+    ----------
+    tickers     :list
+    channel     :str
+                 stocksUS, stocksUS1Second, stocksUS5Second or stocksUS1Minute
+    sandbox     :bool
+    record      :str
+                 path to append every event to, (.gz to compress), for replay_stream()
+
+    Returns
+    -------
+    generator of lists of quotes, (one list per event)
+    """
+    events = queue.Queue()
+    stop = threading.Event()
+    for batch in chunks(list(tickers), SSE_SYMBOLS):
+        threading.Thread(target=stream_connection, args=(batch, channel, sandbox, events, stop), daemon=True).start()
+
+    recording = open_stream(record, 'at') if (record) else None
+    try:
+        while True:
+            event = events.get()
+            if (recording):
+                recording.write(json.dumps({'time': int(time.time() * 1000), 'data': event}) + '\n')
+            yield event if (isinstance(event, list)) else [event]
+    finally:
+        stop.set()
+        if (recording):
+            recording.close()
+
+
+def replay_stream(path, speed=0):
+    """
+    Replays events recorded by quote_stream().
+
+    Parameters
+    ----------
+    path        :str
+    speed       :float
+                 1 replays at the recorded pace, 10 ten times faster, 0 as fast as possible
+
+    Returns
+    -------
+    generator of lists of quotes
+    """
+    previous = None
+    with open_stream(path) as recording:
+        for line in recording:
+            if (not line.strip()):
+                continue
+            event = json.loads(line)
+            if (speed and previous is not None):
+                time.sleep(max(event['time'] - previous, 0) / 1000 / speed)
+            previous = event['time']
+            data = event['data']
+            yield data if (isinstance(data, list)) else [data]
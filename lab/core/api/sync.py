@@ -1,15 +1,16 @@
 import django
 from django.apps import apps
 from dotenv import load_dotenv
-from ..functions import chunks
 import colored
 from colored import stylize
 import requests
-import redis
 import sys
-import time
 import json
 import os
+from .client import iex_client
+from .batch import batchPrice, iter_batches
+from ...redisdb.connection import rdb_pipeline
+from ...redisdb.controller import stock_key
 load_dotenv()
 django.setup()
 
@@ -22,57 +23,44 @@ def syncStocks():
     object of all stocks 
     """
     try:
-        url = 'https://cloud.iexapis.com/stable/ref-data/iex/symbols?token={}'.format(os.environ.get("IEX_TOKEN"))
-        tickers = requests.get(url).json()
-    except:
+        tickers = iex_client().get('ref-data/iex/symbols', cache='ref-data')
+    except (requests.exceptions.RequestException, ValueError):
         #print("Unexpected error:", sys.exc_info()[0])
         return {}
 
     return tickers
 
 
-def syncPrices():
+def syncPrices(sandbox=False):
     """
-    Fetches company info for a batch of tickers. Max 100 tickers
+    Refreshes the latest price of every stock in redis, (the price field of stock-{ticker}).
+    Batches are fetched concurrently, (see iter_batches()), and each batch's prices are written in one pipeline.
+    A failed batch is skipped rather than ending the sync.
 
     Parameters
     ----------
-    batch       :list
-                list of max 100 tickers
     sandbox     :bool
                 Sets the IEX environment to sandbox mode to make limitless API calls for testing.
 
     Returns
     -------
-    dict object of company info for 100 tickers
+    int
+        number of prices saved
     """
     Stock = apps.get_model('database', 'Stock')
     tickers = Stock.objects.all().values_list('ticker', flat=True)
-    r = redis.Redis(host='localhost', port=6379, db=0, charset="utf-8", decode_responses=True)
-    domain = 'cloud.iexapis.com'
-    key = os.environ.get("IEX_TOKEN")
-    chunked_tickers = chunks(tickers, 100)
 
-    for i, batch in enumerate(chunked_tickers):
-        time.sleep(1)
-        try:
-            batch = ",".join(batch)  # Convert to comma-separated string
-            url = 'https://{}/stable/stock/market/batch?symbols={}&types=quote&filter=latestPrice&token={}'.format(
-                domain,
-                batch,
-                key
-            )
-            
-            batch_request = requests.get(url).json()
-        except:
-            #print("Unexpected error:", sys.exc_info()[0])
-            return
+    saved = 0
+    for batch_request in iter_batches(batchPrice, tickers, sandbox=sandbox):
+        with rdb_pipeline() as pipe:
+            for ticker, data in batch_request.items():
+                price = (data.get('quote') or {}).get('latestPrice')
+                if (price):
+                    pipe.hset(stock_key(ticker), 'price', price)
 
-        if (batch_request):
-            for ticker, data in batch_request.items():                
-                quote = data['quote']
-                if ('latestPrice' in quote):
-                    price = quote['latestPrice']
-                    if (price):
-                        r.set('stock-'+ticker+'-price', price)
-                        print(stylize("Saved "+ticker, colored.fg("green")))
+            if (len(pipe)):
+                saved += len(pipe)
+                pipe.execute()
+                print(stylize("Saved {} prices".format(saved), colored.fg("green")))
+
+    return saved
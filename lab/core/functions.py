@@ -14,40 +14,59 @@ def extract_data_pd(data, key):
     df = pd.DataFrame(data, columns=data[0].keys())
     return df[key].tolist()
 
+
+def key_path(key):
+    """
+    Nested key path as a tuple. Accepts a list/tuple of keys or a dotted string, ex: 'quote.latestPrice'
+    """
+    if (isinstance(key, (list, tuple))):
+        return tuple(key)
+    if (isinstance(key, str)):
+        return tuple(key.split('.'))
+
+    return (key,)
+
+
+def dig(row, path):
+    """
+    Value at a nested key path of one row, None if any level is missing.
+    """
+    for key in path:
+        try:
+            row = row[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+
+    return row
+
+
 def burrow(data, key):
-    values = []
-    if len(key) == 2:
-        for i, row in data.items():
-            value = row[key[0]][key[1]]
-            values.append(value)
-    if len(key) == 3:
-        for i, row in data.items():
-            value = row[key[0]][key[1]][key[2]]
-            values.append(value)
-    if len(key) == 4:
-        for i, row in data.items():
-            value = row[key[0]][key[1]][key[2]][key[3]]
-            values.append(value)
-    if len(key) == 5:
-        for i, row in data.items():
-            value = row[key[0]][key[1]][key[2]][key[3]][key[4]]
-            values.append(value)
-    if len(key) > 5:
-        return 'Nest level too deep to retrieve via function.'
+    """
+    Values at a nested key path, (ex: ['quote', 'latestPrice']), of every row. Rows missing a level give None.
+
+    Parameters
+    ----------
+    data    :list|dict
+             list of rows or dict of rows
+    key     :list|tuple|str
+
+    Returns
+    -------
+    list
+    """
+    rows = data.values() if (isinstance(data, dict)) else data
+    path = key_path(key)
+
+    return [dig(row, path) for row in rows]
 
 
 def extract_data(data, key):
     values = []
     if (type(data) == dict):
-        if (type(key) == list):
-            burrow(data, key)
-        else:
-            for row in data.items():
-                value = row[key]
-                values.append(value)
+        data = list(data.values())
     if (type(data) == list):
         if (type(key) == list):
-            burrow(data[0], key)
+            values = burrow(data, key)
         else:
             for row in data:
                 value = row[key]
@@ -58,6 +77,96 @@ def extract_data(data, key):
     return None
 
 
+def column_array(values):
+    """
+    Numeric values, (None as nan), become a float64 array, strings keep their NumPy string type and anything else,
+    (nested dicts, lists), is kept in an object array.
+    """
+    if (all(value is None or (isinstance(value, (int, float)) and not isinstance(value, bool)) for value in values)):
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    if (all(isinstance(value, str) for value in values)):
+        return np.array(values)
+
+    array = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        array[i] = value
+
+    return array
+
+
+class Columns:
+    """
+    Columnar view of row oriented data, such as an IEX chart or batch payload. The rows are transposed into every
+    top level column in a single pass the first time a column is asked for. Nested key paths are walked from the
+    transposed column, and every column is converted to a NumPy array once and then kept, so repeated lookups are free.
+
+    Parameters
+    ----------
+    data    :list|dict
+             list of dicts or dict of dicts, (the values are the rows)
+
+    Example
+    -------
+    columns = Columns(getHistoricalData('aapl', '1m'))
+    closes, highs = columns['close'], columns['high']
+    prices = Columns(batchQuote(tickers))['quote.latestPrice']
+    """
+
+    def __init__(self, data):
+        if (isinstance(data, dict)):
+            self.rows = list(data.values())
+        else:
+            self.rows = list(data) if (data) else []
+        self.transposed = None
+        self.arrays = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, key):
+        return key_path(key)[0] in self.transpose()
+
+    def __getitem__(self, key):
+        """
+        Returns
+        -------
+        np.ndarray
+            one value per row, (None or nan where a row is missing the key)
+        """
+        path = key_path(key)
+        if (path not in self.arrays):
+            self.arrays[path] = column_array(self.values(path))
+
+        return self.arrays[path]
+
+    def transpose(self):
+        if (self.transposed is None):
+            count = len(self.rows)
+            transposed = {}
+            for i, row in enumerate(self.rows):
+                for key, value in row.items():
+                    if (key not in transposed):
+                        transposed[key] = [None] * count
+                    transposed[key][i] = value
+            self.transposed = transposed
+
+        return self.transposed
+
+    def keys(self):
+        return list(self.transpose().keys())
+
+    def values(self, key):
+        """
+        Column as a plain list.
+        """
+        path = key_path(key)
+        column = self.transpose().get(path[0], [None] * len(self.rows))
+        if (len(path) == 1):
+            return column
+
+        return [dig(value, path[1:]) for value in column]
+
+
 def chunks(lst, n):
     for i in range(0, len(lst), n):
         yield lst[i:i + n]
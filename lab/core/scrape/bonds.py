@@ -3,17 +3,18 @@ import requests
 import sys
 import json
 import os
+from ..api.cache import response_cache
 
 
 def scrape3mTreasury():
     """
-    Scrapes the St Louis Fed website for the current 3m treasury yield.
+    Scrapes the St Louis Fed website for the current 3m treasury yield. The page is cached for an hour, (see api/cache.py).
     """
     headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_10_1) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/39.0.2171.95 Safari/537.36'}
     url = 'https://fred.stlouisfed.org/series/DTB3'
-    response = requests.get(url, headers=headers)
+    page = response_cache().request('treasury', url, headers=headers, parse='text')
 
-    soup = BeautifulSoup(response.text, 'html.parser')
+    soup = BeautifulSoup(page, 'html.parser')
     trate = soup.find("span", {"class": "series-meta-observation-value"}).text
 
     return float(trate)
\ No newline at end of file
@@ -0,0 +1,130 @@
+import numpy as np
+
+# In memory tick storage for streaming quotes. Every ticker gets a row of fixed size ring buffers, (one 2d array per
+# field), so appending a tick never allocates and the newest values of the whole universe are one fancy index away.
+
+
+class TickBuffers:
+    """
+    Parameters
+    ----------
+    fields      :list
+                 per tick fields, each stored as float64
+    capacity    :int
+                 ticks kept per ticker, the oldest are overwritten
+    tickers     :list
+                 tickers to allocate rows for up front, others are added as they arrive
+    """
+
+    def __init__(self, fields=['price', 'volume'], capacity=512, tickers=[]):
+        self.fields = list(fields)
+        self.capacity = capacity
+        self.index = {}
+        self.names = []
+        self.rows = 0
+        self.times = np.zeros((0, capacity), dtype=np.int64)
+        self.values = {field: np.zeros((0, capacity)) for field in self.fields}
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.grow(max(len(tickers), 64))
+        for ticker in tickers:
+            self.row(ticker)
+
+    def grow(self, rows):
+        """
+        Makes room for `rows` more tickers. Doubles at least, so adding tickers one at a time stays cheap.
+        """
+        size = max(len(self.counts) * 2, len(self.counts) + rows)
+        extra = size - len(self.counts)
+        self.times = np.vstack([self.times, np.zeros((extra, self.capacity), dtype=np.int64)])
+        for field in self.fields:
+            self.values[field] = np.vstack([self.values[field], np.full((extra, self.capacity), np.nan)])
+        self.counts = np.append(self.counts, np.zeros(extra, dtype=np.int64))
+
+    def row(self, ticker):
+        if (ticker not in self.index):
+            if (self.rows == len(self.counts)):
+                self.grow(1)
+            self.index[ticker] = self.rows
+            self.names.append(ticker)
+            self.rows += 1
+
+        return self.index[ticker]
+
+    def tickers(self):
+        """
+        Tickers in row order.
+        """
+        return self.names
+
+    def push(self, ticker, time, **values):
+        """
+        Appends one tick.
+
+        Parameters
+        ----------
+        ticker      :str
+        time        :int
+                     epoch milliseconds
+        values      :float
+                     one keyword per field, missing fields are stored as nan
+
+        Returns
+        -------
+        int
+            row of the ticker
+        """
+        row = self.row(ticker)
+        slot = self.counts[row] % self.capacity
+        self.times[row, slot] = time
+        for field in self.fields:
+            value = values.get(field)
+            self.values[field][row, slot] = np.nan if (value is None) else value
+        self.counts[row] += 1
+
+        return row
+
+    def series(self, ticker, field):
+        """
+        Buffered ticks of one ticker, oldest first.
+
+        Returns
+        -------
+        np.ndarray
+            times if field is 'time'
+        """
+        row = self.index[ticker]
+        buffer = self.times[row] if (field == 'time') else self.values[field][row]
+        count = self.counts[row]
+        if (count <= self.capacity):
+            return buffer[:count]
+
+        slot = count % self.capacity
+        return np.concatenate([buffer[slot:], buffer[:slot]])
+
+    def back(self, field, ticks=0, rows=None):
+        """
+        Value `ticks` before the newest of every ticker, (0 is the newest), nan where fewer ticks are buffered.
+
+        Parameters
+        ----------
+        field       :str
+        ticks       :int|np.ndarray
+                     at most capacity - 1, or one per row
+        rows        :np.ndarray
+                     rows to read, defaults to all
+
+        Returns
+        -------
+        np.ndarray
+        """
+        rows = np.arange(self.rows) if (rows is None) else np.asarray(rows)
+        counts = self.counts[rows]
+        slots = (counts - 1 - ticks) % self.capacity
+        buffer = self.times if (field == 'time') else self.values[field]
+        values = buffer[rows, slots].astype(np.float64)
+        values[counts <= ticks] = np.nan
+
+        return values
+
+    def latest(self, field, rows=None):
+        return self.back(field, 0, rows)
@@ -0,0 +1,368 @@
+from datetime import date, datetime, timedelta
+from dateutil.relativedelta import relativedelta
+from dotenv import load_dotenv
+import numpy as np
+import json
+import os
+from .api.historical import getHistoricalData
+load_dotenv()
+
+# Local price warehouse. Each ticker's daily bars live in one flat binary file of fixed size records, oldest first,
+# so new bars are appended to the end of the file and a read is a single np.fromfile(). A small json file next to it
+# records how far back the history goes and when the ticker was last brought up to date.
+# Analytics read the files memory mapped, (see map_bars()), so columns are views into the page cache rather than copies.
+
+BAR = np.dtype([
+    ('date', 'datetime64[D]'),
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8'),
+    ('volume', 'f8'),
+])
+
+FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+# path: ((size, mtime), np.memmap), one mapping per file shared by every reader in the process
+mappings = {}
+
+
+def warehouse_dir(sandbox=False):
+    directory = os.environ.get('PRICE_WAREHOUSE', 'lab/core/storage/prices/')
+    if (sandbox):
+        # Sandbox prices are scrambled, keep them away from real ones
+        directory = os.path.join(directory, 'sandbox/')
+    os.makedirs(directory, exist_ok=True)
+
+    return directory
+
+
+def bars_path(ticker, sandbox=False):
+    return os.path.join(warehouse_dir(sandbox), '{}.bin'.format(ticker.upper()))
+
+
+def meta_path(ticker, sandbox=False):
+    return os.path.join(warehouse_dir(sandbox), '{}.json'.format(ticker.upper()))
+
+
+def range_start(timeframe, today=None):
+    """
+    First date an IEX chart range covers.
+
+    Parameters
+    ----------
+    timeframe   :str
+                 5d, 1m, 3m, 6m, ytd, 1y, 2y, 5y or max
+    today       :datetime.date
+
+    Returns
+    -------
+    datetime.date
+
+    Raises
+    ------
+    ValueError
+        for any other timeframe, rather than quietly reading the full history
+    """
+    today = today if today else date.today()
+    starts = {
+        '5d': today - timedelta(days=7),
+        '1m': today - relativedelta(months=1),
+        '3m': today - relativedelta(months=3),
+        '6m': today - relativedelta(months=6),
+        'ytd': date(today.year, 1, 1),
+        '1y': today - relativedelta(years=1),
+        '2y': today - relativedelta(years=2),
+        '5y': today - relativedelta(years=5),
+        'max': date.min,
+    }
+
+    if (timeframe not in starts):
+        raise ValueError('Unknown timeframe {}, choose from: {}'.format(timeframe, ', '.join(starts.keys())))
+
+    return starts[timeframe]
+
+
+def tail_range(days):
+    """
+    Smallest IEX chart range that covers the last `days` calendar days.
+    """
+    for timeframe in ['5d', '1m', '3m', '6m', '1y', '2y', '5y']:
+        if (range_start(timeframe) <= date.today() - timedelta(days=days)):
+            return timeframe
+
+    return 'max'
+
+
+def bars_from_chart(chart):
+    """
+    Converts IEX chart data, (list of dicts), into warehouse bars. Missing fields are stored as nan.
+
+    Returns
+    -------
+    np.ndarray of BAR
+    """
+    bars = np.zeros(len(chart), dtype=BAR)
+    bars['date'] = [day['date'] for day in chart]
+    for field in FIELDS:
+        bars[field] = [day.get(field) if (day.get(field) is not None) else np.nan for day in chart]
+
+    return np.sort(bars, order='date')
+
+
+def bars_to_chart(bars, priceOnly=False):
+    """
+    Converts warehouse bars back into the list of dicts getHistoricalData() returns.
+    priceOnly keeps the fields of a chartCloseOnly request, (date, close and volume).
+    """
+    fields = ['close', 'volume'] if (priceOnly) else FIELDS
+    chart = []
+    for bar in bars:
+        day = {'date': str(bar['date'])}
+        for field in fields:
+            day[field] = None if np.isnan(bar[field]) else float(bar[field])
+        chart.append(day)
+
+    return chart
+
+
+def read_bars(ticker, sandbox=False):
+    """
+    Returns
+    -------
+    np.ndarray of BAR, empty if the ticker isn't stored
+    """
+    path = bars_path(ticker, sandbox)
+    if (not os.path.exists(path)):
+        return np.zeros(0, dtype=BAR)
+
+    return np.fromfile(path, dtype=BAR)
+
+
+def read_meta(ticker, sandbox=False):
+    path = meta_path(ticker, sandbox)
+    if (not os.path.exists(path)):
+        return {}
+    with open(path) as metafile:
+        return json.load(metafile)
+
+
+def write_meta(ticker, meta, sandbox=False):
+    with open(meta_path(ticker, sandbox), 'w') as metafile:
+        json.dump(meta, metafile)
+
+
+def write_bars(ticker, bars, sandbox=False):
+    # Written aside and swapped in, so existing mappings keep the old file instead of seeing it truncated
+    path = bars_path(ticker, sandbox)
+    bars.astype(BAR).tofile(path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+
+def map_bars(ticker, sandbox=False):
+    """
+    Read only memory map of a ticker's stored bars. The mapping is shared by every caller and only remade once the
+    file has changed, (a sync appended to it or rewrote it).
+
+    Returns
+    -------
+    np.memmap of BAR, oldest first, (empty np.ndarray if the ticker isn't stored)
+    """
+    path = bars_path(ticker, sandbox)
+    if (not os.path.exists(path) or os.path.getsize(path) < BAR.itemsize):
+        return np.zeros(0, dtype=BAR)
+
+    stat = os.stat(path)
+    version = (stat.st_size, stat.st_mtime_ns)
+    if (path not in mappings or mappings[path][0] != version):
+        mappings[path] = (version, np.memmap(path, dtype=BAR, mode='r', shape=(stat.st_size // BAR.itemsize,)))
+
+    return mappings[path][1]
+
+
+def append_bars(ticker, bars, sandbox=False):
+    """
+    Appends only the bars newer than the last stored bar, without reading or rewriting the rest of the file.
+
+    Returns
+    -------
+    int
+        number of bars appended
+    """
+    path = bars_path(ticker, sandbox)
+    if (os.path.exists(path) and os.path.getsize(path) >= BAR.itemsize):
+        with open(path, 'rb') as barfile:
+            barfile.seek(-BAR.itemsize, os.SEEK_END)
+            last = np.frombuffer(barfile.read(BAR.itemsize), dtype=BAR)[0]['date']
+        bars = bars[bars['date'] > last]
+
+    with open(path, 'ab') as barfile:
+        barfile.write(bars.astype(BAR).tobytes())
+
+    return len(bars)
+
+
+def adjusted_since(stored, fetched):
+    """
+    True if the first fetched bar that is already stored has a different close, (a split or other adjustment has
+    rewritten the history since it was stored).
+
+    Parameters
+    ----------
+    stored      :np.ndarray of BAR
+    fetched     :np.ndarray of BAR
+    """
+    overlap = fetched[fetched['date'] <= stored['date'][-1]]
+    if (not len(overlap)):
+        return False
+    i = np.searchsorted(stored['date'], overlap['date'][0])
+    if (i >= len(stored) or stored['date'][i] != overlap['date'][0]):
+        return False
+
+    return not np.isclose(stored['close'][i], overlap['close'][0], rtol=1e-4, equal_nan=True)
+
+
+def sync_ticker(ticker, timeframe='1y', sandbox=False):
+    """
+    Brings a ticker's stored history up to date, fetching as little as possible:
+    nothing if it was already synced today, only the missing tail if the history already reaches back far enough,
+    or the full timeframe if it doesn't. A tail whose overlap with the stored bars disagrees means the history was
+    adjusted, (split), so the full stored range is fetched again and rewritten.
+    The ticker is only marked as updated today once a fetch succeeds, so a failed one is retried on the next read.
+
+    Returns
+    -------
+    bool
+        False if IEX returned nothing for a ticker that isn't stored
+    """
+    meta = read_meta(ticker, sandbox)
+    today = date.today()
+    stored_start = date.fromisoformat(meta['start']) if (meta.get('start')) else None
+
+    if (not stored_start or range_start(timeframe) < stored_start or not os.path.exists(bars_path(ticker, sandbox))):
+        chart = getHistoricalData(ticker, timeframe, sandbox=sandbox)
+        if (not isinstance(chart, list) or not chart):
+            return False
+        write_bars(ticker, bars_from_chart(chart), sandbox)
+        meta['start'] = str(range_start(timeframe))
+    elif (meta.get('updated') != str(today)):
+        bars = map_bars(ticker, sandbox)
+        gap = (today - bars['date'][-1].astype(date)).days if (len(bars)) else 365
+        if (gap > 0):
+            chart = getHistoricalData(ticker, tail_range(gap), sandbox=sandbox)
+            if (not isinstance(chart, list) or not chart):
+                return True
+            tail = bars_from_chart(chart)
+            if (len(bars) and adjusted_since(bars, tail)):
+                chart = getHistoricalData(ticker, tail_range((today - stored_start).days), sandbox=sandbox)
+                if (not isinstance(chart, list) or not chart):
+                    return True
+                full = bars_from_chart(chart)
+                write_bars(ticker, full[full['date'] >= np.datetime64(stored_start)], sandbox)
+            else:
+                append_bars(ticker, tail, sandbox)
+
+    meta['updated'] = str(today)
+    write_meta(ticker, meta, sandbox)
+
+    return True
+
+
+def getWarehouseBars(ticker, timeframe='1y', sandbox=False):
+    """
+    Synced bars of a ticker for a timeframe, as a structured array.
+
+    Returns
+    -------
+    np.ndarray of BAR, oldest first, (a view of the shared memory map, see map_bars())
+    """
+    if (not sync_ticker(ticker, timeframe, sandbox)):
+        return np.zeros(0, dtype=BAR)
+
+    bars = map_bars(ticker, sandbox)
+    if (timeframe == '5d'):
+        return bars[-5:]
+
+    # Bars are sorted by date, so the timeframe is a slice of the mapping rather than a masked copy
+    return bars[np.searchsorted(bars['date'], np.datetime64(range_start(timeframe))):]
+
+
+def price_arrays(bars, newest=False):
+    """
+    Column views of warehouse bars. Nothing is copied: columns are strided views of the bars and newest first
+    is a reversed view.
+
+    Parameters
+    ----------
+    bars        :np.ndarray of BAR
+    newest      :bool
+                 newest bar first, (the order most of the analytics expect)
+
+    Returns
+    -------
+    dict
+        date as int64 days since 1970-01-01, open, high, low, close and volume as float64
+    """
+    step = -1 if (newest) else 1
+    columns = {'date': bars['date'].view('int64')[::step]}
+    for field in FIELDS:
+        columns[field] = bars[field][::step]
+
+    return columns
+
+
+def nonzero(column):
+    """
+    Masks zero and missing values of a column in place of removeZeroes(), without copying the column.
+
+    Returns
+    -------
+    np.ma.MaskedArray
+    """
+    return np.ma.masked_array(column, mask=(column == 0) | np.isnan(column), copy=False)
+
+
+def day_strings(days):
+    """
+    int64 days since 1970-01-01 as YYYY-MM-DD strings.
+    """
+    return np.datetime_as_string(np.asarray(days).astype('datetime64[D]'), unit='D')
+
+
+def getWarehouseArrays(ticker, timeframe='1y', newest=False, sandbox=False):
+    """
+    Synced bars of a ticker for a timeframe as column arrays, read straight from the memory mapped warehouse file.
+
+    Parameters
+    ----------
+    ticker      :str
+    timeframe   :str
+    newest      :bool
+                 newest bar first
+    sandbox     :bool
+
+    Returns
+    -------
+    dict of np.ndarray, (see price_arrays())
+    """
+    return price_arrays(getWarehouseBars(ticker, timeframe, sandbox), newest)
+
+
+def getWarehouseData(ticker, timeframe='1y', priceOnly=False, sandbox=False):
+    """
+    Drop-in replacement for getHistoricalData() that reads from the local warehouse.
+    Only bars missing from disk are fetched. Full OHLCV is always stored, priceOnly trims what is returned.
+
+    Parameters
+    ----------
+    ticker      :str
+    timeframe   :str
+    priceOnly   :bool
+                 date, close and volume only, (as chartCloseOnly returns them)
+    sandbox     :bool
+
+    Returns
+    -------
+    list of dicts, oldest first, (the same shape as getHistoricalData())
+    """
+    return bars_to_chart(getWarehouseBars(ticker, timeframe, sandbox), priceOnly)
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0002_remove_watchlist_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HurstResult',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticker', models.CharField(max_length=30)),
+                ('date', models.DateField()),
+                ('timeframe', models.CharField(max_length=10)),
+                ('estimator', models.CharField(default='rs', max_length=20)),
+                ('section', models.CharField(max_length=50)),
+                ('hurstExponent', models.FloatField(null=True)),
+                ('fractalDimension', models.FloatField(null=True)),
+                ('rSquared', models.FloatField(null=True)),
+                ('pValue', models.FloatField(null=True)),
+                ('standardError', models.FloatField(null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ticker', 'date'], name='database_hu_ticker_6fdc40_idx'), models.Index(fields=['hurstExponent'], name='database_hu_hurstEx_c308d2_idx')],
+                'unique_together': {('ticker', 'date', 'timeframe', 'estimator', 'section')},
+            },
+        ),
+    ]
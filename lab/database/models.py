@@ -30,5 +30,22 @@ class Watchlist(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
 
+class HurstResult(models.Model):
+    ticker = models.CharField(max_length=30)
+    date = models.DateField()
+    timeframe = models.CharField(max_length=10)
+    estimator = models.CharField(max_length=20, default='rs')
+    section = models.CharField(max_length=50)
+    hurstExponent = models.FloatField(null=True)
+    fractalDimension = models.FloatField(null=True)
+    rSquared = models.FloatField(null=True)
+    pValue = models.FloatField(null=True)
+    standardError = models.FloatField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
 
-    
+    class Meta:
+        unique_together = ('ticker', 'date', 'timeframe', 'estimator', 'section')
+        indexes = [
+            models.Index(fields=['ticker', 'date']),
+            models.Index(fields=['hurstExponent']),
+        ]
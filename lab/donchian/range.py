@@ -1,8 +1,8 @@
 import json
 import sys
-from ..core.functions import extract_data
+from ..core.functions import Columns
 from ..redisdb.controller import rdb_save_output
-from ..core.api.historical import getHistoricalData
+from ..core.warehouse import getWarehouseData
 from ..core.api.stats import getCurrentPrice
 from .export import exportDonchian
 from ..core.output import printTabs
@@ -10,17 +10,16 @@ from ..fintwit.tweet import send_tweet, translate_data
 
 
 def calculate(ticker, days=30, sendtweet=False):
-    asset_data = getHistoricalData(ticker, '1m')
+    asset_data = getWarehouseData(ticker, '1m')
 
-    prices = extract_data(asset_data, 'close')
-    highs = extract_data(asset_data, 'high')
-    lows = extract_data(asset_data, 'low')
-    dates = extract_data(asset_data, 'date')
+    columns = Columns(asset_data)
+    highs = columns['high'][::-1]
+    lows = columns['low'][::-1]
 
     donchian_range = {
-        'donchianHigh': max(list(reversed(highs))[:days]),
+        'donchianHigh': float(highs[:days].max()),
         'currentPrice': getCurrentPrice(ticker),
-        'donchianLow': min(list(reversed(lows))[:days])
+        'donchianLow': float(lows[:days].min())
     }
 
     #rdb_save_output(donchian_range)
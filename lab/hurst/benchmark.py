@@ -0,0 +1,221 @@
+import time
+import tracemalloc
+import numpy as np
+import colored
+from colored import stylize
+from ..core.output import printFullTable
+from .functions import exponential_scales, returns_calculator, deviations_calculator, running_totals_calculator, chunked_range, chunked_devs, chunks
+from .fractal_calculator import range_stats_calculator
+from .engine import simple_returns, rescaled_range_stats
+from .estimators import ESTIMATORS, estimate_hurst
+
+
+def fractional_gaussian_noise(n, hurst, seed=0):
+    """
+    Exact fractional gaussian noise with a known hurst exponent, using the Davies-Harte circulant embedding.
+    O(n log n), so a million points take well under a second.
+
+    Parameters
+    ----------
+    n       :int
+             number of points
+    hurst   :float
+             0 < hurst < 1
+    seed    :int
+
+    Returns
+    -------
+    np.ndarray
+    """
+    rng = np.random.default_rng(seed)
+    k = np.arange(n + 1)
+    autocovariance = 0.5 * (np.abs(k + 1) ** (2 * hurst) - 2 * np.abs(k) ** (2 * hurst) + np.abs(k - 1) ** (2 * hurst))
+    circulant = np.concatenate([autocovariance, autocovariance[-2:0:-1]])
+    eigenvalues = np.clip(np.fft.fft(circulant).real, 0, None)
+
+    m = len(circulant)
+    noise = rng.normal(size=m) + 1j * rng.normal(size=m)
+
+    return np.fft.fft(np.sqrt(eigenvalues / m) * noise).real[:n]
+
+
+def fractional_brownian_motion(n, hurst, seed=0):
+    """
+    Fractional brownian motion, the running total of fractional_gaussian_noise().
+    """
+    return np.cumsum(fractional_gaussian_noise(n, hurst, seed))
+
+
+def synthetic_prices(n, hurst, seed=0, volatility=0.01):
+    """
+    Builds a price series shaped like getHistoricalData() output, (list of dicts, oldest first),
+    whose log prices follow fractional brownian motion.
+
+    Returns
+    -------
+    list of dicts
+    """
+    closes = 100 * np.exp(volatility * fractional_brownian_motion(n, hurst, seed))
+    dates = np.arange(np.datetime64('1970-01-01'), np.datetime64('1970-01-01') + n).astype(str)
+
+    return [{'date': day, 'close': float(close)} for day, close in zip(dates, closes)]
+
+
+def measure(function, *args, repeat=3):
+    """
+    Best wall time of several runs, then one more run under tracemalloc for peak memory.
+
+    Returns
+    -------
+    float, float
+        seconds, peak memory in MB
+    """
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    function(*args)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(times), peak / 1000000
+
+
+def check_deviations(returns, scales):
+    """
+    Regression check of deviations_calculator() against the chunk by chunk definition, (each return less the plain
+    mean of its own chunk), on every scale. Raises AssertionError on any mismatch.
+    """
+    if (len(scales) < 2):
+        raise ValueError('Need more than one scale to check every chunk size')
+
+    deviations = deviations_calculator(returns, scales)
+    for scale, days in scales.items():
+        expected = []
+        for chunk in chunks(returns, days):
+            mean = sum(chunk) / len(chunk)
+            expected.extend(float(value) - mean for value in chunk)
+
+        assert len(deviations[scale]) == len(expected), 'Scale {}: {} deviations, expected {}'.format(
+            scale, len(deviations[scale]), len(expected))
+        assert np.allclose(deviations[scale], expected, rtol=1e-9, atol=1e-12), 'Scale {}: deviations differ'.format(scale)
+
+    return deviations
+
+
+def check_engine(prices, scales):
+    """
+    Checks the legacy rescaled range pipeline, (returns, deviations, running totals, ranges and stdevs chunk by chunk,
+    see collect_key_stats() before the engine), and rescaled_range_stats() agree on every scale. Raises AssertionError
+    on any mismatch, so timings are never reported for paths that give different answers.
+    """
+    returns = returns_calculator(prices)
+    running_totals = running_totals_calculator(check_deviations(returns, scales), scales)
+    range_stats = rescaled_range_stats(simple_returns(prices), scales)
+
+    for scale, days in scales.items():
+        ranges = chunked_range(running_totals[scale], days)['range']
+        stDevs = chunked_devs(returns, days)
+        rescaleRanges = [(value / stDevs[i] if (stDevs[i] != 0) else 0) for i, value in ranges.items()]
+
+        engine = range_stats[scale]['rescaleRanges']
+        assert len(engine) == len(rescaleRanges), 'Scale {}: engine has {} chunks, legacy {}'.format(
+            scale, len(engine), len(rescaleRanges))
+        assert np.allclose(engine, rescaleRanges, rtol=1e-7), 'Scale {}: rescaled ranges differ'.format(scale)
+        assert np.isclose(range_stats[scale]['keyStats']['rescaleRangeAvg'], np.mean(rescaleRanges), rtol=1e-7), \
+            'Scale {}: rescaled range averages differ'.format(scale)
+
+
+def benchmark_hot_path(sizes, hurst=0.7, repeat=3, seed=0):
+    """
+    Times each step of the rescaled range pipeline on synthetic prices, once the legacy and engine paths are checked
+    to agree, (see check_engine()).
+
+    Returns
+    -------
+    list of dicts
+    """
+    results = []
+    for size in sizes:
+        asset_prices = synthetic_prices(size, hurst, seed)
+        prices = list(reversed([day['close'] for day in asset_prices]))
+        scales = exponential_scales(len(prices), 2, 6)
+        check_engine(prices, scales)
+        returns = returns_calculator(prices)
+        deviations = deviations_calculator(returns, scales)
+        running_totals = running_totals_calculator(deviations, scales)
+        smallest = list(scales.keys())[-1]
+
+        steps = [
+            ('returns_calculator', returns_calculator, (prices,)),
+            ('deviations_calculator', deviations_calculator, (returns, scales)),
+            ('running_totals_calculator', running_totals_calculator, (deviations, scales)),
+            ('chunked_range', chunked_range, (running_totals[smallest], scales[smallest])),
+            ('collect_key_stats', range_stats_calculator, (asset_prices,)),
+        ]
+        for name, function, args in steps:
+            seconds, peak = measure(function, *args, repeat=repeat)
+            results.append({
+                'function': name,
+                'size': size,
+                'seconds': round(seconds, 5),
+                'pointsPerSecond': int(size / seconds) if (seconds > 0) else 0,
+                'peakMemoryMB': round(peak, 2),
+            })
+
+    return results
+
+
+def benchmark_estimators(sizes, hurst=0.7, samples=10, seed=0):
+    """
+    Bias of every estimator against the known hurst exponent of the synthetic series.
+
+    Returns
+    -------
+    list of dicts
+    """
+    results = []
+    for size in sizes:
+        series = [0.01 * fractional_gaussian_noise(size, hurst, seed + i) for i in range(samples)]
+        for estimator, spec in ESTIMATORS.items():
+            start = time.perf_counter()
+            estimates = [estimate_hurst(returns, estimator) for returns in series]
+            seconds = (time.perf_counter() - start) / samples
+
+            results.append({
+                'estimator': estimator,
+                'size': size,
+                'trueH': hurst,
+                'meanH': round(float(np.mean(estimates)), 3),
+                'bias': round(float(np.mean(estimates)) - hurst, 3),
+                'stDev': round(float(np.std(estimates)), 3),
+                'seconds': round(seconds, 5),
+            })
+
+    return results
+
+
+def run_benchmarks(sizes=[1000, 10000, 100000, 1000000], hurst=0.7, repeat=3, samples=10, seed=0):
+    """
+    Offline benchmark of lab/hurst. Never calls getHistoricalData(), every series is generated with a known hurst exponent.
+
+    Parameters
+    ----------
+    sizes     :list
+               number of points in each synthetic series
+    hurst     :float
+               true hurst exponent of the synthetic series
+    repeat    :int
+               timing runs per function, the best is reported
+    samples   :int
+               series per size used to measure estimator bias
+    seed      :int
+    """
+    print(stylize("Benchmarking hot path...", colored.fg("yellow")))
+    printFullTable(benchmark_hot_path(sizes, hurst, repeat, seed), struct='dictlist', widths=2)
+
+    print(stylize("Benchmarking estimators...", colored.fg("yellow")))
+    printFullTable(benchmark_estimators(sizes, hurst, samples, seed), struct='dictlist')
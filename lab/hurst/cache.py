@@ -0,0 +1,139 @@
+import hashlib
+import json
+import time
+import redis
+from ..redisdb.connection import rdb_connection
+from datetime import datetime, timedelta
+
+# Results are content addressed: 'hurst-{digest}' where the digest is a hash of the price series and every parameter
+# that changes the calculation. A pointer per ticker, 'stock-{ticker}-hurst-{timeframe}-{estimator}', remembers the
+# digest of the last run and its last bar date until the end of the day, so repeat runs skip the IEX fetch entirely.
+
+CACHE_VERSION = 1
+RESULT_TTL = 7 * 24 * 60 * 60
+MAX_RESULTS = 500
+LRU_KEY = 'hurst-lru'
+
+
+def cache_connection():
+    return rdb_connection()
+
+
+def pointer_key(ticker, timeframe, estimator):
+    return 'stock-{}-hurst-{}-{}'.format(ticker, timeframe, estimator)
+
+
+def result_digest(asset_prices, params):
+    """
+    Hash of the price series and calculation parameters.
+
+    Parameters
+    ----------
+    asset_prices :np.ndarray|list
+                  warehouse bars or list of dicts of historical prices as returned by getHistoricalData()
+    params       :dict
+                  everything else the results depend on, (estimator, scales...)
+
+    Returns
+    -------
+    str
+    """
+    digest = hashlib.sha1()
+    digest.update(json.dumps(dict(params, version=CACHE_VERSION), sort_keys=True).encode())
+    for day in asset_prices:
+        digest.update('{},{};'.format(day['date'], day['close']).encode())
+
+    return digest.hexdigest()
+
+
+def pack_results(scales, fractal_results):
+    return json.dumps({'scales': scales, 'fractalResults': fractal_results})
+
+
+def unpack_results(blob):
+    """
+    json turns the integer scale keys into strings, they are turned back here so output.py can look them up.
+    """
+    cached = json.loads(blob)
+    scales = {int(scale): days for scale, days in cached['scales'].items()}
+    fractal_results = cached['fractalResults']
+    if ('rescaleRange' in fractal_results):
+        fractal_results['rescaleRange'] = {int(scale): rr for scale, rr in fractal_results['rescaleRange'].items()}
+
+    return scales, fractal_results
+
+
+def fetch_cached_results(ticker, timeframe, estimator):
+    """
+    Results of today's last run for the ticker, without fetching prices.
+
+    Returns
+    -------
+    dict, dict|None
+        scales and fractal results, or None on a miss
+    """
+    try:
+        r = cache_connection()
+        pointer = r.get(pointer_key(ticker, timeframe, estimator))
+        if (not pointer):
+            return None
+
+        digest = json.loads(pointer)['digest']
+        blob = r.get('hurst-' + digest)
+        if (not blob):
+            return None
+        r.zadd(LRU_KEY, {digest: time.time()})
+    except redis.exceptions.ConnectionError:
+        return None
+
+    return unpack_results(blob)
+
+
+def fetch_results(digest):
+    """
+    Results previously calculated on exactly the same prices and parameters.
+
+    Returns
+    -------
+    dict, dict|None
+    """
+    try:
+        r = cache_connection()
+        blob = r.get('hurst-' + digest)
+        if (not blob):
+            return None
+        r.zadd(LRU_KEY, {digest: time.time()})
+    except redis.exceptions.ConnectionError:
+        return None
+
+    return unpack_results(blob)
+
+
+def save_results(ticker, timeframe, estimator, digest, last_bar, scales, fractal_results, ttl=RESULT_TTL, limit=MAX_RESULTS):
+    """
+    Stores results under their digest and points the ticker at them until midnight.
+    Results expire after `ttl` seconds, and only the `limit` most recently used are kept.
+
+    Returns
+    -------
+    bool
+    """
+    midnight = datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time())
+    try:
+        r = cache_connection()
+        pipe = r.pipeline()
+        pipe.set('hurst-' + digest, pack_results(scales, fractal_results), ex=ttl)
+        pipe.set(pointer_key(ticker, timeframe, estimator), json.dumps({'digest': digest, 'lastBar': last_bar}))
+        pipe.expireat(pointer_key(ticker, timeframe, estimator), midnight)
+        pipe.zadd(LRU_KEY, {digest: time.time()})
+        pipe.execute()
+
+        # Least recently used results beyond the limit are evicted
+        evicted = r.zrange(LRU_KEY, 0, -(limit + 1))
+        if (evicted):
+            r.delete(*['hurst-' + old for old in evicted])
+            r.zrem(LRU_KEY, *evicted)
+    except redis.exceptions.ConnectionError:
+        return False
+
+    return True
@@ -0,0 +1,198 @@
+import math
+import numpy as np
+from .functions import prefix_index, chunk_bounds, index_means, index_variances
+
+
+def simple_returns(prices):
+    """
+    Vectorized version of returns_calculator(). Calculates daily returns of prices in array.
+
+    Parameters
+    ----------
+    prices    :np.ndarray|list
+                total list of prices
+                *Make sure prices are ordered in descending order*
+
+    Returns
+    -------
+    np.ndarray
+        Array of daily returns based on list of prices.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    return prices[:-1] / prices[1:] - 1
+
+
+def rescaled_range(returns, days, index=None):
+    """
+    Vectorized rescaled range of a single scale, read off a prefix_index() of the returns. Chunk means and stDevs
+    come straight from the prefix sums, and so do the running totals of deviations within each chunk, so building
+    the index once per series serves every scale, (and every section cut from those scales).
+
+    A trailing chunk of a single item has no range of its own, so it is left out of the ranges, (see chunked_range()).
+
+    Parameters
+    ----------
+    returns   :np.ndarray
+                full array of returns
+    days      :int
+                number of items in each chunk
+    index     :dict
+                prefix_index() of returns, pass one in to share it between scales
+
+    Returns
+    -------
+    dict of arrays: means, stDevs, minimums, maximums, ranges, rescaleRanges
+    """
+    index = index if index else prefix_index(returns)
+    count = index['count']
+    starts, ends = chunk_bounds(count, days)
+    means = index_means(index, starts, ends)
+    stDevs = np.sqrt(index_variances(index, starts, ends))
+
+    # Running total of deviations from the chunk mean at every item, as chunks() and cumsum would give it
+    positions = np.arange(count)
+    chunk = positions // days
+    running_totals = (index['sums'][1:] - index['sums'][starts][chunk]) - (positions - starts[chunk] + 1) * means[chunk]
+    minimums = np.minimum.reduceat(running_totals, starts)
+    maximums = np.maximum.reduceat(running_totals, starts)
+
+    stats = {
+        'means': means,
+        'stDevs': stDevs,
+        'minimums': minimums,
+        'maximums': maximums,
+        'ranges': maximums - minimums,
+    }
+
+    if (count % days == 1 and count > days):
+        for key in ['minimums', 'maximums', 'ranges']:
+            stats[key] = stats[key][:-1]
+
+    stDevs = stDevs[:len(stats['ranges'])]
+    safe = np.where(stDevs != 0, stDevs, 1)
+    stats['rescaleRanges'] = np.where(stDevs != 0, stats['ranges'] / safe, 0)
+
+    return stats
+
+
+def key_stats(rescaleRanges, days):
+    """
+    Key stats for fractal calculations of a single scale.
+
+    Parameters
+    ----------
+    rescaleRanges :np.ndarray
+                    rescaled range of each chunk in scale
+    days          :int
+                    number of items in each chunk
+
+    Returns
+    -------
+    dict
+    """
+    rescaleRangeAvg = float(np.mean(rescaleRanges))
+
+    return {
+        'rescaleRangeAvg': rescaleRangeAvg,  # This is the rescaled range
+        'size': days,
+        'logRR': math.log10(rescaleRangeAvg) if (rescaleRangeAvg > 0) else 0,
+        'logScale': math.log10(days),
+    }
+
+
+def rescaled_range_stats(returns, scales):
+    """
+    Array-backed replacement for building range_stats chunk by chunk. Produces the same structure collect_key_stats()
+    has always returned, with each chunked statistic held as an array rather than a dict keyed by chunk index.
+
+    Parameters
+    ----------
+    returns   :np.ndarray|list
+                full list of returns
+    scales    :dict
+                scales dict object returned from either exponential_scales() or linear_scales()
+
+    Returns
+    -------
+    dict
+        range stats keyed by scale, each containing chunked stats and keyStats
+    """
+    index = prefix_index(returns)
+    range_stats = {}
+    for scale, days in scales.items():
+        range_stats[scale] = rescaled_range(returns, days, index)
+        range_stats[scale]['keyStats'] = key_stats(range_stats[scale]['rescaleRanges'], days)
+
+    return range_stats
+
+
+def batch_linregress(xs, ys):
+    """
+    Least squares regression of many small series in one vectorized call, with the same results as calling
+    scipy.stats.linregress() on each, (except a flat y, which gets an r of 0 rather than nan, and a p-value of nan).
+    Series can be of different lengths, (ex: halves and thirds of the scales), they are padded and masked
+    so every sum is taken over a single 2d array. Stack the sections of every ticker to regress a whole scan at once.
+
+    Parameters
+    ----------
+    xs    :list
+            list of x series, (usually log10 scales)
+    ys    :list
+            list of y series, (usually log10 rescaled ranges)
+
+    Returns
+    -------
+    dict of arrays: slope, intercept, rvalue, pvalue, stderr, one item per series
+    """
+    from scipy.stats import t as student_t
+
+    lengths = np.array([len(x) for x in xs])
+    mask = np.arange(lengths.max()) < lengths[:, None]
+    x = np.zeros(mask.shape)
+    y = np.zeros(mask.shape)
+    x[mask] = np.concatenate([np.asarray(series, dtype=np.float64) for series in xs])
+    y[mask] = np.concatenate([np.asarray(series, dtype=np.float64) for series in ys])
+
+    xmean = x.sum(axis=1) / lengths
+    ymean = y.sum(axis=1) / lengths
+    dx = np.where(mask, x - xmean[:, None], 0)
+    dy = np.where(mask, y - ymean[:, None], 0)
+    ssxm = (dx * dx).sum(axis=1) / lengths
+    ssym = (dy * dy).sum(axis=1) / lengths
+    ssxym = (dx * dy).sum(axis=1) / lengths
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # No variance in x or y means no correlation
+        r = np.where((ssxm != 0) & (ssym != 0), ssxym / np.sqrt(ssxm * ssym), 0.0)
+        r = np.clip(r, -1.0, 1.0)
+        slope = ssxym / ssxm
+        intercept = ymean - slope * xmean
+
+        df = np.maximum(lengths - 2, 1)
+        TINY = 1.0e-20
+        tvalue = r * np.sqrt(df / ((1.0 - r + TINY) * (1.0 + r + TINY)))
+        pvalue = 2 * student_t.sf(np.abs(tvalue), df)
+        stderr = np.sqrt(np.clip((1 - r ** 2) * ssym / ssxm / df, 0, None))
+
+    # A line through two points is a perfect fit
+    pair = lengths == 2
+    pvalue[pair] = 0.0
+    stderr[pair] = 0.0
+    # A flat y has no correlation to test, (compared exactly, the mean of equal floats can be off by an ulp)
+    flat = np.where(mask, y, np.inf).min(axis=1) == np.where(mask, y, -np.inf).max(axis=1)
+    r[flat] = 0.0
+    pvalue[flat] = np.nan
+    stderr[flat] = 0.0
+    # and a single point has no line at all
+    single = lengths < 2
+    r[single] = np.nan
+    pvalue[single] = np.nan
+    stderr[single] = np.nan
+
+    return {
+        'slope': slope,
+        'intercept': intercept,
+        'rvalue': r,
+        'pvalue': pvalue,
+        'stderr': stderr,
+    }
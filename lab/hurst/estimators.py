@@ -0,0 +1,268 @@
+import math
+import numpy as np
+from .functions import exponential_scales, prefix_index
+from .engine import rescaled_range
+
+# Each estimator measures a statistic of the return series at several scales. The hurst exponent is taken from the
+# slope of log10(statistic) against log10(scale), and every estimator knows how to translate its slope into H.
+# All of them are vectorized, O(n) per scale. Every estimator measures 6 scales, so they all share the sections of
+# rescaled range, and 'minimum' is the shortest series, (in prices), that fills all 6, (for rescaled range, with chunks
+# of at least 2 returns, a single return has no range).
+
+
+def log_scales(minimum, maximum, limit=6):
+    """
+    Log-spaced integer scales between minimum and maximum, largest first, (the same order as exponential_scales()).
+    Where rounding puts two small scales on the same integer, the smaller ones are spread out one apart instead, so
+    there are always `limit` distinct scales and every estimator gets the same sections as rescaled range.
+
+    Parameters
+    ----------
+    minimum   :int
+    maximum   :int
+    limit     :int
+                number of scales
+
+    Returns
+    -------
+    list of ints
+
+    Raises
+    ------
+    ValueError
+        when there are fewer than `limit` integers between minimum and maximum, (the series is too short)
+    """
+    if (maximum - minimum + 1 < limit):
+        raise ValueError('Need {} scales between {} and {}'.format(limit, minimum, maximum))
+
+    sizes = np.round(np.logspace(math.log10(minimum), math.log10(maximum), limit)).astype(int)
+    # Largest first, each scale at least one below the one above it, never below the rung it needs to leave room for
+    for i in reversed(range(limit - 1)):
+        sizes[i] = max(minimum + i, min(sizes[i], sizes[i + 1] - 1))
+
+    return [int(size) for size in reversed(sizes)]
+
+
+def rescaled_range_estimator(returns, sizes):
+    """
+    Classic rescaled range, (see engine.py). Slope = H
+    """
+    index = prefix_index(returns)
+    statistics = []
+    for days in sizes:
+        statistics.append(float(np.mean(rescaled_range(returns, days, index)['rescaleRanges'])))
+
+    return statistics
+
+
+def dfa_estimator(returns, sizes):
+    """
+    Detrended fluctuation analysis, (DFA-1).
+    The profile (running total of deviations from the mean) is cut into boxes, a linear trend is removed from each box,
+    and the fluctuation is the root mean square of what is left. Slope = H
+    """
+    profile = np.cumsum(returns - returns.mean())
+    statistics = []
+    for size in sizes:
+        boxes = len(profile) // size
+        matrix = profile[:boxes * size].reshape(boxes, size)
+
+        # Least squares line through every box at once
+        t = np.arange(size) - (size - 1) / 2
+        slopes = (matrix * t).sum(axis=1) / (t ** 2).sum()
+        residuals = matrix - matrix.mean(axis=1)[:, None] - slopes[:, None] * t
+
+        statistics.append(math.sqrt(np.mean(residuals ** 2)))
+
+    return statistics
+
+
+def variogram_estimator(returns, sizes):
+    """
+    Variogram of the price path, (order 2). Half the mean squared change over each lag. Slope = 2H
+    """
+    path = np.concatenate([[0], np.cumsum(returns)])
+    statistics = []
+    for lag in sizes:
+        statistics.append(0.5 * np.mean((path[lag:] - path[:-lag]) ** 2))
+
+    return statistics
+
+
+def madogram_estimator(returns, sizes):
+    """
+    Madogram of the price path, (order 1). The mean absolute change over each lag.
+    Less sensitive to the fat tails of returns than the variogram. Slope = H
+    """
+    path = np.concatenate([[0], np.cumsum(returns)])
+    statistics = []
+    for lag in sizes:
+        statistics.append(np.mean(np.abs(path[lag:] - path[:-lag])))
+
+    return statistics
+
+
+def aggregated_variance_estimator(returns, sizes):
+    """
+    Aggregated variance. The variance of the mean return of blocks of each size. Slope = 2H - 2
+    """
+    statistics = []
+    for size in sizes:
+        blocks = len(returns) // size
+        means = returns[:blocks * size].reshape(blocks, size).mean(axis=1)
+        statistics.append(means.var(ddof=1))
+
+    return statistics
+
+
+def wavelet_estimator(returns, sizes):
+    """
+    Haar wavelet variance. Detail coefficients are built level by level, halving the series each time, (O(n) in total).
+    Sizes are the dyadic scales 2**level. Slope = 2H - 1
+    """
+    levels = int(math.log2(max(sizes)))
+    approximation = returns[:len(returns) - len(returns) % (2 ** levels)]
+    variances = {}
+    for level in range(1, levels + 1):
+        details = (approximation[0::2] - approximation[1::2]) / math.sqrt(2)
+        approximation = (approximation[0::2] + approximation[1::2]) / math.sqrt(2)
+        variances[2 ** level] = np.mean(details ** 2)
+
+    return [variances[size] for size in sizes]
+
+
+ESTIMATORS = {
+    'rs': {
+        'name': 'Rescaled Range',
+        'function': rescaled_range_estimator,
+        'hurst': lambda slope: slope,
+        'scales': lambda count: list(exponential_scales(count, 2, 6).values()),
+        'minimum': 64,
+    },
+    'dfa': {
+        'name': 'Detrended Fluctuation',
+        'function': dfa_estimator,
+        'hurst': lambda slope: slope,
+        'scales': lambda count: log_scales(8, count // 4),
+        'minimum': 52,
+    },
+    'variogram': {
+        'name': 'Variogram',
+        'function': variogram_estimator,
+        'hurst': lambda slope: slope / 2,
+        'scales': lambda count: log_scales(1, min(64, count // 8)),
+        'minimum': 48,
+    },
+    'madogram': {
+        'name': 'Madogram',
+        'function': madogram_estimator,
+        'hurst': lambda slope: slope,
+        'scales': lambda count: log_scales(1, min(64, count // 8)),
+        'minimum': 48,
+    },
+    'aggvar': {
+        'name': 'Aggregated Variance',
+        'function': aggregated_variance_estimator,
+        'hurst': lambda slope: 1 + slope / 2,
+        'scales': lambda count: log_scales(2, count // 8),
+        'minimum': 56,
+    },
+    'wavelet': {
+        'name': 'Wavelet Variance',
+        'function': wavelet_estimator,
+        'hurst': lambda slope: (slope + 1) / 2,
+        'scales': lambda count: [2 ** level for level in reversed(range(1, 7))],
+        'minimum': 128,
+    },
+}
+
+
+def check_history(count, estimator='rs'):
+    """
+    Raises ValueError when a series of `count` prices is too short for all of the estimator's scales.
+    """
+    minimum = ESTIMATORS[estimator]['minimum']
+    if (count < minimum):
+        raise ValueError('{} needs at least {} prices, got {}'.format(ESTIMATORS[estimator]['name'], minimum, count))
+
+
+def estimator_scales(count, estimator='rs'):
+    """
+    Default scales of an estimator for a series of `count` items.
+
+    Returns
+    -------
+    dict
+        Dictionary of scales and number of items inside each scale, (same structure as exponential_scales())
+
+    Raises
+    ------
+    ValueError
+        when the series is too short, (see check_history())
+    """
+    check_history(count, estimator)
+    scales = {}
+    for i, size in enumerate(ESTIMATORS[estimator]['scales'](count)):
+        scales[i + 1] = size
+
+    return scales
+
+
+def scale_statistics(returns, sizes, estimator='rs'):
+    """
+    Measures the estimator's statistic of the returns at each scale.
+
+    Parameters
+    ----------
+    returns    :np.ndarray|list
+    sizes      :list
+                chunk sizes, box sizes or lags depending on the estimator
+    estimator  :str
+                key of ESTIMATORS
+
+    Returns
+    -------
+    np.ndarray, np.ndarray
+        log10 scales and log10 statistics, ready for linear regression
+
+    Raises
+    ------
+    ValueError
+        when a statistic isn't positive, (it has no log, ex: a flat series), rather than regressing a made up point
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    statistics = np.asarray(ESTIMATORS[estimator]['function'](returns, sizes), dtype=np.float64)
+    if (not np.all(statistics > 0)):
+        bad = [int(size) for size, statistic in zip(sizes, statistics) if (not statistic > 0)]
+        raise ValueError('{} is not positive at scales {}'.format(ESTIMATORS[estimator]['name'], bad))
+
+    return np.log10(sizes), np.log10(statistics)
+
+
+def estimate_hurst(returns, estimator='rs', sizes=None):
+    """
+    Single hurst exponent of a return series with any estimator.
+
+    Parameters
+    ----------
+    returns    :np.ndarray|list
+    estimator  :str
+                key of ESTIMATORS
+    sizes      :list
+                defaults to the estimator's own scales, sized by the number of prices the returns came from
+
+    Returns
+    -------
+    float
+
+    Raises
+    ------
+    ValueError
+        when the series is too short, (see check_history()), or a statistic isn't positive
+    """
+    if (sizes is None):
+        sizes = list(estimator_scales(len(returns) + 1, estimator).values())
+    x, y = scale_statistics(returns, sizes, estimator)
+    slope = np.polyfit(x, y, 1)[0]
+
+    return float(ESTIMATORS[estimator]['hurst'](slope))
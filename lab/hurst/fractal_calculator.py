@@ -1,12 +1,14 @@
 import statistics
-from scipy import stats
 from datetime import datetime
 import math
-from ..core.functions import extract_data
 from ..core.api.stats import getCurrentPrice
-from ..core.api.historical import getHistoricalData
+from ..core.warehouse import getWarehouseBars
 from ..fintwit.tweet import send_tweet, translate_data
 from .functions import *
+from .engine import simple_returns, rescaled_range_stats, batch_linregress
+from .estimators import ESTIMATORS, check_history, estimator_scales, scale_statistics
+from .cache import fetch_cached_results, fetch_results, result_digest, save_results
+from .store import result_rows, save_hurst_results
 from .output import exportFractal, outputTable
 import sys
 from tabulate import tabulate
@@ -22,7 +24,7 @@ def collect_key_stats(ticker, timeframe):
     1. Fetch max historical price data from IEX.
     2. Break list of prices into chunks based on exponential or linear scales, (see exponential_scales() function).
     3. Calculate key lists of data: daily returns, daily deviations from the means, and daily running totals. 
-       Data will be organized into chunks based on scale.
+       Data will be organized into (chunks, days) matrices based on scale, (see engine.py).
     4. Calculate key statistics from returns, deviations, and running totals for each scale, (min, max, mean, range, stdev)
     5. Calculate the rescaled range from the standard deviations of returns of each scale.
     6. Calculate necessary stats for final rescale range analysis, gets log10 values of rescaled ranges
@@ -38,46 +40,9 @@ def collect_key_stats(ticker, timeframe):
         Returns dict of scales with number of items in each scale.
         Returns dict of key stats to be used in final rescale range analysis calculation.
     """
-    asset_prices = getHistoricalData(ticker, timeframe, True)
-    if (asset_prices):
-        prices = list(reversed(extract_data(asset_prices, 'close')))
-
-        count = len(prices)
-
-        # Arbitrary fractal scales
-        scales = exponential_scales(count, 2, 6)
-        # print(json.dumps(scales, indent=1))
-
-        returns = returns_calculator(prices)
-        deviations = deviations_calculator(returns, scales)
-        running_totals = running_totals_calculator(deviations, scales)
-
-        # Calculating statistics of returns and running totals
-        range_stats = {}
-        for scale, days in scales.items():
-            range_stats[scale] = {}
-            range_stats[scale]['means'] = chunked_averages(returns, days)
-            range_stats[scale]['stDevs'] = chunked_devs(returns, days)
-            range_stats[scale]['minimums'] = chunked_range(running_totals[scale], days)['minimum']
-            range_stats[scale]['maximums'] = chunked_range(running_totals[scale], days)['maximum']
-            range_stats[scale]['ranges'] = chunked_range(running_totals[scale], days)['range']
-
-        # Calculating Rescale Range
-        for scale, values in range_stats.items():
-            range_stats[scale]['rescaleRanges'] = {}
-            for i, value in values['ranges'].items():
-                rescaleRange = (value / values['stDevs'][i] if (values['stDevs'][i] != 0) else 0)
-
-                range_stats[scale]['rescaleRanges'][i] = rescaleRange
-
-        # Key stats for fractal calculations
-        for scale, values in range_stats.items():
-            range_stats[scale]['keyStats'] = {}
-            rescaleRanges = list(values['rescaleRanges'].values())
-            range_stats[scale]['keyStats']['rescaleRangeAvg'] = statistics.mean(rescaleRanges)  # This is the rescaled range
-            range_stats[scale]['keyStats']['size'] = scales[scale]
-            range_stats[scale]['keyStats']['logRR'] = math.log10(statistics.mean(rescaleRanges)) if (statistics.mean(rescaleRanges) > 0) else 0
-            range_stats[scale]['keyStats']['logScale'] = math.log10(scales[scale])
+    asset_prices = getWarehouseBars(ticker, timeframe)
+    if (len(asset_prices)):
+        scales, range_stats = range_stats_calculator(asset_prices)
 
         return scales, range_stats, asset_prices
     else:
@@ -85,7 +50,40 @@ def collect_key_stats(ticker, timeframe):
         sys.exit()
 
 
-def perform_hurst_calculations(x, y, asset_prices):
+def range_stats_calculator(asset_prices):
+    """
+    Compute half of collect_key_stats(), (steps 2 - 6). Makes no API calls, so it can be run on prices
+    fetched elsewhere, (see scan.py).
+
+    Parameters
+    ----------
+    asset_prices :np.ndarray|list
+                  warehouse bars, (see getWarehouseBars()), or list of dicts of historical prices as returned by
+                  getHistoricalData()
+
+    Returns
+    -------
+    dict, dict
+        Returns dict of scales with number of items in each scale.
+        Returns dict of key stats to be used in final rescale range analysis calculation.
+    """
+    prices = price_column(asset_prices, 'close', newest=True)
+
+    count = len(prices)
+
+    # Arbitrary fractal scales
+    scales = exponential_scales(count, 2, 6)
+    # print(json.dumps(scales, indent=1))
+
+    # Means, deviations, running totals, ranges and stdevs of every chunk are computed on arrays per scale,
+    # followed by the rescaled range and the key stats used in the final regression.
+    returns = simple_returns(prices)
+    range_stats = rescaled_range_stats(returns, scales)
+
+    return scales, range_stats
+
+
+def perform_hurst_calculations(x, y, asset_prices, estimator='rs'):
     """
     This function performs hurst fractal calculations based on key stats returned from collect_key_stats()
     Processes:
@@ -93,7 +91,7 @@ def perform_hurst_calculations(x, y, asset_prices):
        I've optimized for short term stock market analysis: 
         basic_fractal_sections()
         trading_fractal_sections()
-    2. Calculate linear regression from log10 scales and log10 rescaled ranges
+    2. Calculate linear regression from log10 scales and log10 rescaled ranges, (all sections at once, see batch_linregress())
 
 
     Parameters
@@ -102,6 +100,8 @@ def perform_hurst_calculations(x, y, asset_prices):
             list of log10 values for each chunk in scale
     y      :list
             list of log10 values for each chunk in scale
+    estimator :str
+            key of ESTIMATORS, translates each regression slope into a hurst exponent
 
     Returns
     -------
@@ -110,48 +110,100 @@ def perform_hurst_calculations(x, y, asset_prices):
             hurstExponent, fractalDimension, r-squared, p-value, standardError
     """
     # Set how you want data to be organized
-    sections = standard_fractal_sections(x, y, asset_prices)
+    sections = fractal_sections(x, y, asset_prices)
+
+    # Every section and the full series are regressed in one call
+    regressions = batch_linregress(
+        [section['x'] for section in sections.values()],
+        [section['y'] for section in sections.values()]
+    )
 
     results = {}
-    for i, section in sections.items():
-        slope, intercept, r_value, p_value, std_err = stats.linregress(section['x'], section['y'])
-        results[i] = {
-            'hurstExponent': round(slope, 2),
-            'fractalDimension': round((2 - slope), 2),
-            'r-squared': round(r_value**2, 2),
-            'p-value': round(p_value, 2),
-            'standardError': round(std_err, 2)
-        }
-    slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
-    results['fullSeries'] = {
-        'hurstExponent': round(slope, 2),
-        'fractalDimension': round((2 - slope), 2),
-        'r-squared': round(r_value**2, 2),
-        'p-value': round(p_value, 2),
-        'standardError': round(std_err, 2)
-    }
+    for i, name in enumerate(sections.keys()):
+        results[name] = regression_results(regressions, i, estimator)
     return results
 
 
-def fractal_calculator(ticker, timeframe, output, sendtweet):
+def fractal_sections(x, y, asset_prices):
+    """
+    Sections of the log10 scales and statistics to be regressed, (see standard_fractal_sections()), and the full series.
+
+    Returns
+    -------
+    dict
+        x and y lists keyed by section name, fullSeries last
+    """
+    sections = standard_fractal_sections(x, y, asset_prices)
+    sections['fullSeries'] = {'x': x, 'y': y}
+
+    return sections
+
+
+def regression_results(regressions, i, estimator='rs'):
     """
-    Main process thread. Will call on collect_key_stats() and perform_hurst_calculations()
+    Regression statistics of the i-th series of a batch_linregress() call.
 
     Parameters
     ----------
-    ticker      :str
-                 stock ticker, stock data is retrieved from IEX Data
-    output      :str
-                 Can either be table, csv, or tweet
-                 (output always goes to table in terminal, table param ensures it only goes to table.)
+    regressions :dict
+                 batch_linregress() results
+    i           :int
+    estimator   :str
+                 key of ESTIMATORS, translates the regression slope into a hurst exponent
 
     Returns
     -------
     dict
-        Returns fractal statistics and can export to csv, output to terminal and tweet
+        hurstExponent, fractalDimension, r-squared, p-value, standardError
+    """
+    to_hurst = ESTIMATORS[estimator]['hurst']
+    slope = float(regressions['slope'][i])
+    std_err = float(regressions['stderr'][i])
+
+    return {
+        'hurstExponent': round(to_hurst(slope), 2),
+        'fractalDimension': round((2 - to_hurst(slope)), 2),
+        'r-squared': round(float(regressions['rvalue'][i])**2, 2),
+        'p-value': round(float(regressions['pvalue'][i]), 2),
+        'standardError': round(abs(to_hurst(slope + std_err) - to_hurst(slope)), 2)
+    }
+
+
+def hurst_statistics(asset_prices, estimator='rs'):
+    """
+    First half of hurst_analysis(), everything up to the regressions. Measures the estimator's statistic at every
+    scale, so the log10 scales and statistics can be regressed here or stacked with other tickers', (see scan.py).
+
+    Parameters
+    ----------
+    asset_prices :np.ndarray|list
+                  warehouse bars, (see getWarehouseBars()), or list of dicts of historical prices as returned by
+                  getHistoricalData()
+    estimator    :str
+                  rs (rescaled range), dfa, variogram, madogram, aggvar or wavelet, (see estimators.py)
 
+    Returns
+    -------
+    dict, dict, list, list
+        Returns dict of scales with number of items in each scale.
+        Returns fractal statistics without the regression results, (rescale ranges for rs).
+        Returns log10 scales and log10 statistics.
+
+    Raises
+    ------
+    ValueError
+        when there are too few prices for every scale, (see check_history())
     """
-    scales, range_stats, asset_prices = collect_key_stats(ticker, timeframe)
+    check_history(len(asset_prices), estimator)
+
+    if (estimator != 'rs'):
+        prices = price_column(asset_prices, 'close', newest=True)
+        scales = estimator_scales(len(prices), estimator)
+        log_scales, log_stats = scale_statistics(simple_returns(prices), list(scales.values()), estimator)
+
+        return scales, {}, list(log_scales), list(log_stats)
+
+    scales, range_stats = range_stats_calculator(asset_prices)
 
     # Hurst Exponent Calculations
     fractal_results = {
@@ -164,10 +216,95 @@ def fractal_calculator(ticker, timeframe, output, sendtweet):
     # Calculating linear regression of rescale range logs
     log_RRs = scaled_data_collector(scales, range_stats, ['keyStats', 'logRR'])
     log_scales = scaled_data_collector(scales, range_stats, ['keyStats', 'logScale'])
-    slope, intercept, r_value, p_value, std_err = stats.linregress(log_scales, log_RRs)
+
+    return scales, fractal_results, log_scales, log_RRs
+
+
+def hurst_analysis(asset_prices, estimator='rs'):
+    """
+    Builds the full fractal statistics for a price series without any output side effects.
+    Will call on hurst_statistics() and perform_hurst_calculations()
+
+    Parameters
+    ----------
+    asset_prices :np.ndarray|list
+                  warehouse bars, (see getWarehouseBars()), or list of dicts of historical prices as returned by
+                  getHistoricalData()
+    estimator    :str
+                  rs (rescaled range), dfa, variogram, madogram, aggvar or wavelet, (see estimators.py)
+
+    Returns
+    -------
+    dict, dict
+        Returns dict of scales with number of items in each scale.
+        Returns fractal statistics: rescale ranges, (rs only), and regression results.
+
+    Raises
+    ------
+    ValueError
+        when there are too few prices for every scale, (see check_history())
+    """
+    scales, fractal_results, x, y = hurst_statistics(asset_prices, estimator)
 
     # Results
-    fractal_results['regressionResults'] = perform_hurst_calculations(log_scales, log_RRs, asset_prices)
+    fractal_results['regressionResults'] = perform_hurst_calculations(x, y, asset_prices, estimator)
+
+    return scales, fractal_results
+
+
+def fractal_calculator(ticker, timeframe, output, sendtweet, estimator='rs', cache=True):
+    """
+    Main process thread. Fetches prices and will call on hurst_analysis()
+    Results are cached in redis, (see cache.py). A repeat run on the same day returns the cached results without
+    fetching, and a new fetch whose prices have not changed reuses the results calculated on them.
+    New results are also stored in the HurstResult table, (see store.py).
+
+    Parameters
+    ----------
+    ticker      :str
+                 stock ticker, stock data is retrieved from IEX Data
+    output      :str
+                 Can either be table, csv, or tweet
+                 (output always goes to table in terminal, table param ensures it only goes to table.)
+    estimator   :str
+                 rs (rescaled range), dfa, variogram, madogram, aggvar or wavelet, (see estimators.py)
+    cache       :bool
+                 False always refetches and recalculates
+
+    Returns
+    -------
+    dict
+        Returns fractal statistics and can export to csv, output to terminal and tweet
+
+    """
+    if (estimator not in ESTIMATORS):
+        print('Unknown estimator. Choose from: '+', '.join(ESTIMATORS.keys()))
+        sys.exit()
+
+    cached = fetch_cached_results(ticker, timeframe, estimator) if (cache) else None
+    if (cached):
+        scales, fractal_results = cached
+    else:
+        # Read straight from the memory mapped warehouse file, (no list of dicts is built)
+        asset_prices = getWarehouseBars(ticker, timeframe)
+        if (not len(asset_prices)):
+            print('Prices returned nil')
+            sys.exit()
+        last_bar = str(asset_prices['date'][-1])
+
+        digest = result_digest(asset_prices, {'estimator': estimator, 'scales': [2, 6]})
+        cached = fetch_results(digest) if (cache) else None
+        if (cached):
+            scales, fractal_results = cached
+        else:
+            try:
+                scales, fractal_results = hurst_analysis(asset_prices, estimator)
+            except ValueError as error:
+                print(error)
+                sys.exit()
+            save_hurst_results(result_rows(ticker, last_bar, timeframe, estimator, fractal_results['regressionResults']))
+        save_results(ticker, timeframe, estimator, digest, last_bar, scales, fractal_results)
+
     outputTable(fractal_results, scales)  # Output will always go to table in terminal as well.
 
     # Tweet
@@ -1,12 +1,34 @@
 import json
 import sys
 import statistics
-from ..core.functions import extract_data
+from ..core.functions import Columns
 from scipy import stats
 import pandas as pd
 import numpy as np
 
 
+def price_column(asset_prices, key, newest=False):
+    """
+    One column of a price series. Warehouse bars, (see core/warehouse.py), give a view of the memory mapped file,
+    lists of dicts as returned by getHistoricalData() are transposed, (see Columns).
+
+    Parameters
+    ----------
+    asset_prices :np.ndarray|list
+                  structured array of warehouse bars or list of dicts, oldest first
+    key          :str
+    newest       :bool
+                  newest first
+
+    Returns
+    -------
+    np.ndarray
+    """
+    values = asset_prices[key] if (isinstance(asset_prices, np.ndarray)) else Columns(asset_prices)[key]
+
+    return values[::-1] if (newest) else values
+
+
 def scaled_data_collector(scales, data, key):
     """
     Similar to the extract_data function; burrows into nested dict, (nested by scale in this case)
@@ -214,7 +236,70 @@ def backward_chunks(lst, n):
         start = end
 
 
-def chunked_averages(lst, n):
+def prefix_index(lst):
+    """
+    Builds a prefix sum and prefix sum of squares index of a list, once per series. Any chunk's sum, mean and
+    variance can then be read in O(1), so every scale shares the same precomputation, (see engine.rescaled_range()).
+
+    Parameters
+    ----------
+    lst    :list
+            full list of items, (usually returns)
+
+    Returns
+    -------
+    dict containing the prefix sums, prefix sums of squares and number of items
+    """
+    values = np.asarray(lst, dtype=np.float64)
+
+    return {
+        'sums': np.concatenate([[0], np.cumsum(values)]),
+        'squares': np.concatenate([[0], np.cumsum(values ** 2)]),
+        'count': len(values),
+    }
+
+
+def chunk_bounds(count, n):
+    """
+    Start and end (exclusive) of every chunk chunks() would create, as arrays.
+
+    Parameters
+    ----------
+    count  :int
+            number of items in the full list
+    n      :int
+            number of items in each chunk
+
+    Returns
+    -------
+    np.ndarray, np.ndarray
+    """
+    starts = np.arange(0, count, n)
+    ends = np.minimum(starts + n, count)
+
+    return starts, ends
+
+
+def index_means(index, starts, ends):
+    """
+    O(1) mean of each chunk [start, end) from a prefix_index()
+    """
+    return (index['sums'][ends] - index['sums'][starts]) / (ends - starts)
+
+
+def index_variances(index, starts, ends):
+    """
+    O(1) sample variance of each chunk [start, end) from a prefix_index(). Chunks of one item have a variance of 0.
+    """
+    counts = ends - starts
+    sums = index['sums'][ends] - index['sums'][starts]
+    squares = index['squares'][ends] - index['squares'][starts]
+    variances = (squares - sums ** 2 / counts) / np.maximum(counts - 1, 1)
+
+    return np.where(counts > 1, np.clip(variances, 0, None), 0)
+
+
+def chunked_averages(lst, n, index=None):
     """
     Convert list to chunks, (usually based on scales), and return average of each chunk
 
@@ -224,18 +309,17 @@ def chunked_averages(lst, n):
             full list of items
     n      :int
             number of items in each chunk
+    index  :dict
+            prefix_index() of lst, pass one in to share it between scales
 
     Returns
     -------
     dict containing each chunk's average
     """
-    chunked_list = list(chunks(lst, n))
-    averages = {}
-    for i, chunk in enumerate(chunked_list):
-        mean = statistics.mean(chunk)
-        averages[i] = mean
+    index = index if index else prefix_index(lst)
+    starts, ends = chunk_bounds(index['count'], n)
 
-    return averages
+    return dict(enumerate(index_means(index, starts, ends).tolist()))
 
 
 def deviations_calculator(returns, scales):
@@ -255,13 +339,14 @@ def deviations_calculator(returns, scales):
     chunked list of deviations, chunks are according to scale 
     """
     deviations = {}
+    index = prefix_index(returns)
     for scale, days in scales.items():
         deviations[scale] = []
         chunked_returns = chunks(returns, days)
-        chunked_means = chunked_averages(returns, days)
-        for index, chunk in enumerate(chunked_returns):
+        chunked_means = chunked_averages(returns, days, index)
+        for n, chunk in enumerate(chunked_returns):
             for i, value in enumerate(chunk):
-                deviation = float(value) - float(chunked_means[index])
+                deviation = float(value) - float(chunked_means[n])
                 deviations[scale].append(deviation)
     return deviations
 
@@ -294,7 +379,7 @@ def running_totals_calculator(deviations, scales):
     return running_totals
 
 
-def chunked_devs(lst, n):
+def chunked_devs(lst, n, index=None):
     """
     Convert list to chunks, (usually based on scales), and return standard deviation of each chunk
 
@@ -304,22 +389,18 @@ def chunked_devs(lst, n):
             full list of items
     n      :int
             number of items in each chunk
+    index  :dict
+            prefix_index() of lst, pass one in to share it between scales
 
     Returns
     -------
     dict containing each chunk's stdev
     """
-    chunked_list = list(chunks(lst, n))
-    stDevs = {}
-    for i, chunk in enumerate(chunked_list):
-        # Checking if chunk is more than one item; stDev needs more than one.
-        if (len(chunk) > 1):
-            dev = statistics.stdev(chunk)
-            stDevs[i] = dev
-        else:
-            stDevs[i] = 0
+    index = index if index else prefix_index(lst)
+    starts, ends = chunk_bounds(index['count'], n)
 
-    return stDevs
+    # Chunks of one item get 0; stDev needs more than one.
+    return dict(enumerate(np.sqrt(index_variances(index, starts, ends)).tolist()))
 
 
 def chunked_range(lst, n):
@@ -337,19 +418,19 @@ def chunked_range(lst, n):
     -------
     dict containing each chunk's min, max, and range
     """
-    chunked_list = list(chunks(lst, n))
-    if (len(chunked_list[-1]) == 1):
-        remainder = chunked_list[-1].pop(0)
-        chunked_list[-2].append(remainder)
-        del chunked_list[-1]
+    values = np.asarray(lst, dtype=np.float64)
+    starts, ends = chunk_bounds(len(values), n)
+    # A last chunk of one item is merged into the chunk before it
+    if (len(starts) > 1 and ends[-1] - starts[-1] == 1):
+        starts = starts[:-1]
+
+    minimums = np.minimum.reduceat(values, starts)
+    maximums = np.maximum.reduceat(values, starts)
+
     chunk_range = {}
-    chunk_range['minimum'] = {}
-    chunk_range['maximum'] = {}
-    chunk_range['range'] = {}
-    for i, chunk in enumerate(chunked_list):
-        chunk_range['minimum'][i] = min(chunk)
-        chunk_range['maximum'][i] = max(chunk)
-        chunk_range['range'][i] = (max(chunk) - min(chunk))
+    chunk_range['minimum'] = dict(enumerate(minimums.tolist()))
+    chunk_range['maximum'] = dict(enumerate(maximums.tolist()))
+    chunk_range['range'] = dict(enumerate((maximums - minimums).tolist()))
 
     return chunk_range
 
@@ -375,9 +456,8 @@ def standard_fractal_sections(x, y, asset_prices):
         return "X and Y values contain disproportionate counts"
     
 
-    dates = extract_data(asset_prices, 'date')
-    prices = extract_data(asset_prices, 'close')
-    count = len(prices)
+    dates = price_column(asset_prices, 'date')
+    count = len(dates)
 
     halfChunkDates = list(chunks(dates, int(len(dates) / 2)))
     thirdChunkDates = list(chunks(dates, int(len(dates) / 3)))
@@ -453,8 +533,6 @@ def trading_fractal_sections(x, y):
             'y': list(backward_chunks(y, 5))[-1],
         },
     }
-    print(json.dumps(fractal_scales, indent=1))
-    sys.exit()
     return fractal_scales
 
 
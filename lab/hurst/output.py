@@ -39,7 +39,9 @@ def writeCSV(fractal_results, refScales, resultsfile, append):
     for row in rows:
         write_results.writerow(row)
 
-    # Rescale Range
+    # Rescale Range, (only the rescaled range estimator has one)
+    if (not fractal_results.get('rescaleRange')):
+        return
     write_results.writerow('')
     write_results.writerow(['Rescale Range:'])
     write_results.writerow(['Scale', 'RescaleRange'])
@@ -110,7 +112,9 @@ def outputTable(fractal_results, refScales):
     print(table.draw())
     print("\n")
 
-    # Rescale Range
+    # Rescale Range, (only the rescaled range estimator has one)
+    if (not fractal_results.get('rescaleRange')):
+        return
     print('Rescaled Range:')
     table = texttable.Texttable()
     headers = ['Scale', 'RescaleRange']
@@ -0,0 +1,230 @@
+import math
+import os
+import sys
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from ..core.warehouse import getWarehouseData
+from ..core.output import printTabs, writeCSV
+from .functions import exponential_scales
+
+
+class RollingHurst:
+    """
+    Rolling-window hurst exponent, stepped daily.
+
+    Every chunk of every scale is identified by the bar it ends on, and its rescaled range is calculated once from
+    prefix sums of returns and squared returns. A window is then just the average of the chunks ending on it, (every
+    `days` bars back from the newest bar), so neighbouring windows share all of their chunk work. When a new bar
+    arrives, only the one new chunk per scale ending on that bar is calculated.
+
+    Unlike collect_key_stats(), chunks are aligned to the newest bar and only full chunks are used, so every window
+    is measured on exactly the same scales.
+
+    Parameters
+    ----------
+    window     :int
+                number of returns in each window
+    exponent   :int
+                see exponential_scales()
+    limit      :int
+                see exponential_scales()
+    """
+
+    def __init__(self, window=252, exponent=2, limit=6):
+        self.window = window
+        self.scales = [days for days in exponential_scales(window, exponent, limit).values() if (days > 1)]
+        self.logScales = np.log10(self.scales)
+
+        self.prices = []
+        self.dates = []
+        self.prefix = [0.0]     # running sum of returns
+        self.prefixSq = [0.0]   # running sum of squared returns
+        self.chunkRR = {days: [] for days in self.scales}  # rescaled range of the chunk ending on each return
+        self.hurst = []         # hurst exponent of the window ending on each return, nan until the first full window
+
+    def chunk_rescaled_range(self, end, days):
+        """
+        Rescaled range of the single chunk of returns ending on index `end`, using the prefix sums.
+        """
+        start = end - days + 1
+        totals = np.asarray(self.prefix[start + 1:end + 2]) - self.prefix[start]
+        mean = totals[-1] / days
+        running_totals = totals - mean * np.arange(1, days + 1)
+        variance = (self.prefixSq[end + 1] - self.prefixSq[start] - days * mean ** 2) / (days - 1)
+        stDev = math.sqrt(variance) if (variance > 0) else 0
+
+        return (running_totals.max() - running_totals.min()) / stDev if (stDev != 0) else 0
+
+    def window_hurst(self, end):
+        """
+        Hurst exponent of the window ending on return index `end`, from the chunks already calculated.
+        """
+        logRRs = []
+        for days in self.scales:
+            rescaleRanges = [self.chunkRR[days][end - k * days] for k in range(self.window // days)]
+            rescaleRangeAvg = sum(rescaleRanges) / len(rescaleRanges)
+            logRRs.append(math.log10(rescaleRangeAvg) if (rescaleRangeAvg > 0) else 0)
+
+        return float(np.polyfit(self.logScales, logRRs, 1)[0])
+
+    def update(self, price, date=None):
+        """
+        Adds a new bar and calculates the hurst exponent of the window ending on it.
+
+        Parameters
+        ----------
+        price   :float
+        date    :str
+
+        Returns
+        -------
+        float|None
+            hurst exponent of the newest window, None until there is enough history
+        """
+        self.prices.append(float(price))
+        if (len(self.prices) < 2):
+            return None
+
+        ret = self.prices[-1] / self.prices[-2] - 1
+        self.dates.append(date)
+        self.prefix.append(self.prefix[-1] + ret)
+        self.prefixSq.append(self.prefixSq[-1] + ret ** 2)
+
+        end = len(self.prefix) - 2
+        for days in self.scales:
+            self.chunkRR[days].append(self.chunk_rescaled_range(end, days) if (end + 1 >= days) else np.nan)
+
+        hurst = self.window_hurst(end) if (end + 1 >= self.window) else np.nan
+        self.hurst.append(hurst)
+
+        return None if np.isnan(hurst) else hurst
+
+    def extend(self, prices, dates=None):
+        """
+        Adds a block of bars at once, (ex: the full history on startup). Same results as calling update() on
+        each bar, but every chunk of a scale is calculated in one vectorized pass.
+
+        Parameters
+        ----------
+        prices  :list|np.ndarray
+                 prices in chronological order
+        dates   :list
+        """
+        prices = [float(price) for price in prices]
+        dates = dates if dates else [None] * len(prices)
+        offset = len(self.prefix) - 1
+        previous = self.prices[-1:]
+        self.prices.extend(prices)
+
+        series = np.asarray(previous + prices, dtype=np.float64)
+        if (len(series) < 2):
+            return
+
+        returns = series[1:] / series[:-1] - 1
+        self.dates.extend(dates[len(dates) - len(returns):])
+        self.prefix.extend((self.prefix[-1] + np.cumsum(returns)).tolist())
+        self.prefixSq.extend((self.prefixSq[-1] + np.cumsum(returns ** 2)).tolist())
+
+        prefix = np.asarray(self.prefix)
+        prefixSq = np.asarray(self.prefixSq)
+        ends = np.arange(offset, len(prefix) - 1)
+
+        for days in self.scales:
+            rescaleRanges = np.full(len(ends), np.nan)
+            valid = ends[ends + 1 >= days]
+            # Blocks keep the (chunks, days) matrix of running totals small on long histories
+            for block in np.array_split(valid, max(1, len(valid) * days // 1000000)):
+                if (not len(block)):
+                    continue
+                starts = block - days + 1
+                totals = sliding_window_view(prefix[1:], days)[starts] - prefix[starts][:, None]
+                means = totals[:, -1] / days
+                running_totals = totals - means[:, None] * np.arange(1, days + 1)
+                variance = (prefixSq[block + 1] - prefixSq[starts] - days * means ** 2) / (days - 1)
+                stDevs = np.sqrt(np.clip(variance, 0, None))
+                ranges = running_totals.max(axis=1) - running_totals.min(axis=1)
+                safe = np.where(stDevs != 0, stDevs, 1)
+                rescaleRanges[block - offset] = np.where(stDevs != 0, ranges / safe, 0)
+            self.chunkRR[days].extend(rescaleRanges.tolist())
+
+        # Windows: the average rescaled range of each scale, then one least squares slope per window
+        windowEnds = ends[ends + 1 >= self.window]
+        logRRs = []
+        for days in self.scales:
+            chunkRR = np.asarray(self.chunkRR[days])
+            rescaleRangeAvg = np.mean([chunkRR[windowEnds - k * days] for k in range(self.window // days)], axis=0)
+            safe = np.where(rescaleRangeAvg > 0, rescaleRangeAvg, 1)
+            logRRs.append(np.where(rescaleRangeAvg > 0, np.log10(safe), 0))
+        logRRs = np.asarray(logRRs)
+
+        x = self.logScales - self.logScales.mean()
+        slopes = (x[:, None] * (logRRs - logRRs.mean(axis=0))).sum(axis=0) / (x ** 2).sum()
+
+        hurst = np.full(len(ends), np.nan)
+        hurst[windowEnds - offset] = slopes
+        self.hurst.extend(hurst.tolist())
+
+    def series(self):
+        """
+        Returns
+        -------
+        list of dicts
+            date and hurst exponent of every full window
+        """
+        results = []
+        for date, hurst in zip(self.dates, self.hurst):
+            if (not np.isnan(hurst)):
+                results.append({'date': date, 'hurstExponent': round(hurst, 3)})
+
+        return results
+
+
+def rolling_hurst(asset_prices, window=252):
+    """
+    Builds a RollingHurst from historical prices.
+
+    Parameters
+    ----------
+    asset_prices :list
+                  list of dicts of historical prices as returned by getHistoricalData(), (oldest first)
+    window       :int
+
+    Returns
+    -------
+    RollingHurst
+        call update() on it as new bars arrive
+    """
+    roller = RollingHurst(window=window)
+    roller.extend([day['close'] for day in asset_prices], [day['date'] for day in asset_prices])
+
+    return roller
+
+
+def rolling_calculator(ticker, timeframe='5y', window=252, last=20):
+    """
+    Prints the most recent rolling hurst exponents for a ticker and saves the full series to csv.
+
+    Parameters
+    ----------
+    ticker      :str
+    timeframe   :str
+    window      :int
+                 number of trading days in each window
+    last        :int
+                 number of most recent windows printed to the terminal
+    """
+    asset_prices = getWarehouseData(ticker, timeframe, True)
+    if (not asset_prices):
+        print('Prices returned nil')
+        sys.exit()
+
+    series = rolling_hurst(asset_prices, window).series()
+    if (not series):
+        return 'Not enough history for a {} day window'.format(window)
+
+    output_dir = 'lab/hurst/output/'
+    if (not os.path.exists(output_dir)):
+        os.makedirs(output_dir)
+    writeCSV(series, '{}{}_rolling_hurst_{}.csv'.format(output_dir, ticker, window))
+
+    printTabs({row['date']: row['hurstExponent'] for row in series[-last:]}, ['Date', 'Hurst ({}d)'.format(window)])
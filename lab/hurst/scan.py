@@ -0,0 +1,233 @@
+import django
+from django.apps import apps
+from dotenv import load_dotenv
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import date
+import progressbar
+import colored
+from colored import stylize
+import csv
+import sys
+import os
+import numpy as np
+from ..core.warehouse import getWarehouseBars
+from ..core.api.client import iex_client
+from ..core.output import printFullTable, writeCSV
+from .fractal_calculator import hurst_statistics, fractal_sections, regression_results
+from .engine import batch_linregress
+from .estimators import ESTIMATORS
+from .functions import price_column
+from .store import result_rows, save_hurst_results
+load_dotenv()
+django.setup()
+
+
+def scan_universe(universe='stocks'):
+    """
+    Collects the tickers to be scanned.
+
+    Parameters
+    ----------
+    universe    :str
+                 'stocks' for the full Stock table, 'etfs' for ETFs only, or the name of a csv file
+                 in lab/core/storage/stocks, (ex: S&P500 or Russell3000.csv)
+
+    Returns
+    -------
+    list of tickers
+    """
+    if (universe == 'stocks'):
+        Stock = apps.get_model('database', 'Stock')
+        return list(Stock.objects.all().values_list('ticker', flat=True))
+
+    if (universe == 'etfs'):
+        from ..macro.functions import getETFs
+        return getETFs(True)
+
+    filename = universe if universe.endswith('.csv') else universe + '.csv'
+    csv_path = 'lab/core/storage/stocks/{}'.format(filename)
+    if (not os.path.exists(csv_path)):
+        print(stylize("Universe not found: "+csv_path, colored.fg("red")))
+        sys.exit()
+
+    tickers = []
+    with open(csv_path, newline='', encoding='utf-8-sig') as csvfile:
+        for row in csv.reader(csvfile):
+            # Some lists have a header row, some are a bare column of tickers.
+            if (not row or row[0] == 'ticker'):
+                continue
+            tickers.append(row[0].strip())
+
+    return tickers
+
+
+def scan_worker(ticker, asset_prices, estimator='rs'):
+    """
+    Runs in a worker process. Only ever receives prices that have already been fetched, so it never blocks on HTTP.
+    The sections are returned unregressed, so the whole scan can be regressed at once, (see regress_sections()).
+
+    Parameters
+    ----------
+    ticker       :str
+    asset_prices :np.ndarray
+                  warehouse bars, (see getWarehouseBars())
+    estimator    :str
+                  see estimators.py
+
+    Returns
+    -------
+    str, dict
+        ticker and x, y lists keyed by section, (section dates removed so sections line up across tickers),
+        empty when the ticker has too little history, (see check_history()), or a flat price
+    """
+    # Not enough history to build every scale and section, or a price that never moved, (no statistic has a log).
+    # Anything else is a bug and is raised
+    if (len(asset_prices) < ESTIMATORS[estimator]['minimum']):
+        return ticker, {}
+    if (np.ptp(price_column(asset_prices, 'close')) == 0):
+        return ticker, {}
+
+    scales, fractal_results, x, y = hurst_statistics(asset_prices, estimator)
+
+    sections = {}
+    for section, values in fractal_sections(x, y, asset_prices).items():
+        sections[section.split(' (')[0]] = values
+
+    return ticker, sections
+
+
+def regress_sections(collected, estimator='rs'):
+    """
+    Regresses every ticker's sections with one batch_linregress() call per section.
+
+    Parameters
+    ----------
+    collected  :dict
+                sections of scan_worker() keyed by ticker
+    estimator  :str
+
+    Returns
+    -------
+    dict
+        regression results keyed by ticker, then section, (see regression_results())
+    """
+    stacks = {}
+    for ticker, sections in collected.items():
+        for section, values in sections.items():
+            stacks.setdefault(section, []).append((ticker, values))
+
+    scanned = {ticker: {} for ticker in collected.keys()}
+    for section, stack in stacks.items():
+        regressions = batch_linregress([values['x'] for ticker, values in stack], [values['y'] for ticker, values in stack])
+        for i, (ticker, values) in enumerate(stack):
+            scanned[ticker][section] = regression_results(regressions, i, estimator)
+
+    return scanned
+
+
+def rank_results(scanned):
+    """
+    Flattens scan results into one table, ranked by hurst exponent within each section.
+
+    Parameters
+    ----------
+    scanned  :dict
+              results of regress_sections() keyed by ticker
+
+    Returns
+    -------
+    list of dicts
+    """
+    sections = {}
+    for ticker, results in scanned.items():
+        for section, stats in results.items():
+            if (section not in sections):
+                sections[section] = []
+            row = {'ticker': ticker, 'section': section}
+            row.update(stats)
+            sections[section].append(row)
+
+    table = []
+    for section, rows in sections.items():
+        rows.sort(key=lambda row: row['hurstExponent'], reverse=True)
+        for i, row in enumerate(rows):
+            row['rank'] = i + 1
+            table.append(row)
+
+    return table
+
+
+def hurst_scan(universe='stocks', timeframe='1y', workers=None, top=25, estimator='rs'):
+    """
+    Runs a rescaled range analysis across an entire universe of tickers.
+    Prices are synced on a thread pool, (as wide as the IEX client's concurrency), and each ticker's bars are handed to
+    a process pool as soon as they arrive, so fetching and computing overlap.
+
+    Parameters
+    ----------
+    universe    :str
+                 see scan_universe()
+    timeframe   :str
+    workers     :int
+                 number of compute processes, defaults to the number of cpus
+    top         :int
+                 number of rows of each section printed to the terminal
+    estimator   :str
+                 see estimators.py, the cheaper estimators are worth considering on long histories
+
+    Returns
+    -------
+    list of dicts
+        Full ranked results table, also written to lab/hurst/output/ and the HurstResult table
+    """
+    # Checked before anything is fetched, a bad estimator would otherwise fail in every worker after the whole sync
+    if (estimator not in ESTIMATORS):
+        message = 'Unknown estimator. Choose from: '+', '.join(ESTIMATORS.keys())
+        print(stylize(message, colored.fg("red")))
+        return message
+
+    tickers = scan_universe(universe)
+    print(stylize("Scanning {} tickers...".format(len(tickers)), colored.fg("yellow")))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool, ThreadPoolExecutor(max_workers=iex_client().concurrency) as fetcher:
+        fetches = {}
+        for ticker in tickers:
+            fetches[fetcher.submit(getWarehouseBars, ticker, timeframe)] = ticker
+
+        jobs = []
+        last_bars = {}
+        for fetched in progressbar.progressbar(as_completed(fetches), max_value=len(fetches), prefix='Fetching: '):
+            bars = fetched.result()
+            # Empty if nothing could be fetched
+            if (len(bars)):
+                last_bars[fetches[fetched]] = str(bars['date'][-1])
+                # Copied out of the shared memory map, so only the raw records are pickled to the worker
+                jobs.append(pool.submit(scan_worker, fetches[fetched], np.array(bars), estimator))
+
+        collected = {}
+        for job in as_completed(jobs):
+            ticker, sections = job.result()
+            if (sections):
+                collected[ticker] = sections
+
+    # Each section of the whole universe is regressed in one call, then written in one bulk write
+    scanned = regress_sections(collected, estimator)
+    rows = []
+    for ticker, results in scanned.items():
+        rows.extend(result_rows(ticker, last_bars[ticker], timeframe, estimator, results))
+    save_hurst_results(rows)
+
+    table = rank_results(scanned)
+    if (not table):
+        return 'No results'
+
+    output_dir = 'lab/hurst/output/'
+    if (not os.path.exists(output_dir)):
+        os.makedirs(output_dir)
+    output_file = '{}hurst_scan_{}_{}.csv'.format(output_dir, timeframe, date.today().strftime('%m-%d'))
+    writeCSV(table, output_file)
+
+    printFullTable([row for row in table if (row['section'] == 'fullSeries' and row['rank'] <= top)], struct='dictlist')
+    print(stylize("Scanned {} of {} tickers. Full results saved to {}".format(len(scanned), len(tickers), output_file), colored.fg("green")))
+
+    return table
@@ -0,0 +1,128 @@
+import django
+from django.apps import apps
+from django.db import transaction
+from dotenv import load_dotenv
+from datetime import date, timedelta
+load_dotenv()
+django.setup()
+
+
+def result_rows(ticker, last_bar, timeframe, estimator, regression_results):
+    """
+    Flattens regression results into HurstResult rows, one per section.
+    Section dates are removed so sections line up across dates and tickers, (the bar date is stored on its own).
+
+    Parameters
+    ----------
+    ticker              :str
+    last_bar            :str
+                         date of the newest bar the results were calculated on, YYYY-MM-DD
+    timeframe           :str
+    estimator           :str
+    regression_results  :dict
+                         fractal_results['regressionResults'] or the results of regress_sections()
+
+    Returns
+    -------
+    list of dicts
+    """
+    rows = []
+    for section, stats in regression_results.items():
+        rows.append({
+            'ticker': ticker,
+            'date': last_bar,
+            'timeframe': timeframe,
+            'estimator': estimator,
+            'section': section.split(' (')[0],
+            'hurstExponent': stats.get('hurstExponent'),
+            'fractalDimension': stats.get('fractalDimension'),
+            'rSquared': stats.get('r-squared'),
+            'pValue': stats.get('p-value'),
+            'standardError': stats.get('standardError'),
+        })
+
+    return rows
+
+
+def save_hurst_results(rows, batch_size=1000):
+    """
+    Bulk writes HurstResult rows. Rows for the same ticker, date, timeframe and estimator are replaced,
+    so re-running a scan on the same day doesn't duplicate it.
+
+    Parameters
+    ----------
+    rows        :list
+                 list of dicts, see result_rows()
+    batch_size  :int
+
+    Returns
+    -------
+    int
+        number of rows written
+    """
+    if (not rows):
+        return 0
+
+    HurstResult = apps.get_model('database', 'HurstResult')
+
+    # NaN doesn't survive a round trip through the db, (single point sections have no r-squared)
+    records = []
+    for row in rows:
+        clean = {key: (None if (isinstance(value, float) and value != value) else value) for key, value in row.items()}
+        records.append(HurstResult(**clean))
+
+    runs = {}
+    for row in rows:
+        runs.setdefault((row['date'], row['timeframe'], row['estimator']), set()).add(row['ticker'])
+
+    with transaction.atomic():
+        for (day, timeframe, estimator), tickers in runs.items():
+            tickers = list(tickers)
+            # Keeps the IN clause under sqlite's variable limit
+            for i in range(0, len(tickers), 500):
+                HurstResult.objects.filter(
+                    date=day, timeframe=timeframe, estimator=estimator, ticker__in=tickers[i:i + 500]
+                ).delete()
+        HurstResult.objects.bulk_create(records, batch_size=batch_size)
+
+    return len(records)
+
+
+def hurst_screen(minimum=0.65, days=7, section='fullSeries', timeframe=None, estimator='rs'):
+    """
+    Tickers with a hurst exponent above `minimum` on any bar in the last `days` days, from stored results.
+    Runs on the hurstExponent and (ticker, date) indexes, so no prices are fetched.
+
+    Parameters
+    ----------
+    minimum     :float
+    days        :int
+    section     :str
+                 fullSeries, pastHalfSeries, currentHalfSeries...
+    timeframe   :str
+                 None for any timeframe
+    estimator   :str
+
+    Returns
+    -------
+    list of dicts
+        the latest result of each ticker, highest hurst exponent first
+    """
+    HurstResult = apps.get_model('database', 'HurstResult')
+
+    results = HurstResult.objects.filter(
+        hurstExponent__gt=minimum,
+        date__gte=date.today() - timedelta(days=days),
+        section=section,
+        estimator=estimator,
+    )
+    if (timeframe):
+        results = results.filter(timeframe=timeframe)
+
+    latest = {}
+    for result in results.order_by('ticker', '-date').values('ticker', 'date', 'timeframe', 'hurstExponent', 'rSquared'):
+        if (result['ticker'] not in latest):
+            result['date'] = str(result['date'])
+            latest[result['ticker']] = result
+
+    return sorted(latest.values(), key=lambda row: row['hurstExponent'], reverse=True)
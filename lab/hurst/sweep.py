@@ -0,0 +1,131 @@
+import colored
+from colored import stylize
+from ..core.warehouse import getWarehouseData
+from ..core.output import printTabs
+from .functions import exponential_scales, linear_scales, price_column, prefix_index
+from .engine import simple_returns, rescaled_range, key_stats, batch_linregress
+
+
+def scale_schemes(count, exponents=[2, 3, 4], addends=[1, 2, 3], minimums=[2, 8, 16], limit=10):
+    """
+    Every combination of scale scheme and minimum chunk size to be compared.
+    Scales are built with exponential_scales() and linear_scales(), then cut off at the minimum chunk size,
+    so the minimum decides how far down each scheme zooms.
+
+    Parameters
+    ----------
+    count      :int
+                total number of returns
+    exponents  :list
+                see exponential_scales()
+    addends    :list
+                see linear_scales()
+    minimums   :list
+                smallest number of days allowed in a chunk
+    limit      :int
+                most scales in a scheme before the minimum is applied
+
+    Returns
+    -------
+    list of dicts
+        scheme name and scales dict, (schemes with fewer than 3 scales can't be regressed and are left out,
+        as are repeats where a higher minimum cuts nothing more off)
+    """
+    schemes = []
+    seen = set()
+    for minimum in minimums:
+        candidates = []
+        for exponent in exponents:
+            candidates.append(('exponential {}'.format(exponent), exponential_scales(count, exponent, limit)))
+        for addend in addends:
+            candidates.append(('linear {}'.format(addend), linear_scales(count, addend, limit)))
+
+        for name, scales in candidates:
+            scales = {scale: days for scale, days in scales.items() if (days >= minimum)}
+            if (len(scales) >= 3 and (name, tuple(scales.values())) not in seen):
+                seen.add((name, tuple(scales.values())))
+                schemes.append({'scheme': '{} (min {})'.format(name, minimum), 'scales': scales})
+
+    return schemes
+
+
+def scale_sweep(asset_prices, schemes=None):
+    """
+    Measures the hurst exponent of a price series under many scale schemes at once.
+    Returns and their prefix index are calculated once, and the rescaled range of each chunk size is calculated once no matter how many
+    schemes use it, (every scheme starts with the full series, and most share their first few halvings).
+
+    Parameters
+    ----------
+    asset_prices :list
+                  list of dicts of historical prices as returned by getHistoricalData()
+    schemes      :list
+                  defaults to scale_schemes()
+
+    Returns
+    -------
+    list of dicts
+        regression results of each scheme, best fit first
+    """
+    prices = price_column(asset_prices, 'close', newest=True)
+    returns = simple_returns(prices)
+    index = prefix_index(returns)
+    schemes = schemes if schemes else scale_schemes(len(prices))
+
+    logStats = {}
+    xs = []
+    ys = []
+    for scheme in schemes:
+        for scale, days in scheme['scales'].items():
+            if (days not in logStats):
+                logStats[days] = key_stats(rescaled_range(returns, days, index)['rescaleRanges'], days)
+        xs.append([logStats[days]['logScale'] for days in scheme['scales'].values()])
+        ys.append([logStats[days]['logRR'] for days in scheme['scales'].values()])
+
+    # Every scheme is regressed in one call
+    regressions = batch_linregress(xs, ys)
+
+    results = []
+    for i, scheme in enumerate(schemes):
+        results.append({
+            'scheme': scheme['scheme'],
+            'scales': len(scheme['scales']),
+            'smallestChunk': min(scheme['scales'].values()),
+            'hurstExponent': round(float(regressions['slope'][i]), 2),
+            'r-squared': round(float(regressions['rvalue'][i])**2, 3),
+            'standardError': round(float(regressions['stderr'][i]), 3),
+        })
+
+    # Best fit first, more scales wins a tie
+    results.sort(key=lambda row: (row['r-squared'], row['scales']), reverse=True)
+
+    return results
+
+
+def sweep_calculator(ticker, timeframe='1y'):
+    """
+    Fetches prices once and prints the hurst exponent of every scale scheme, marking the best fit.
+
+    Parameters
+    ----------
+    ticker      :str
+    timeframe   :str
+
+    Returns
+    -------
+    dict
+        the best fitting scheme, or a message when there is nothing to sweep
+    """
+    asset_prices = getWarehouseData(ticker, timeframe, True)
+    if (not asset_prices):
+        return 'Prices returned nil'
+
+    results = scale_sweep(asset_prices)
+    if (not results):
+        return 'Not enough history to sweep scales'
+
+    printTabs([list(row.values()) for row in results], list(results[0].keys()))
+    print(stylize("Best fit: {} (H = {}, r-squared = {})".format(
+        results[0]['scheme'], results[0]['hurstExponent'], results[0]['r-squared']), colored.fg("green")))
+
+    return results[0]
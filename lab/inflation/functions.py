@@ -1,6 +1,6 @@
 import json
 import sys
-import redis
+from ..redisdb.controller import rdb_fetch_stocks
 from .methodology import sectors
 from ..core.output import printTabs
 from ..database.hp.update_prices import batch_refresh_prices
@@ -14,10 +14,8 @@ def fetch_names():
     """
     python -c "from lab.inflation.functions import fetch_names; print(fetch_names())"
     """
-    r = redis.Redis(host='localhost', port=6379, db=0, charset="utf-8", decode_responses=True)
-
     companies = {}
-    for ticker in sectors():    
-        companies[ticker] = r.get('stock-'+ticker+'name')
+    for ticker, stock in rdb_fetch_stocks(sectors(), ['name']).items():
+        companies[ticker] = stock.get('name')
 
     printTabs(companies)
@@ -1,14 +1,14 @@
 from dotenv import load_dotenv
 import pandas as pd
 import numpy as np
-import redis
 import statistics
 import progressbar
 import json
 import sys
 from datetime import date
-from ..redisdb.controller import update_prices
+from ..redisdb.controller import update_prices, rdb_fetch_bars, rdb_fetch_reference
 from ..core.functions import chunks
+from ..core.warehouse import day_strings
 from ..core.api.gold import syncGoldPrices
 from ..core.api.batch import quoteStatsBatchRequest
 from ..core.output import printFullTable, writeCSV
@@ -68,46 +68,42 @@ def formula(data):
     though I certainly understand it's not perfect. The results are quite astounding.
     Theoretically, this should represent 'real' US asset inflation over the last 10 years.
     """
-    avgs = {}
-    index = {}
-    r = redis.Redis(host='localhost', port=6379, db=0, charset="utf-8", decode_responses=True)
-
-    for day, prices in data.items():
-        avg = statistics.mean(prices)
-        avgs[day] = avg
-    
+    days = np.array(list(data.keys()), dtype='datetime64[D]')
+    avgs = np.array([statistics.mean(prices) for prices in data.values()])
+    order = np.argsort(days)
+    days, avgs = days[order], avgs[order]
+
     syncGoldPrices()
+    gold = rdb_fetch_reference('gold', days[0], days[-1])
+    if (not len(gold)):
+        return {}
+
+    # Match each day to the gold close of the same day, days without one are dropped
+    found = np.searchsorted(gold['date'], days).clip(max=len(gold) - 1)
+    closes = gold['close'][found]
+    matched = (gold['date'][found] == days) & (closes != 0) & ~np.isnan(closes)
 
-    with progressbar.ProgressBar(max_value=len(list(avgs)), prefix='Indexing: ', redirect_stdout=True) as bar:
-        i = 0
-        for day, a in avgs.items():
-            i += 1
-            bar.update(i)
-            gold_price = r.get('gold-'+day+'-close')        
-            if (gold_price):
-                price = round(float(gold_price) / float(a), 3)
-                index[day] = price
+    prices = np.round(closes[matched] / avgs[matched], 3)
 
-    return index
+    return dict(zip(day_strings(days[matched]).tolist(), prices.tolist()))
 
 
 def calculate(update):
-    r = redis.Redis(host='localhost', port=6379, db=0, charset="utf-8", decode_responses=True)
     data = {}
 
     for ticker in progressbar.progressbar(sectors(), prefix='Calculating: '):
         if (update):
             update_prices(ticker)
 
-        prices = json.loads(r.get('stock-'+ticker+'-prices'))
+        bars = rdb_fetch_bars(ticker)
 
-        if (prices):
+        if (len(bars)):
 
-            for row in prices:
-                if (row['date'] not in data):
-                    data[row['date']] = []
+            for day, close in zip(day_strings(bars['date']), bars['close'].tolist()):
+                if (day not in data):
+                    data[day] = []
 
-                data[row['date']].append(float(row['close']))
+                data[day].append(close)
 
     data = trim_data(data)
 
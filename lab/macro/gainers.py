@@ -8,7 +8,6 @@ from ..redisdb.controller import rdb_save_stock
 from ..redisdb.controller import rdb_save_output
 import progressbar
 import json
-import time
 import sys
 from datetime import date
 load_dotenv()
@@ -27,7 +26,6 @@ failed = 0
 with progressbar.ProgressBar(max_value=chunks_length, prefix='Batch: ', redirect_stdout=True) as bar:
     for i, chunk in enumerate(chunked_etfs):
         bar.update(i)
-        time.sleep(1)
         batch = quoteStatsBatchRequest(chunk)
 
         for ticker, stockinfo in batch.items():
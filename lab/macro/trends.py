@@ -6,8 +6,7 @@ import sys
 from datetime import date
 from ..fintwit.tweet import send_tweet
 from .functions import getETFs
-from ..core.functions import chunks
-from ..core.api.batch import quoteStatsBatchRequest
+from ..core.api.batch import quoteStatsBatchRequest, iter_batches
 from ..core.output import printFullTable, writeCSV
 load_dotenv()
 django.setup()
@@ -18,12 +17,11 @@ Watchlist = apps.get_model('database', 'Watchlist')
 
 results = []
 etfs = getETFs(True)
-chunked_etfs = chunks(etfs, 100)
 
 
 def calculate_trends(timeframe='1m', gain=20):
-    for i, chunk in enumerate(chunked_etfs):
-        batch = quoteStatsBatchRequest(chunk)
+    # Batches are fetched concurrently and filtered as they arrive
+    for i, batch in enumerate(iter_batches(quoteStatsBatchRequest, etfs)):
         for ticker, stockinfo in batch.items():
             print('Chunk {}: {}'.format(i, ticker))
 
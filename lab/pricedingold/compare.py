@@ -3,29 +3,28 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib import pylab
 from ..core.imports import read_historical_gold_prices
-from ..core.functions import extract_data
 import os
 import sys
-from ..core.api.historical import getHistoricalData
+from ..core.warehouse import getWarehouseArrays, day_strings
 load_dotenv()
 
 
 def price_in_gold(ticker, timeframe='5y', sandbox=False):
-    if (sandbox):
-        asset_prices = getHistoricalData(ticker, timeframe, sandbox=True)
-    else:
-        asset_prices = getHistoricalData(ticker, timeframe)
+    asset_prices = getWarehouseArrays(ticker, timeframe, sandbox=sandbox)
 
     gold_prices = read_historical_gold_prices()
-
-    dates = []
-    prices = []
-    for day in asset_prices:
-        price = float(day['close'] / gold_prices[day['date']]) if (day['date'] in gold_prices) else 0
-        if (price == 0):
-            continue
-        dates.append(day['date'])
-        prices.append(round(price, 3))
+    gold_days = np.array(list(gold_prices.keys()), dtype='datetime64[D]').view('int64')
+    gold = np.fromiter(gold_prices.values(), dtype=np.float64, count=len(gold_prices))
+    order = np.argsort(gold_days)
+    gold_days, gold = gold_days[order], gold[order]
+
+    # Match each bar to the gold close of the same day, bars without one or without a price are dropped
+    found = np.searchsorted(gold_days, asset_prices['date']).clip(max=len(gold_days) - 1)
+    closes = asset_prices['close']
+    matched = (gold_days[found] == asset_prices['date']) & (closes != 0) & ~np.isnan(closes)
+
+    dates = list(day_strings(asset_prices['date'][matched]))
+    prices = np.round(closes[matched] / gold[found[matched]], 3)
 
 
     x = dates
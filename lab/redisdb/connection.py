@@ -0,0 +1,82 @@
+from dotenv import load_dotenv
+import threading
+import redis
+import os
+load_dotenv()
+
+# One connection pool per process, shared by every module that talks to redis. A client on the pool is only a handle,
+# connections are opened on first use and handed back after each command, so call rdb_connection() as often as you like.
+# Configured with REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD and REDIS_MAX_CONNECTIONS.
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def redis_pool(decode=True):
+    """
+    The shared pool, (one for decoded str replies and one for raw bytes).
+    """
+    with pools_lock:
+        if (decode not in pools):
+            pools[decode] = redis.ConnectionPool(
+                host=os.environ.get('REDIS_HOST', 'localhost'),
+                port=int(os.environ.get('REDIS_PORT', 6379)),
+                db=int(os.environ.get('REDIS_DB', 0)),
+                password=os.environ.get('REDIS_PASSWORD') or None,
+                max_connections=int(os.environ.get('REDIS_MAX_CONNECTIONS', 64)),
+                encoding='utf-8',
+                decode_responses=decode,
+            )
+
+        return pools[decode]
+
+
+def rdb_connection(decode=True):
+    """
+    Redis client on the shared pool.
+
+    Parameters
+    ----------
+    decode      :bool
+                 False for a client returning bytes, (binary values)
+
+    Returns
+    -------
+    redis.Redis
+    """
+    return redis.Redis(connection_pool=redis_pool(decode))
+
+
+def rdb_pipeline(transaction=False, decode=True):
+    """
+    Buffers commands until execute(), so any number of writes cost one round trip.
+
+    Parameters
+    ----------
+    transaction :bool
+                 wrap the commands in MULTI/EXEC
+
+    Returns
+    -------
+    redis.client.Pipeline
+    """
+    return rdb_connection(decode).pipeline(transaction=transaction)
+
+
+def rdb_transaction(func, *watches, decode=True):
+    """
+    Optimistic transaction. func(pipe) reads the watched keys, then calls pipe.multi() and queues its writes.
+    It is retried whenever a watched key changes before EXEC.
+
+    Parameters
+    ----------
+    func        :function
+    watches     :str
+                 keys to WATCH
+
+    Returns
+    -------
+    list
+        replies of the queued commands
+    """
+    return rdb_connection(decode).transaction(func, *watches)
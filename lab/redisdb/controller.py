@@ -1,7 +1,10 @@
 import json
-import redis
+import numpy as np
 from datetime import datetime, date, timedelta
 from ..core.api.historical import getHistoricalData
+from ..core.warehouse import bars_from_chart
+from .connection import rdb_connection, rdb_pipeline
+from .series import save_series, append_series, fetch_series, series_last_day
 import sys
 import os
 
@@ -65,7 +68,7 @@ def allowed_key(typecast, key):
         allowed = [
             # HistoricalPrices
             'prices',
-            'prices-datapoints'
+            'prices-dates'
         ]
 
     if (typecast == 'correlations'):
@@ -81,60 +84,193 @@ def allowed_key(typecast, key):
         return False
 
 
-def rdb_save_stock(ticker, data):
+def stock_key(ticker):
     """
-    Dynamically saves data to the redis db under the typecast 'stock-'.
+    Hash holding every field of one stock, (see schema.py).
+    """
+    return 'stock-{}'.format(ticker)
+
+
+def rdb_save_stock(ticker, data, pipe=None):
+    """
+    Saves stock fields to the ticker's hash, (HSET stock-{ticker}).
     Refer to redisdb/schema.py to see standard schema.
-    Make sure not to include ticker in the data object. Ticker should be pass separately.
+    Fields not allowed by allowed_key('stock', ...) and empty values are left out, as is the ticker itself.
 
     Parameters
     ----------
     ticker    :string
     data      :dict
                dict object of stock data
+    pipe      :redis.client.Pipeline
+               queue the write on a pipeline, (see rdb_pipeline()), instead of sending it now
 
     Returns
     -------
     bool
+        False if there was nothing to save
+    """
+    fields = {}
+    for key, value in data.items():
+        if (key != ticker and allowed_key('stock', key) and value):
+            fields[key] = value if (isinstance(value, (str, bytes, int, float))) else str(value)
+    if (not fields):
+        return False
+
+    r = pipe if (pipe is not None) else rdb_connection()
+    r.hset(stock_key(ticker), mapping=fields)
+
+    return True
+
+
+def rdb_fetch_stock(ticker):
+    """
+    Every saved field of a stock, (one HGETALL).
+
+    Returns
+    -------
+    dict
+        values as strings, empty if nothing is saved
+    """
+    return rdb_connection().hgetall(stock_key(ticker))
+
+
+def rdb_fetch_stocks(tickers, fields=None, size=1000):
+    """
+    Saved fields of many stocks, pipelined `size` tickers at a time.
+
+    Parameters
+    ----------
+    tickers   :list
+    fields    :list
+               fields to read, (HMGET), defaults to all of them, (HGETALL)
+    size      :int
+               tickers per round trip
+
+    Returns
+    -------
+    dict
+        {ticker: {field: str}}, fields that aren't saved are left out
+    """
+    tickers = list(tickers)
+    stocks = {}
+    for i in range(0, len(tickers), size):
+        batch = tickers[i:i + size]
+        with rdb_pipeline() as pipe:
+            for ticker in batch:
+                if (fields):
+                    pipe.hmget(stock_key(ticker), fields)
+                else:
+                    pipe.hgetall(stock_key(ticker))
+            replies = pipe.execute()
+
+        for ticker, reply in zip(batch, replies):
+            if (fields):
+                reply = {field: value for field, value in zip(fields, reply) if (value is not None)}
+            stocks[ticker] = reply
+
+    return stocks
+
+
+def rdb_fetch_prices(tickers, size=1000):
     """
+    Latest prices of many tickers, (as saved by syncPrices()), read with one pipelined HGET per ticker, `size` tickers
+    per round trip.
+
+    Parameters
+    ----------
+    tickers   :list
+    size      :int
+               tickers per round trip
+
+    Returns
+    -------
+    dict
+        {ticker: float}, tickers without a saved price are left out
+    """
+    prices = {}
+    for ticker, stock in rdb_fetch_stocks(tickers, ['price'], size).items():
+        if (stock.get('price')):
+            prices[ticker] = float(stock['price'])
+
+    return prices
 
-    r = redis.Redis(host='localhost', port=6379, db=0, charset="utf-8", decode_responses=True)
-    keys = data.keys()
 
-    for key in keys:
-        if (key == ticker):
-            # Prevent bad data insert
-            continue
-        if (allowed_key('stock', key) and data.get(key, False)):
-            r.set('stock-{}-{}'.format(ticker, key), data[key])
-            return True
-        else:
-            return False
+def prices_key(ticker):
+    """
+    Packed daily bars of a stock, (see series.py).
+    """
+    return 'stock-{}-prices'.format(ticker)
 
 
 def rdb_save_prices(ticker, prices):
     """
-    Dynamically saves data to the redis db under the typecast 'stock-'.
+    Replaces the historical prices of a stock with packed binary bars, (see series.py).
     Refer to redisdb/schema.py to see standard schema.
-    Make sure not to include ticker in the data object. Ticker should be pass separately.
 
     Parameters
     ----------
     ticker    :string
-    data      :list
-               list of dicts containing historical prices
+    prices    :list|np.ndarray
+               list of dicts containing historical prices, (as getHistoricalData() returns), or warehouse bars
 
     Returns
     -------
     bool
     """
-    r = redis.Redis(host='localhost', port=6379, db=0, charset="utf-8", decode_responses=True)
-    r.set('stock-'+ticker+'-prices', json.dumps(prices))
-    r.set('stock-'+ticker+'-prices-datapoints', len(prices))
+    bars = prices if (isinstance(prices, np.ndarray)) else bars_from_chart(prices)
+    save_series(prices_key(ticker), bars)
     return True
 
 
+def rdb_fetch_bars(ticker, start=None, end=None):
+    """
+    Historical prices of a stock, optionally between two dates, (inclusive).
+
+    Parameters
+    ----------
+    ticker    :string
+    start     :str|datetime.date
+    end       :str|datetime.date
+
+    Returns
+    -------
+    np.ndarray of BAR
+        oldest first, a read only view of the redis reply, (see fetch_series())
+    """
+    return fetch_series(prices_key(ticker), start, end)
+
+
+def reference_key(name):
+    """
+    Packed daily bars of a reference series, (gold...), see series.py.
+    """
+    return '{}-prices'.format(name)
+
+
+def rdb_fetch_reference(name, start=None, end=None):
+    """
+    Daily bars of a reference series, optionally between two dates, (inclusive).
+
+    Parameters
+    ----------
+    name      :string
+               'gold'
+    start     :str|datetime.date
+    end       :str|datetime.date
+
+    Returns
+    -------
+    np.ndarray of BAR
+        oldest first, a read only view of the redis reply, (see fetch_series())
+    """
+    return fetch_series(reference_key(name), start, end)
+
+
 def update_prices(ticker):
+    """
+    Appends the days missing since the last saved bar, (the full history if none is saved).
+    """
 
     def calculate_range(diff):
         if (diff < 5):
@@ -154,35 +290,27 @@ def update_prices(ticker):
 
         return 'max'
 
-    r = redis.Redis(host='localhost', port=6379, db=0, charset="utf-8", decode_responses=True)
-    prices = json.loads(r.get('stock-'+ticker+'-prices'))
-
-    lastdate = datetime.strptime(prices[-1]['date'], '%Y-%m-%d')
-    today = datetime.now()
-
-    diff = abs((today - lastdate).days)
-
-    if (diff <= 3):
-        return
-
-    latest_prices = getHistoricalData(ticker, calculate_range(diff), priceOnly=True)
-
-    for i, day in enumerate(list(reversed(latest_prices))):
-        prices.append(day)
-        if (day['date'] == prices[-1]['date']):
-            break
+    lastdate = series_last_day(prices_key(ticker))
+    timeframe = 'max'
+    if (lastdate is not None):
+        diff = abs((date.today() - lastdate.astype(date)).days)
+        if (diff <= 3):
+            return
+        timeframe = calculate_range(diff)
 
-    rdb_save_prices(ticker, prices)
+    latest_prices = getHistoricalData(ticker, timeframe, priceOnly=True)
+    if (latest_prices and isinstance(latest_prices, list)):
+        append_series(prices_key(ticker), bars_from_chart(latest_prices))
 
 
 def rdb_save_output(output):
-    r = redis.Redis(host='localhost', port=6379, db=0, charset="utf-8", decode_responses=True)
+    r = rdb_connection()
     r.set('lab-last-output', json.dumps(output))
     return True
 
 
 def fetch_last_output():
-    r = redis.Redis(host='localhost', port=6379, db=0, charset="utf-8", decode_responses=True)
+    r = rdb_connection()
     op = r.get('lab-last-output')
     if (op):
         return json.loads(op)
@@ -1,38 +1,147 @@
+import base64
+import gzip
 import json
-import redis
-from ..core.functions import zipfolder
-from datetime import datetime, date, timedelta
-from .schema import rdb_schema
+from .connection import rdb_connection
+from .schema import rdb_schema, SCHEMA_VERSION_KEY
 import progressbar
 import colored
-from colored import stylize 
+from colored import stylize
 import sys
 import os
 
+# Backups are gzipped newline delimited json, one record per key, written while the keyspace is scanned:
+# {"key": ..., "type": "string|hash|zset|list|set", "ttl": milliseconds or -1, "value": ..., "base64": bool}
+# Values are utf-8 text where they can be, binary ones, (packed price series), are base64 encoded.
+# The first line is a header, {"schema": version}. Memory stays bounded by one SCAN batch.
 
-def export_rdb():
-    if (os.path.exists("lab/redisdb/export/rdb_export.zip")):
-        os.remove("lab/redisdb/export/rdb_export.zip")
-        
-    r = redis.Redis(host='localhost', port=6379, db=0, charset="utf-8", decode_responses=True)
-    roots = rdb_schema()
-
-    for root in roots:
-        dictexport = {}
-        filename = "{}_rdb.json".format(root.split('-')[0])
-        json_output = "lab/redisdb/export/"+filename
-        print(stylize("Exporting keys containing "+root, colored.fg("yellow")))
-        for key in progressbar.progressbar(r.scan_iter(root)):
-            value = r.get(key)
-            try:
-                dictexport[key] = json.loads(value)
-            except json.decoder.JSONDecodeError:
-                dictexport[key] = value
-
-        with open(json_output, 'w') as json_file:
-            json.dump(dictexport, json_file)
-            print(stylize("Exported "+filename, colored.fg("green")))
-
-    zipfolder("lab/redisdb/export/", "rdb_export.zip")
-    print(stylize("Zipped file", colored.fg("green")))
+EXPORT_PATH = 'lab/redisdb/export/rdb_export.ndjson.gz'
 
+
+def encode_record(key, keytype, ttl, value):
+    """
+    One backup record. Every bytes object in value is decoded as utf-8, or base64 if any of them isn't text.
+    """
+    def flatten(value):
+        if (isinstance(value, bytes)):
+            return [value]
+        if (isinstance(value, dict)):
+            return [item for pair in value.items() for item in pair]
+        if (isinstance(value, (list, tuple))):
+            return [item for member in value for item in flatten(member)]
+        return []
+
+    try:
+        for item in flatten(value):
+            item.decode('utf-8')
+        decode = lambda item: item.decode('utf-8')
+        binary = False
+    except UnicodeDecodeError:
+        decode = lambda item: base64.b64encode(item).decode('ascii')
+        binary = True
+
+    def convert(value):
+        if (isinstance(value, bytes)):
+            return decode(value)
+        if (isinstance(value, dict)):
+            return {decode(field): decode(item) for field, item in value.items()}
+        if (isinstance(value, (list, tuple))):
+            return [convert(member) for member in value]
+        return value
+
+    return {
+        'key': key.decode('utf-8', 'surrogateescape'),
+        'type': keytype,
+        'ttl': ttl,
+        'value': convert(value),
+        'base64': binary,
+    }
+
+
+def scan_records(r, match, count=1000):
+    """
+    Records of every key matching a pattern, read with SCAN COUNT and two pipelines per batch.
+
+    Returns
+    -------
+    generator of dicts, (see encode_record())
+    """
+    cursor = None
+    while (cursor != 0):
+        cursor, keys = r.scan(cursor or 0, match=match, count=count)
+        if (not keys):
+            continue
+
+        with r.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.type(key)
+                pipe.pttl(key)
+            replies = pipe.execute()
+        types = [keytype.decode('utf-8') for keytype in replies[0::2]]
+        ttls = replies[1::2]
+
+        strings = [key for key, keytype in zip(keys, types) if (keytype == 'string')]
+        with r.pipeline(transaction=False) as pipe:
+            if (strings):
+                pipe.mget(strings)
+            for key, keytype in zip(keys, types):
+                if (keytype == 'hash'):
+                    pipe.hgetall(key)
+                elif (keytype == 'zset'):
+                    pipe.zrange(key, 0, -1, withscores=True)
+                elif (keytype == 'list'):
+                    pipe.lrange(key, 0, -1)
+                elif (keytype == 'set'):
+                    pipe.smembers(key)
+            replies = pipe.execute()
+
+        values = dict(zip(strings, replies.pop(0) if (strings) else []))
+        for key, keytype, ttl in zip(keys, types, ttls):
+            if (keytype == 'string'):
+                value = values[key]
+            elif (keytype in ['hash', 'zset', 'list', 'set']):
+                value = replies.pop(0)
+                if (keytype == 'set'):
+                    value = sorted(value)
+            else:
+                # Streams and deleted keys aren't backed up
+                continue
+            if (value is None):
+                continue
+
+            yield encode_record(key, keytype, ttl if (ttl and ttl > 0) else -1, value)
+
+
+def export_rdb(path=EXPORT_PATH, count=1000):
+    """
+    Streams every key under the schema's roots, (see rdb_schema()), into a gzipped backup.
+
+    Parameters
+    ----------
+    path      :str
+    count     :int
+               SCAN COUNT hint, (keys per round trip)
+
+    Returns
+    -------
+    int
+        number of keys exported
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    r = rdb_connection(decode=False)
+    exported = 0
+
+    with gzip.open(path + '.tmp', 'wt', encoding='utf-8') as backup:
+        version = r.get(SCHEMA_VERSION_KEY)
+        backup.write(json.dumps({'schema': int(version) if (version) else 1}) + '\n')
+
+        for root in rdb_schema():
+            print(stylize("Exporting keys containing "+root, colored.fg("yellow")))
+            for record in progressbar.progressbar(scan_records(r, root + '-*', count)):
+                backup.write(json.dumps(record) + '\n')
+                exported += 1
+
+    # Swapped in once complete, so an interrupted export never replaces a good backup
+    os.replace(path + '.tmp', path)
+    print(stylize("Exported {} keys to {}".format(exported, path), colored.fg("green")))
+
+    return exported
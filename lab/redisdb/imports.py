@@ -1,34 +1,108 @@
+import base64
+import gzip
 import json
-import redis
-from ..core.functions import unzip_folder
-from datetime import datetime, date, timedelta
-from .schema import rdb_schema
+from .connection import rdb_connection
+from .schema import SCHEMA_VERSION_KEY
 import progressbar
 import colored
 from colored import stylize
 import sys
 import os
 
-def import_rdb():
-    directory = "lab/redisdb/imports/"
-    filepath = "lab/redisdb/imports/rdb_export.zip"
-    if (os.path.exists(filepath)):
-
-        unzip_folder(directory, filepath)
-        r = redis.Redis(host='localhost', port=6379, db=0, charset="utf-8", decode_responses=True)
-        
-        for root, dirs, files in os.walk(directory+"export/"):
-            for file in files:
-                with open(directory+"export/"+file) as jsonfile:
-                    print(stylize("Saving key values from "+file, colored.fg("yellow")))
-                    rdb_data = json.loads(jsonfile.read())
-                    keys = rdb_data.keys()
-                    for key in progressbar.progressbar(keys):
-                        try:
-                            r.set(key, json.dumps(rdb_data[key]))
-                        except json.decoder.JSONDecodeError:
-                            r.set(key, rdb_data[key])
-            print(stylize("Saved "+file, colored.fg("green")))
-
-    print(stylize("Import complete", colored.fg("green")))
+IMPORT_PATH = 'lab/redisdb/imports/rdb_export.ndjson.gz'
 
+
+def decode_record(record):
+    """
+    (key, value) of a backup record as bytes, (see export.encode_record()).
+    """
+    decode = (lambda item: base64.b64decode(item)) if (record.get('base64')) else (lambda item: item.encode('utf-8'))
+
+    def convert(value):
+        if (isinstance(value, str)):
+            return decode(value)
+        if (isinstance(value, dict)):
+            return {decode(field): decode(item) for field, item in value.items()}
+        if (isinstance(value, list)):
+            return [convert(member) for member in value]
+        return value
+
+    return record['key'].encode('utf-8', 'surrogateescape'), convert(record['value'])
+
+
+def restore_batch(r, records):
+    """
+    Writes a batch of records with one pipeline, strings with a single MSET.
+    """
+    strings = {}
+    expires = {}
+    with r.pipeline(transaction=False) as pipe:
+        for record in records:
+            key, value = decode_record(record)
+            if (record.get('ttl', -1) > 0):
+                expires[key] = record['ttl']
+            if (record['type'] == 'string'):
+                strings[key] = value
+            else:
+                pipe.delete(key)
+                if (record['type'] == 'hash' and value):
+                    pipe.hset(key, mapping=value)
+                elif (record['type'] == 'zset' and value):
+                    pipe.zadd(key, {member: float(score) for member, score in value})
+                elif (record['type'] == 'list' and value):
+                    pipe.rpush(key, *value)
+                elif (record['type'] == 'set' and value):
+                    pipe.sadd(key, *value)
+        if (strings):
+            pipe.mset(strings)
+        for key, ttl in expires.items():
+            pipe.pexpire(key, ttl)
+        pipe.execute()
+
+
+def import_rdb(path=IMPORT_PATH, count=1000):
+    """
+    Streams a backup written by export_rdb() back into redis, `count` keys per round trip.
+
+    Parameters
+    ----------
+    path      :str
+    count     :int
+               keys per pipeline
+
+    Returns
+    -------
+    int
+        number of keys imported
+    """
+    if (not os.path.exists(path)):
+        print(stylize("No backup at "+path, colored.fg("red")))
+        return 0
+
+    r = rdb_connection(decode=False)
+    imported = 0
+    batch = []
+
+    print(stylize("Saving key values from "+path, colored.fg("yellow")))
+    with gzip.open(path, 'rt', encoding='utf-8') as backup:
+        for line in progressbar.progressbar(backup):
+            if (not line.strip()):
+                continue
+            record = json.loads(line)
+            if ('schema' in record):
+                r.set(SCHEMA_VERSION_KEY, record['schema'])
+                continue
+
+            batch.append(record)
+            if (len(batch) >= count):
+                restore_batch(r, batch)
+                imported += len(batch)
+                batch = []
+
+    if (batch):
+        restore_batch(r, batch)
+        imported += len(batch)
+
+    print(stylize("Import complete, {} keys".format(imported), colored.fg("green")))
+
+    return imported
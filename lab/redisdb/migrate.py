@@ -0,0 +1,169 @@
+from .connection import rdb_connection, rdb_pipeline
+from .controller import allowed_key, stock_key, rdb_save_prices, reference_key
+from .schema import SCHEMA_VERSION, SCHEMA_VERSION_KEY
+from .series import dates_key, save_series, fetch_series
+from ..core.warehouse import bars_from_chart
+import numpy as np
+import json
+import colored
+from colored import stylize
+
+
+def schema_version():
+    """
+    Schema version of the redis db, 1 if it predates versioning.
+    """
+    version = rdb_connection().get(SCHEMA_VERSION_KEY)
+
+    return int(version) if (version) else 1
+
+
+def field_key(key):
+    """
+    (ticker, field) of a version 1 stock key, 'stock-'+ticker+'-'+field, None for any other key.
+    """
+    if (not key.startswith('stock-') or key.count('-') < 2):
+        return None
+    ticker, field = key[len('stock-'):].rsplit('-', 1)
+    if (not ticker or not allowed_key('stock', field)):
+        return None
+
+    return ticker, field
+
+
+def migrate_stock_hashes(count=1000):
+    """
+    Version 1 to 2. Folds every 'stock-'+ticker+'-'+field string key into the ticker's hash and deletes it.
+    Keys are scanned `count` at a time and each batch is read, written and deleted with one pipeline apiece, so the
+    migration can be interrupted and rerun.
+
+    Parameters
+    ----------
+    count     :int
+               SCAN COUNT hint, (keys per batch)
+
+    Returns
+    -------
+    int
+        number of keys folded into hashes
+    """
+    r = rdb_connection()
+    migrated = 0
+    cursor = None
+    while (cursor != 0):
+        cursor, keys = r.scan(cursor or 0, match='stock-*', count=count)
+        fields = [(key, field_key(key)) for key in keys]
+        fields = [(key, parsed) for key, parsed in fields if (parsed)]
+        if (not fields):
+            continue
+
+        with rdb_pipeline() as pipe:
+            for key, parsed in fields:
+                pipe.type(key)
+                pipe.get(key)
+            replies = pipe.execute(raise_on_error=False)
+
+        with rdb_pipeline(transaction=True) as pipe:
+            for i, (key, (ticker, field)) in enumerate(fields):
+                keytype, value = replies[i * 2], replies[i * 2 + 1]
+                if (keytype != 'string'):
+                    continue
+                if (value not in [None, '']):
+                    pipe.hset(stock_key(ticker), field, value)
+                pipe.delete(key)
+                migrated += 1
+            pipe.execute()
+
+    return migrated
+
+
+def migrate_price_series(count=1000):
+    """
+    Version 2 to 3. Converts every 'stock-'+ticker+'-prices' json list of dicts into packed binary bars, (see
+    series.py), and deletes its '-prices-datapoints' count. Series that already have their dates key are binary and
+    are left alone.
+
+    Returns
+    -------
+    int
+        number of series converted
+    """
+    r = rdb_connection(decode=False)
+    migrated = 0
+    for key in r.scan_iter(match='stock-*-prices', count=count):
+        key = key.decode('utf-8')
+        if (r.exists(dates_key(key))):
+            continue
+        value = r.get(key)
+        if (not value):
+            continue
+
+        ticker = key[len('stock-'):-len('-prices')]
+        prices = [day for day in json.loads(value) if (isinstance(day, dict) and day.get('date'))]
+        rdb_save_prices(ticker, bars_from_chart(prices))
+        r.delete(key + '-datapoints')
+        migrated += 1
+
+    return migrated
+
+
+def migrate_gold_series(count=1000):
+    """
+    Version 3 to 4. Folds the 'gold-'+date+'-'+field keys, (four per day), into the gold series, (see series.py),
+    and deletes them. Days already in the series keep their saved bar.
+
+    Returns
+    -------
+    int
+        number of keys folded into the series
+    """
+    r = rdb_connection()
+    days = {}
+    keys = []
+    for key in r.scan_iter(match='gold-*-*-*-*', count=count):
+        day, field = key[len('gold-'):len('gold-') + 10], key[len('gold-') + 11:]
+        if (field in ['open', 'high', 'low', 'close']):
+            keys.append(key)
+            days.setdefault(day, {'date': day})
+
+    for i in range(0, len(keys), count):
+        batch = keys[i:i + count]
+        for key, value in zip(batch, r.mget(batch)):
+            if (value):
+                days[key[len('gold-'):len('gold-') + 10]][key[len('gold-') + 11:]] = float(value)
+
+    if (days):
+        series = reference_key('gold')
+        save_series(series, np.concatenate([bars_from_chart(list(days.values())), fetch_series(series)]))
+
+    for i in range(0, len(keys), count):
+        r.delete(*keys[i:i + count])
+
+    return len(keys)
+
+
+# version: migration to it from the previous version
+MIGRATIONS = {
+    2: migrate_stock_hashes,
+    3: migrate_price_series,
+    4: migrate_gold_series,
+}
+
+
+def migrate_rdb():
+    """
+    Brings the redis db up to SCHEMA_VERSION.
+    """
+    version = schema_version()
+    if (version >= SCHEMA_VERSION):
+        print(stylize("Schema is up to date, (version {})".format(version), colored.fg("green")))
+        return version
+
+    r = rdb_connection()
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        print(stylize("Migrating to schema version {}".format(target), colored.fg("yellow")))
+        migrated = MIGRATIONS[target]()
+        r.set(SCHEMA_VERSION_KEY, target)
+        print(stylize("Migrated {} keys".format(migrated), colored.fg("green")))
+
+    return SCHEMA_VERSION
@@ -8,75 +8,57 @@ from dotenv import load_dotenv
 load_dotenv()
 django.setup()
 
+SCHEMA_VERSION = 4
+SCHEMA_VERSION_KEY = 'rdb-schema-version'
+
 
 def rdb_schema():
     """
-    This is the standard redis db schema for this app, built on key,value pairs.
-    The keys are differentiated by tickers.
-
-
-    # Stocks
-    'stock-'+ticker+'-name'
-    'stock-'+ticker+'-industry' 
-    'stock-'+ticker+'-employees' 
-    'stock-'+ticker+'-price' 
-    'stock-'+ticker+'-sector' 
-    'stock-'+ticker+'-description'
+    This is the standard redis db schema for this app, (version SCHEMA_VERSION, stored under SCHEMA_VERSION_KEY).
+    Stock fields live in one hash per ticker, everything else is built on key,value pairs differentiated by tickers.
+    Version 1 kept every stock field in its own key, 'stock-'+ticker+'-'+field, version 2 kept historical prices
+    as json and version 3 kept gold as four keys per day, 'gold-'+date+'-'+field, (see migrate.py).
 
-    # Gold
-    'gold-'+date+'-open' 
-    'gold-'+date+'-low' 
-    'gold-'+date+'-high' 
-    'gold-'+date+'-close' 
 
+    # Stocks, (hash 'stock-'+ticker, fields validated by allowed_key('stock', field))
+    name, industry, employees, price, sector, description
     # Earnings
-    'stock-'+ticker+'-ttmEPS' 
-
+    ttmEPS
     # Financials
-    'stock-'+ticker+'-reportDate'
-    'stock-'+ticker+'-netIncome'
-    'stock-'+ticker+'-netWorth'
-    'stock-'+ticker+'-shortTermDebt'
-    'stock-'+ticker+'-longTermDebt'
-    'stock-'+ticker+'-totalCash'
-    'stock-'+ticker+'-totalDebt'
-    'stock-'+ticker+'-debtToEquity'
-    'stock-'+ticker+'-priceToSales'
-    'stock-'+ticker+'-EBITDA'
-    'stock-'+ticker+'-freeCashFlow'
-    'stock-'+ticker+'-freeCashFlowPerShare'
-    'stock-'+ticker+'-freeCashFlowYield'
-    'stock-'+ticker+'-longTermDebtToEquity'
-
+    reportDate, netIncome, netWorth, shortTermDebt, longTermDebt, totalCash, totalDebt, debtToEquity, priceToSales,
+    EBITDA, freeCashFlow, freeCashFlowPerShare, freeCashFlowYield, longTermDebtToEquity
     # Stock Trends
-    'stock-'+ticker+'-week52'
-    'stock-'+ticker+'-day5ChangePercent'
-    'stock-'+ticker+'-month1ChangePercent'
-    'stock-'+ticker+'-ytdChangePercent'
-    'stock-'+ticker+'-day50MovingAvg'
-    'stock-'+ticker+'-day200MovingAvg'
-    'stock-'+ticker+'-avgPricetarget'
-    'stock-'+ticker+'-highPriceTarget'
-    'stock-'+ticker+'-fromPriceTarget'
-    'stock-'+ticker+'-fromHigh'
+    week52, day5ChangePercent, month1ChangePercent, ytdChangePercent, day50MovingAvg, day200MovingAvg,
+    avgPricetarget, highPriceTarget, fromPriceTarget, fromHigh
+    # Valuation
+    peRatio
+
+    # Gold, (packed binary bars, see series.py)
+    'gold-prices'
+    'gold-prices-dates'
 
     # Google Trends
     'trends-'+ticker+'-interest'
 
-    # Valuation
-    'stock-'+ticker+'-peRatio'
-
-    # HistoricalPrices
-    'stock-'+ticker+'-prices' (json.dump)
-    'stock-'+ticker+'-prices-datapoints' 
+    # HistoricalPrices, (packed binary bars, see series.py)
+    'stock-'+ticker+'-prices'
+    'stock-'+ticker+'-prices-dates'
 
     # Correlations
     'correlation-'+t1+'-'+t2+'-rvalue'
     'correlation-'+t1+'-'+t2+'-datapoints'
 
+    # Hurst, (see hurst/cache.py)
+    'stock-'+ticker+'-hurst-'+timeframe+'-'+estimator (json.dump, expires at midnight)
+    'hurst-'+digest (json.dump, expires after 7 days)
+    'hurst-lru' (sorted set)
+
     #Output
     'lab-last-output'
 
+    # Schema version
+    'rdb-schema-version'
+
     """
 
     key_roots = [
@@ -1,21 +1,21 @@
 import django
 from django.apps import apps
 from ...core.imports import read_historical_gold_prices
+from ...core.warehouse import bars_from_chart
+from ..controller import reference_key
+from ..series import save_series, fetch_series
+import numpy as np
 import json
-import redis
 import sys
 import os
 from dotenv import load_dotenv
 load_dotenv()
 django.setup()
 
-r = redis.Redis(host='localhost', port=6379, db=0, charset="utf-8", decode_responses=True)
-
 gold_prices = read_historical_gold_prices(datepriceOnly=False)
+bars = bars_from_chart([dict(g, date=day) for day, g in gold_prices.items()])
 
-for day, g in gold_prices.items():
-    print('Saved {} - {}'.format(day, g['close']))
-    r.set('gold-'+day+'-close', g['close'])
-    r.set('gold-'+day+'-open',g['open'])
-    r.set('gold-'+day+'-high', g['high'])
-    r.set('gold-'+day+'-low', g['low'])
+# Days synced since the csv was exported are kept, (saved after the csv so they win on the same day)
+key = reference_key('gold')
+saved = save_series(key, np.concatenate([bars, fetch_series(key)]))
+print('Saved {} gold prices, {} - {}'.format(saved, bars['date'][0], bars['date'][-1]))
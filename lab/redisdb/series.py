@@ -0,0 +1,137 @@
+import numpy as np
+from .connection import rdb_connection, rdb_pipeline, rdb_transaction
+from ..core.warehouse import BAR
+
+# Daily series packed the way the warehouse stores them, (see core/warehouse.py): fixed size little endian records,
+# oldest first, in one string key, next to a second key of just the int64 dates. A date range read fetches the dates,
+# binary searches them and GETRANGEs only the records in between. Appending days is an APPEND to both keys.
+# Reads go through a client that doesn't decode replies, so the records are np.frombuffer() views of the reply bytes.
+
+RECORD = BAR.newbyteorder('<')
+DAY = np.dtype('<i8')
+
+
+def dates_key(key):
+    return key + '-dates'
+
+
+def to_day(value):
+    """
+    Days since 1970-01-01 of a 'YYYY-MM-DD' string, date, datetime or np.datetime64.
+    """
+    return int(np.datetime64(value, 'D').astype(np.int64))
+
+
+def pack_series(records):
+    """
+    Records sorted by date, one per day, (the last of duplicates wins), as RECORD.
+    """
+    records = np.asarray(records).astype(RECORD)
+    if (not len(records)):
+        return records
+    records = records[np.argsort(records['date'], kind='stable')]
+    days = records['date'].view(DAY)
+    last = np.append(days[1:] != days[:-1], True)
+
+    return records[last]
+
+
+def series_dates(key):
+    """
+    Returns
+    -------
+    np.ndarray of int64
+        days since 1970-01-01 of every stored record
+    """
+    return np.frombuffer(rdb_connection(decode=False).get(dates_key(key)) or b'', dtype=DAY)
+
+
+def series_last_day(key):
+    """
+    Newest stored day as np.datetime64, None for an empty series.
+    """
+    last = rdb_connection(decode=False).getrange(dates_key(key), -DAY.itemsize, -1)
+    if (len(last) < DAY.itemsize):
+        return None
+
+    return np.frombuffer(last, dtype=DAY)[0].astype('datetime64[D]')
+
+
+def save_series(key, records):
+    """
+    Replaces a series.
+
+    Parameters
+    ----------
+    key       :str
+    records   :np.ndarray
+               anything castable to RECORD, (warehouse bars)
+
+    Returns
+    -------
+    int
+        number of records saved
+    """
+    records = pack_series(records)
+    with rdb_pipeline(transaction=True, decode=False) as pipe:
+        pipe.set(key, records.tobytes())
+        pipe.set(dates_key(key), records['date'].view(DAY).tobytes())
+        pipe.execute()
+
+    return len(records)
+
+
+def append_series(key, records):
+    """
+    Appends the records newer than the newest stored day. Safe against concurrent appends, (WATCH on the dates).
+
+    Returns
+    -------
+    int
+        number of records appended
+    """
+    records = pack_series(records)
+    appended = []
+
+    def append(pipe):
+        last = pipe.getrange(dates_key(key), -DAY.itemsize, -1)
+        newer = records
+        if (len(last) == DAY.itemsize):
+            newer = records[records['date'].view(DAY) > np.frombuffer(last, dtype=DAY)[0]]
+        appended[:] = [len(newer)]
+        pipe.multi()
+        if (len(newer)):
+            pipe.append(key, newer.tobytes())
+            pipe.append(dates_key(key), newer['date'].view(DAY).tobytes())
+
+    rdb_transaction(append, dates_key(key), decode=False)
+
+    return appended[0]
+
+
+def fetch_series(key, start=None, end=None):
+    """
+    Records of a series, optionally between two dates, (inclusive).
+
+    Parameters
+    ----------
+    key       :str
+    start     :str|datetime.date|np.datetime64
+    end       :str|datetime.date|np.datetime64
+
+    Returns
+    -------
+    np.ndarray of RECORD
+        oldest first, read only, empty if nothing is stored in the range
+    """
+    r = rdb_connection(decode=False)
+    if (start is None and end is None):
+        return np.frombuffer(r.get(key) or b'', dtype=RECORD)
+
+    days = series_dates(key)
+    first = int(np.searchsorted(days, to_day(start), side='left')) if (start is not None) else 0
+    last = int(np.searchsorted(days, to_day(end), side='right')) if (end is not None) else len(days)
+    if (last <= first):
+        return np.zeros(0, dtype=RECORD)
+
+    return np.frombuffer(r.getrange(key, first * RECORD.itemsize, last * RECORD.itemsize - 1), dtype=RECORD)
@@ -2,39 +2,37 @@ import statistics
 import sys
 import math
 import json
-from ..core.functions import extract_data, removeZeroes
-from ..core.api.historical import getHistoricalData
+from ..core.warehouse import getWarehouseArrays, nonzero
 from ..core.api.stats import getCurrentPrice
 from datetime import datetime
 
 
 def rangeRules(ticker):
     signalArray = {}
-    assetData = getHistoricalData(ticker, timeframe='3m')    
+    assetData = getWarehouseArrays(ticker, timeframe='3m', newest=True)
     # --------------------------------------------
-    # Data
-    prices = list(reversed(removeZeroes(extract_data(assetData, 'close'))))
+    # Data, (newest first, zero and missing bars dropped)
+    prices = nonzero(assetData['close']).compressed()
     current_price = getCurrentPrice(ticker)
-    highs = list(reversed(removeZeroes(extract_data(assetData, 'high'))))
-    lows = list(reversed(removeZeroes(extract_data(assetData, 'low'))))
-    dates = list(reversed(removeZeroes(extract_data(assetData, 'date'))))
-    volumes = list(reversed(removeZeroes(extract_data(assetData, 'volume'))))
+    highs = nonzero(assetData['high']).compressed()
+    lows = nonzero(assetData['low']).compressed()
+    volumes = nonzero(assetData['volume']).compressed()
     # --------------------------------------------
 
     # -------------------------------------------
     # Technicals
-    technicalDonchianHigh = max(highs[:22])
-    technicalDonchianLow = min(lows[:22])
-    week3DonchianHigh = max(highs[:16])
-    week3DonchianLow = min(lows[:16])
+    technicalDonchianHigh = float(highs[:22].max())
+    technicalDonchianLow = float(lows[:22].min())
+    week3DonchianHigh = float(highs[:16].max())
+    week3DonchianLow = float(lows[:16].min())
     trend = ((prices[0] - prices[-1]) / prices[-1]) * 100 if (prices[0] != 0 and prices[-1] != 0) else 0
     # --------------------------------------------
 
     # --------------------------------------------
     # Volatility
-    stdevTrade = statistics.stdev(prices[:16])
-    stdevMonth = statistics.stdev(prices[:22])
-    stdevTrend = statistics.stdev(prices[:64])
+    stdevTrade = float(prices[:16].std(ddof=1))
+    stdevMonth = float(prices[:22].std(ddof=1))
+    stdevTrend = float(prices[:64].std(ddof=1))
     volTrade = current_price * (stdevTrade / current_price) * (math.sqrt(1/16)) if (current_price != 0) else 0
     volMonth = current_price * (stdevMonth / current_price) * (math.sqrt(1/22)) if (current_price != 0) else 0
     volTrend = current_price * (stdevTrend / current_price) * (math.sqrt(1/64)) if (current_price != 0) else 0
@@ -2,13 +2,13 @@ import django
 from django.apps import apps
 from dotenv import load_dotenv
 import json
-import time
 import sys
 import redis
 import progressbar
 from datetime import date
 from ..functions import *
 from ...redisdb.controller import rdb_save_stock
+from ...redisdb.connection import rdb_pipeline
 from ...core.functions import chunks, dataSanityCheck
 from ...core.api.historical import getHistoricalEarnings
 from ...core.api.batch import quoteStatsBatchRequest
@@ -39,7 +39,7 @@ with progressbar.ProgressBar(max_value=chunks_length, prefix='Batch: ', redirect
     for i, chunk in enumerate(chunked_tickers):
 
         bar.update(i)
-        time.sleep(1)        
+        pipe = rdb_pipeline()
         batch = quoteStatsBatchRequest(chunk)
 
         for ticker, stockinfo in batch.items():
@@ -80,12 +80,8 @@ with progressbar.ProgressBar(max_value=chunks_length, prefix='Batch: ', redirect
                     }
 
                     if (rdb == True):
-                        try:
-                            rdb_save_stock(ticker, keyStats)
-                            stocksaved += 1
-                        except redis.exceptions.ConnectionError:
-                            rdb = False
-                            print('Redis not connected. Not saving.')
+                        rdb_save_stock(ticker, keyStats, pipe)
+                        stocksaved += 1
 
                     if ((fromHigh < 105) and (fromHigh > 95)):
                         if (changeToday > 10):
@@ -118,6 +114,14 @@ with progressbar.ProgressBar(max_value=chunks_length, prefix='Batch: ', redirect
                                         print('{} saved to Watchlist'.format(ticker))
                                         results.append(stockData)
 
+        if (rdb == True):
+            # One round trip for every stock the batch saved
+            try:
+                pipe.execute()
+            except redis.exceptions.ConnectionError:
+                rdb = False
+                print('Redis not connected. Not saving.')
+
 if results:
     print('Total scanned: '+str(len(tickers)))
     print('Stocks saved: '+str(stocksaved))
@@ -5,12 +5,12 @@ import json
 import sys
 import progressbar
 from datetime import date
-import time
 import redis
 from ..redisdb.controller import rdb_save_stock
-from ..core.functions import chunks, dataSanityCheck
+from ..redisdb.connection import rdb_pipeline
+from ..core.functions import dataSanityCheck
 from ..core.api.stats import getPriceTarget
-from ..core.api.batch import quoteStatsBatchRequest
+from ..core.api.batch import quoteStatsBatchRequest, iter_batches
 from ..core.output import printTable, printFullTable, writeCSV
 from ..fintwit.tweet import send_tweet
 load_dotenv()
@@ -28,15 +28,14 @@ def chase_trends(pennies=False):
     results = []
     tickers = Stock.objects.all().values_list('ticker', flat=True)
 
-    chunked_tickers = chunks(tickers, 100)
     chunks_length = int(len(tickers) / 100)
 
     with progressbar.ProgressBar(max_value=chunks_length, prefix='Batch: ', redirect_stdout=True) as bar:
-        for i, chunk in enumerate(chunked_tickers):
+        # Batches are fetched concurrently and filtered as they arrive
+        for i, batch in enumerate(iter_batches(quoteStatsBatchRequest, tickers)):
 
             bar.update(i)
-            time.sleep(1)
-            batch = quoteStatsBatchRequest(chunk)
+            pipe = rdb_pipeline()
             
             for ticker, stockinfo in batch.items():
 
@@ -78,12 +77,8 @@ def chase_trends(pennies=False):
                         }
 
                         if (rdb == True):
-                            try:
-                                rdb_save_stock(ticker, keyStats)
-                                stocksaved += 1
-                            except redis.exceptions.ConnectionError:
-                                rdb = False
-                                print('Redis not connected. Not saving.')
+                            rdb_save_stock(ticker, keyStats, pipe)
+                            stocksaved += 1
 
                         rnge = (price > 5)
                         if (pennies):
@@ -105,7 +100,7 @@ def chase_trends(pennies=False):
                                         }
 
                                         if (rdb == True):
-                                            rdb_save_stock(ticker, trend_data)
+                                            rdb_save_stock(ticker, trend_data, pipe)
 
                                         keyStats.update({
                                             'highPriceTarget': highPriceTarget,
@@ -136,6 +131,14 @@ def chase_trends(pennies=False):
 
                                         results.append(stockData)
 
+            if (rdb == True):
+                # One round trip for every stock the batch saved
+                try:
+                    pipe.execute()
+                except redis.exceptions.ConnectionError:
+                    rdb = False
+                    print('Redis not connected. Not saving.')
+
     if results:
         print('Total scanned: '+str(len(tickers)))
         print('Stocks saved: '+str(stocksaved))
@@ -2,6 +2,7 @@ import django
 from django.apps import apps
 from ..core.api.stats import getCurrentPrice
 from ..core.api.sync import syncPrices
+from ..redisdb.controller import rdb_fetch_prices
 import colored
 from colored import stylize
 import redis
@@ -49,13 +50,13 @@ def getPennyStocks(tickersOnly=True, refresh_prices=False):
 
     Stock = apps.get_model('database', 'Stock')
     stocks = Stock.objects.all()
-    r = redis.Redis(host='localhost', port=6379, db=0, charset="utf-8", decode_responses=True)
+    prices = rdb_fetch_prices(stock.ticker for stock in stocks)
     pennystocks = []
 
     for stock in stocks:
-        price = r.get('stock-'+stock.ticker+'-price')
+        price = prices.get(stock.ticker)
         if (price):
-            if (float(price) < 4):
+            if (price < 4):
                 if (tickersOnly):
                     pennystocks.append(stock.ticker)
                 else:
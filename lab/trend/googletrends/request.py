@@ -5,7 +5,8 @@ from ...core.output import printStockResults
 import colored
 from colored import stylize
 import time
-import redis
+from ...redisdb.connection import rdb_connection
+from ...redisdb.controller import stock_key
 import json
 import sys
 
@@ -17,7 +18,7 @@ def stock_search_trends(rescan=False):
     going to make and the unpredictability of Google's rate limits. To ensure we keep Google happy. 
     """
     tickers = getPennyStocks()
-    r = redis.Redis(host='localhost', port=6379, db=0, charset="utf-8", decode_responses=True)
+    r = rdb_connection()
 
     if (rescan):
         pytrends = TrendReq(hl='en-US', tz=360)
@@ -38,11 +39,11 @@ def stock_search_trends(rescan=False):
     recent_interest = []
     for t in tickers:
         rdb_data = r.get('trends-'+t+'-interest')
-        price = r.get('stock-'+t+'-price')
+        price = r.hget(stock_key(t), 'price')
         if (rdb_data):
             searches = json.loads(rdb_data)
             if (list(searches.values())[-1] == 100):
-                if (float(price) > 0.5):
+                if (price and float(price) > 0.5):
                     recent_interest.append(t)
 
     printStockResults(recent_interest)
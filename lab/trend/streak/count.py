@@ -2,18 +2,17 @@ import statistics
 import json
 import sys
 from .functions import *
-from ...core.functions import extract_data
-from ...core.api.historical import getHistoricalData
+from ...core.functions import Columns
+from ...core.warehouse import getWarehouseData
 import numpy as np
 from tabulate import tabulate
 
 
 
 def count_streak(ticker):
-    asset_data = list(reversed(getHistoricalData(ticker, '1y', True)))
+    asset_data = list(reversed(getWarehouseData(ticker, '1y', True)))
 
-    prices = extract_data(asset_data, 'close')
-    dates = extract_data(asset_data, 'date')
+    prices = Columns(asset_data).values('close')
     
     upStreaks, downStreaks = longestStretch(asset_data)
     trend_data = trendAnalysis(prices[:64])
@@ -0,0 +1,147 @@
+import django
+from django.apps import apps
+from dotenv import load_dotenv
+from datetime import datetime
+import colored
+from colored import stylize
+import numpy as np
+import time
+from ..core.ticks import TickBuffers
+from ..core.api.stream import quote_stream, replay_stream
+from ..core.output import printFullTable
+load_dotenv()
+django.setup()
+
+# Continuous versions of the snapshot scanners. Quotes stream into per ticker ring buffers, (see core/ticks.py),
+# and after every event the filters are evaluated on the tickers it updated, as arrays.
+
+QUOTE_FIELDS = {
+    'price': 'latestPrice',
+    'volume': 'volume',
+    'changePercent': 'changePercent',
+    'previousVolume': 'previousVolume',
+    'avgTotalVolume': 'avgTotalVolume',
+    'week52High': 'week52High',
+}
+
+
+def chase_filter(buffers, rows, lookback=60):
+    """
+    volume:chase rules: above $10, up 5% on the day on 3x yesterday's volume, within 20% of the 52 week high.
+    """
+    price = buffers.latest('price', rows)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fromHigh = price / buffers.latest('week52High', rows) * 100
+        return (
+            (price > 10)
+            & (buffers.latest('changePercent', rows) * 100 > 5)
+            & (buffers.latest('volume', rows) / buffers.latest('previousVolume', rows) > 3)
+            & (fromHigh > 80) & (fromHigh < 100)
+        )
+
+
+def anomaly_filter(buffers, rows, lookback=60):
+    """
+    volume:anomaly rule: volume over 50x normal, (the 30 day average).
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return buffers.latest('volume', rows) / buffers.latest('avgTotalVolume', rows) > 50
+
+
+def burst_filter(buffers, rows, lookback=60):
+    """
+    Intraday burst: price up 2% over the last `lookback` buffered ticks, (or all of them while the buffer fills).
+    """
+    ticks = np.minimum(buffers.counts[rows] - 1, min(lookback, buffers.capacity - 1))
+    before = buffers.back('price', ticks, rows)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (ticks > 0) & ((buffers.latest('price', rows) - before) / before * 100 > 2)
+
+
+FILTERS = {
+    'chase': chase_filter,
+    'anomaly': anomaly_filter,
+    'burst': burst_filter,
+}
+
+
+def stream_scan(tickers=None, filters=['chase', 'anomaly', 'burst'], channel='stocksUS5Second', replay=None, speed=0,
+                record=None, capacity=512, lookback=60, cooldown=900, sandbox=False):
+    """
+    Long running scanner. Streams quotes, (or replays a recorded stream), into ring buffers and prints each ticker that
+    passes a filter as soon as the quote that made it pass arrives.
+
+    Parameters
+    ----------
+    tickers     :list
+                 defaults to every Stock
+    filters     :list
+                 keys of FILTERS
+    channel     :str
+                 IEX SSE channel, (see quote_stream())
+    replay      :str
+                 path of a recorded stream to replay instead of connecting
+    speed       :float
+                 replay pace, (see replay_stream())
+    record      :str
+                 path to record the live stream to
+    capacity    :int
+                 ticks buffered per ticker
+    lookback    :int
+                 ticks the burst filter looks back
+    cooldown    :int
+                 seconds before a ticker can trigger the same filter again
+
+    Returns
+    -------
+    list of dicts
+        every alert, when the stream ends or is interrupted
+    """
+    if (tickers is None and not replay):
+        Stock = apps.get_model('database', 'Stock')
+        tickers = list(Stock.objects.all().values_list('ticker', flat=True))
+
+    buffers = TickBuffers(list(QUOTE_FIELDS.keys()), capacity, tickers if (tickers) else [])
+    source = replay_stream(replay, speed) if (replay) else quote_stream(tickers, channel, sandbox, record)
+    alerted = {}
+    alerts = []
+
+    print('Streaming...')
+    try:
+        for event in source:
+            rows = []
+            for quote in event:
+                if (not quote.get('symbol')):
+                    continue
+                values = {field: quote.get(key) for field, key in QUOTE_FIELDS.items()}
+                rows.append(buffers.push(quote['symbol'], quote.get('latestUpdate') or int(time.time() * 1000), **values))
+            if (not rows):
+                continue
+
+            rows = np.unique(rows)
+            tickers = buffers.tickers()
+            for name in filters:
+                for row in rows[FILTERS[name](buffers, rows, lookback)]:
+                    ticker = tickers[row]
+                    now = buffers.latest('time', [row])[0] / 1000
+                    if (now - alerted.get((name, ticker), -cooldown) < cooldown):
+                        continue
+                    alerted[(name, ticker)] = now
+
+                    alert = {
+                        'time': datetime.fromtimestamp(now).strftime('%H:%M:%S'),
+                        'filter': name,
+                        'ticker': ticker,
+                        'price': float(buffers.latest('price', [row])[0]),
+                        'changeToday': "{}%".format(round(buffers.latest('changePercent', [row])[0] * 100, 2)),
+                        'volume': "{}K".format(round(buffers.latest('volume', [row])[0] / 1000, 2)),
+                    }
+                    alerts.append(alert)
+                    print(stylize('{time} {filter}: {ticker} {price} {changeToday} {volume}'.format(**alert), colored.fg('green')))
+    except KeyboardInterrupt:
+        pass
+
+    if (alerts):
+        printFullTable(alerts, struct='dictlist')
+
+    return alerts
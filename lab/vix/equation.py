@@ -44,6 +44,9 @@ def vix_equation(ticker, sendtweet=False, debug=False, dummyData=False):
 
     # Step 1: Fetch the option chain for the ticker.
     chain = collectOptionChain(ticker, dummyData)
+    if (not len(chain['strike'])):
+        print(stylize("Option chain could not be fetched.", colored.fg("red")))
+        sys.exit()
 
     # Step 2
     # Find the proper "near-term" and "next-term" option expirations to be used to find Forward Level.
@@ -10,6 +10,7 @@ import colored
 from colored import stylize
 from dateutil.relativedelta import relativedelta
 from ..core.api.options import *
+from ..core.api.chains import getChainTable, normalize_chain
 import pandas as pd
 import numpy as np
 import calendar
@@ -26,57 +27,75 @@ def collectOptionChain(ticker, dummyData):
     toDate = datetime.datetime(three_months_away.year, three_months_away.month, three_months_away_days)
     timeRange = [fromDate, toDate]
 
-    """ Step 1: Fetch the option chain from TD Ameritrade """
+    """ Step 1: Fetch the option chain from TD Ameritrade, flattened into columns, (see core/api/chains.py) """
 
     if (dummyData):
         # Test Data
         JSON = 'lab/vix/sample_response/response.json'
         with open(JSON) as jsonfile:
             chain = json.loads(jsonfile.read())
-            return chain
+            return normalize_chain(chain, ticker.upper())
 
-    chain = getOptionChainTD(ticker, timeRange)
-    return chain
+    return getChainTable(ticker, timeRange)
+
+
+def contract_strikes(table, rows):
+    """
+    Contracts of one side and expiration of a chain table as {strike: [contract]}, lowest strike first, (the shape
+    of a TD expiration's strike map, with the strike as a float).
+    """
+    strikes = {}
+    for row in rows[np.argsort(table['strike'][rows], kind='stable')]:
+        strikes[float(table['strike'][row])] = [{
+            'strikePrice': float(table['strike'][row]),
+            'bid': float(table['bid'][row]),
+            'ask': float(table['ask'][row]),
+            'last': float(table['last'][row]),
+            'mark': float(table['mark'][row]),
+        }]
+
+    return strikes
 
 
 def selectOptionExpirations(chain):
     """
-    1. Fetches all option expiration dates from IEX api. 
+    1. Groups the chain table's contracts by side and expiration.
     2. Finds this month's expiration and next months expiration (the near-term and next-term expirations).
     3. Calculates and returns a dict containing the near-term and next-term expiration dates, along with the 
     option chain for those dates. 
     """
 
-    if (chain):
+    if (len(chain['strike'])):
         today = datetime.datetime.now()
 
         # Our container for collecting our near-term/next-term options
-        options = {}
+        options = {
+            'callExpDateMap': {},
+            'putExpDateMap': {},
+        }
 
         """ Step 2: Finding this month's and next month's closest option expiration dates. """
-        for optionSide in ['callExpDateMap', 'putExpDateMap']:
-            for expir, strikes in chain[optionSide].items():  # Looping each side of the option chain
-
-                if (optionSide not in options):
-                    options[optionSide] = {}
-
-                expDate = datetime.datetime.strptime(expir.split(':')[0], '%Y-%m-%d')  # Option expiration date object
-                # Just grabbing the first strike row in the chain because TD has specific information on
-                # this nested level of the dict. I can get the precise expiration from any strike.
-                firstStrike = next(iter(strikes.values()))[0]
-                daysToExpiration = int(firstStrike['daysToExpiration'])
-                preciseExpiration = int(firstStrike['expirationDate'])  # Getting precise expiration
-
-                if (daysToExpiration > 7):  # Must be at least 7 days from expiration.
-                    options[optionSide][preciseExpiration] = {
-                        'dateInfo': {
-                            'expDate': expDate,
-                            'month': expDate.month,
-                            'preciseExpiration': preciseExpiration,
-                            'daysToExpiration': daysToExpiration,
-                        },                        
-                        'strikes': strikes
-                    }
+        # Must be at least 7 days from expiration.
+        rows = np.flatnonzero(chain['dte'] > 7)
+        # Precise expiration in ms, midnight of the expiry date where TD left it out, (-1)
+        precise = np.where(
+            chain['expiration'] >= 0, chain['expiration'], chain['expiry'].astype('datetime64[ms]').astype(np.int64))
+        for side, optionSide in [('C', 'callExpDateMap'), ('P', 'putExpDateMap')]:
+            sideRows = rows[chain['side'][rows] == side]
+            for expiry in np.unique(chain['expiry'][sideRows]):
+                expRows = sideRows[chain['expiry'][sideRows] == expiry]
+                expDate = datetime.datetime.combine(expiry.astype(datetime.date), datetime.time())
+                preciseExpiration = int(precise[expRows[0]])
+
+                options[optionSide][preciseExpiration] = {
+                    'dateInfo': {
+                        'expDate': expDate,
+                        'month': expDate.month,
+                        'preciseExpiration': preciseExpiration,
+                        'daysToExpiration': int(chain['dte'][expRows[0]]),
+                    },
+                    'strikes': contract_strikes(chain, expRows)
+                }
 
         """
         Step 3: Calculating the nearest option of each group of options, 
@@ -5,32 +5,29 @@ import matplotlib.dates as mdates
 from matplotlib import pylab
 import numpy as np
 from scipy import stats
-from ..core.api.historical import getHistoricalData
-from ..core.functions import chunks, extract_data
+from ..core.warehouse import getWarehouseArrays, day_strings
+from ..core.functions import chunks
 import math
 from .functions import *
 
 
 def calculateVol(ticker, ndays=30):
-    asset_data = getHistoricalData(ticker, timeframe='5y', priceOnly=True, sandbox=False)
-    prices = list(reversed(extract_data(asset_data, 'close')))
-    lreturns = log_returns(prices)
-    stdevs = rollingStDev(lreturns)
+    asset_data = getWarehouseArrays(ticker, timeframe='5y', newest=True, sandbox=False)
+    prices = asset_data['close']
+    returns = prices[:-1] / prices[1:] - 1
+    stdevs = rolling_stdevs(returns, ndays)
 
-    vol = []
-    for sd in stdevs:
-        v = math.sqrt(252) * sd
-        vol.append(v)
+    vol = math.sqrt(252) * stdevs
 
-    dates = list(reversed(extract_data(asset_data, 'date')))[:len(vol)]
+    dates = list(day_strings(asset_data['date'][:len(vol)]))
 
     print("\n")
-    print("Lifetime Vol: {}".format(statistics.mean(vol)))
-    print("3y Vol: {}".format(statistics.mean(vol[:756])))
-    print("2y Vol: {}".format(statistics.mean(vol[:504])))
-    print("1y Vol: {}".format(statistics.mean(vol[:252])))
-    print("3m Vol: {}".format(statistics.mean(vol[:64])))
-    print("1m Vol: {}".format(statistics.mean(vol[:30])))
+    print("Lifetime Vol: {}".format(vol.mean()))
+    print("3y Vol: {}".format(vol[:756].mean()))
+    print("2y Vol: {}".format(vol[:504].mean()))
+    print("1y Vol: {}".format(vol[:252].mean()))
+    print("3m Vol: {}".format(vol[:64].mean()))
+    print("1m Vol: {}".format(vol[:30].mean()))
     print("\n")
 
     return [dates, vol]
@@ -6,6 +6,7 @@ import progressbar
 from scipy import stats
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
 
 def log_returns(prices):
@@ -49,3 +50,30 @@ def rollingStDev(lst, ndays=30):
             stdevs.append(stdev)
     
     return stdevs
+
+
+def rolling_stdevs(returns, ndays=30):
+    """
+    Vectorized version of rollingStDev(), windows are views of the returns rather than copied lists.
+    Like rollingStDev(), each window holds ndays + 1 returns and the last one holds ndays.
+
+    Parameters
+    ----------
+    returns   :np.ndarray|list
+                daily returns, newest first
+    ndays     :int
+
+    Returns
+    -------
+    np.ndarray
+        sample standard deviation of each window, newest first
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    if (len(returns) < ndays):
+        return np.zeros(0)
+    if (len(returns) == ndays):
+        return np.array([returns.std(ddof=1)])
+
+    stdevs = sliding_window_view(returns, ndays + 1).std(axis=1, ddof=1)
+
+    return np.append(stdevs, returns[-ndays:].std(ddof=1))
@@ -2,7 +2,6 @@ from dotenv import load_dotenv
 import json
 import sys
 import progressbar
-import time
 from datetime import date
 from ..database.functions import dynamicUpdateCreate
 from ..core.functions import chunks, dataSanityCheck
@@ -25,7 +24,6 @@ chunks_length = int(len(tickers) / 100)
 with progressbar.ProgressBar(max_value=chunks_length, prefix='Batch: ', redirect_stdout=True) as bar:
     for i, chunk in enumerate(chunked_tickers):
         bar.update(i)
-        time.sleep(1)
         batch = batchHistoricalData(chunk, '5d', priceOnly=True)
 
         for ticker, info in batch.items():
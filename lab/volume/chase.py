@@ -5,11 +5,11 @@ import json
 import sys
 import progressbar
 import redis
-import time
 from datetime import date
 from ..redisdb.controller import rdb_save_stock
-from ..core.functions import chunks, dataSanityCheck
-from ..core.api.batch import quoteStatsBatchRequest
+from ..redisdb.connection import rdb_pipeline
+from ..core.functions import dataSanityCheck
+from ..core.api.batch import quoteStatsBatchRequest, iter_batches
 from ..core.api.stats import getPriceTarget
 from ..core.output import printFullTable, writeCSV
 from ..fintwit.tweet import send_tweet
@@ -29,15 +29,14 @@ print('Running...')
 results = []
 tickers = Stock.objects.all().values_list('ticker', flat=True)
 
-chunked_tickers = chunks(tickers, 100)
 chunks_length = int(len(tickers) / 100)
 
 with progressbar.ProgressBar(max_value=chunks_length, prefix='Batch: ', redirect_stdout=True) as bar:
-    for i, chunk in enumerate(chunked_tickers):
+    # Batches are fetched concurrently and filtered as they arrive
+    for i, batch in enumerate(iter_batches(quoteStatsBatchRequest, tickers)):
 
         bar.update(i)
-        time.sleep(1)
-        batch = quoteStatsBatchRequest(chunk)
+        pipe = rdb_pipeline()
 
         for ticker, stockinfo in batch.items():
 
@@ -79,12 +78,8 @@ with progressbar.ProgressBar(max_value=chunks_length, prefix='Batch: ', redirect
                     }
 
                     if (rdb == True):
-                        try:
-                            rdb_save_stock(ticker, keyStats)
-                            stocksaved += 1
-                        except redis.exceptions.ConnectionError:
-                            rdb = False
-                            print('Redis not connected. Not saving.')
+                        rdb_save_stock(ticker, keyStats, pipe)
+                        stocksaved += 1
 
                     if ((fromHigh < 100) and (fromHigh > 80)):
                         if (changeToday > 5):
@@ -133,6 +128,14 @@ with progressbar.ProgressBar(max_value=chunks_length, prefix='Batch: ', redirect
 
                                 results.append(stockData)
 
+        if (rdb == True):
+            # One round trip for every stock the batch saved
+            try:
+                pipe.execute()
+            except redis.exceptions.ConnectionError:
+                rdb = False
+                print('Redis not connected. Not saving.')
+
 
 if results:
     print('Total scanned: '+str(len(tickers)))
@@ -5,8 +5,8 @@ import redis
 import time
 from datetime import date
 from ..redisdb.controller import rdb_save_stock
-from ..core.functions import extract_data
-from ..core.api.historical import getHistoricalData
+from ..core.functions import Columns
+from ..core.warehouse import getWarehouseData
 from ..core.output import printFullTable, writeCSV
 import matplotlib
 import matplotlib.pyplot as plt
@@ -16,13 +16,11 @@ import numpy as np
 load_dotenv()
 
 def graph_volume(ticker, timeframe='3m', sandbox=False):
-    hdata = getHistoricalData(ticker, timeframe=timeframe, priceOnly=True, sandbox=sandbox)
-    prices = extract_data(hdata, 'close')
-    volumes = []
-    for hd in hdata:
-        volumes.append(hd['volume'] / 1000)
+    hdata = getWarehouseData(ticker, timeframe=timeframe, priceOnly=True, sandbox=sandbox)
+    columns = Columns(hdata)
+    volumes = columns['volume'] / 1000
 
-    dates = extract_data(hdata, 'date')
+    dates = columns['date']
 
     fig = plt.subplots(figsize=(12, 7))
 
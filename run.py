@@ -20,7 +20,12 @@ def list_commands():
         ['macro:trends [timeframe=1m] [gain=20]', 'Scans all ETFs and returns the ETFs with the performance above an int (gain) within a timerange (5d, 1m, 3m, 1y)'],
         ['macro:gainers', 'Scans all ETFs and returns ETFs with highest day change.'],
         ['news:scrape [query=insert+string]', 'Searches a query and searches first 10 articles for stocks mentioned in article'],
-        ['hurst [<ticker>] [timeframe=1y]', 'Runs a rescaled range analysis on a ticker. Output defaults to table.'],
+        ['hurst [<ticker>] [timeframe=1y] [estimator=rs] [--nocache]', 'Runs a rescaled range analysis on a ticker. Output defaults to table. Estimators: rs, dfa, variogram, madogram, aggvar, wavelet. Results are cached for the day.'],
+        ['hurst:scan [universe=stocks] [timeframe=1y] [workers=] [top=25] [estimator=rs]', 'Runs a rescaled range analysis on every ticker in a universe (stocks, etfs or a csv in core/storage/stocks) and ranks the results.'],
+        ['hurst:rolling [<ticker>] [timeframe=5y] [window=252]', 'Hurst exponent of every trailing window, stepped daily.'],
+        ['hurst:screen [min=0.65] [days=7] [section=fullSeries] [timeframe=] [estimator=rs]', 'Tickers whose stored hurst exponent was above min in the last n days, (from hurst and hurst:scan runs).'],
+        ['hurst:sweep [<ticker>] [timeframe=1y]', 'Hurst exponent of one price series under many exponential and linear scale schemes, best regression fit first.'],
+        ['hurst:benchmark [sizes=1000,10000,100000,1000000] [hurst=0.7]', 'Offline benchmark of the hurst hot path and estimator bias on synthetic fractional brownian motion.'],
         ['range [<ticker>] [tweet]', 'Runs a volatility range analysis on a ticker.'],
         ['reddit:scrape', 'Scrapes r/wallstreetbets for most talked-about stocks.'],
         ['historicalprices:get [<ticker>]', 'Fetches historical prices for a ticker and saves them to db.'],
@@ -31,6 +36,7 @@ def list_commands():
         ['trend:search [string=]', 'Scans stocks with string in stock name and looks for gainers'],
         ['trend:earnings', 'Scans all stocks and returns todays gainers who have consistently good earnings.'],
         ['trend:streak [<ticker>]', 'Determines the current winning/losing streak for a ticker'],
+        ['trend:stream [tickers=] [filters=chase,anomaly,burst] [channel=stocksUS5Second] [replay=] [speed=0] [record=]', 'Streams quotes and runs the chase, volume anomaly and intraday burst filters continuously. Can record the stream and replay it.'],
         ['trend:gainers', 'Grabs todays gainers and checks their earnings.'],
         ['trend:google', 'Searches google trends for search query interest'],
         ['pricedingold [<ticker>][timespan=5y][test=False]', 'Graphs and assets price in gold.'],
@@ -40,8 +46,11 @@ def list_commands():
         ['volume:graph [<ticker>][timeframe=3m][sandbox=false]', 'Scans all stocks and returns stocks who are accumulating extremely high volume over the last week. Finds market singularities.'],
         ['vix [<ticker>]', 'Runs the VIX volatility equation on a ticker'],
         ['output:last', 'Returns the last cached output, can resort by specific key.'],
-        ['rdb:export', 'Exports redisdb to zipped json file'],
-        ['rdb:import', 'Import redisdb from a zipped json file'],
+        ['mock:serve [port=8765] [latency=0] [jitter=0] [errors=0] [rate=0] [universe=8000]', 'Local stand-in for the IEX and TD endpoints, (recorded responses or synthetic data). Use with API_MOCK_URL.'],
+        ['mock:bench [universe=8000] [types=quote,stats] [latency=0] [jitter=0] [errors=0] [rate=0]', 'Benchmarks a full universe batch scan against the mock server.'],
+        ['rdb:export', 'Exports redisdb to gzipped NDJSON, (lab/redisdb/export/rdb_export.ndjson.gz)'],
+        ['rdb:import', 'Import redisdb from gzipped NDJSON, (lab/redisdb/imports/rdb_export.ndjson.gz), old .zip backups are no longer read'],
+        ['rdb:migrate', 'Migrates redisdb to the current schema version'],
     ]
     printTabs(commands, headers, 'simple')
     print('\n\n')
@@ -231,12 +240,134 @@ def pricedingold_controller(args):
     ))
 
 
-def hurst_controller(args):
+def hurst_controller(subroutine, args=None):
+    if (args is None):
+        # hurst [<ticker>] has no subroutine
+        args = subroutine
+        subroutine = None
+
+    if (subroutine == 'scan'):
+        opt = {
+            'universe': {'type': str, 'default': 'stocks'},
+            'timeframe': {'type': str, 'default': '1y'},
+            'workers': {'type': int, 'default': None},
+            'top': {'type': int, 'default': 25},
+            'estimator': {'type': str, 'default': 'rs'},
+        }
+        params = parse_args(args, opt=opt)
+
+        from lab.hurst.estimators import ESTIMATORS
+        estimator = params['estimator'] if ('estimator' in params) else opt['estimator']['default']
+        if (estimator not in ESTIMATORS):
+            print(stylize('Unknown estimator. Choose from: '+', '.join(ESTIMATORS.keys()), colored.fg('red')))
+            return
+
+        from lab.hurst.scan import hurst_scan
+
+        hurst_scan(
+            universe=params['universe'] if ('universe' in params) else opt['universe']['default'],
+            timeframe=params['timeframe'] if ('timeframe' in params) else opt['timeframe']['default'],
+            workers=params['workers'] if ('workers' in params) else opt['workers']['default'],
+            top=params['top'] if ('top' in params) else opt['top']['default'],
+            estimator=estimator,
+        )
+        return
+
+    if (subroutine == 'benchmark'):
+        opt = {
+            'sizes': {'type': str, 'default': '1000,10000,100000,1000000'},
+            'hurst': {'type': str, 'default': '0.7'},
+            'repeat': {'type': int, 'default': 3},
+            'samples': {'type': int, 'default': 10},
+        }
+        params = parse_args(args, opt=opt)
+
+        from lab.hurst.benchmark import run_benchmarks
+
+        run_benchmarks(
+            sizes=[int(size) for size in (params['sizes'] if ('sizes' in params) else opt['sizes']['default']).split(',')],
+            hurst=float(params['hurst'] if ('hurst' in params) else opt['hurst']['default']),
+            repeat=params['repeat'] if ('repeat' in params) else opt['repeat']['default'],
+            samples=params['samples'] if ('samples' in params) else opt['samples']['default'],
+        )
+        return
+
+    if (subroutine == 'sweep'):
+        required = {'ticker': {'pos': 0, 'type': str}}
+        opt = {
+            'timeframe': {'type': str, 'default': '1y'},
+        }
+
+        if (not args):
+            command_error(required, opt)
+            return
+
+        from lab.hurst.sweep import sweep_calculator
+        params = parse_args(args, required, opt)
+
+        sweep_calculator(
+            params['ticker'],
+            timeframe=params['timeframe'] if ('timeframe' in params) else opt['timeframe']['default'],
+        )
+        return
+
+    if (subroutine == 'screen'):
+        opt = {
+            'min': {'type': str, 'default': '0.65'},
+            'days': {'type': int, 'default': 7},
+            'section': {'type': str, 'default': 'fullSeries'},
+            'timeframe': {'type': str, 'default': None},
+            'estimator': {'type': str, 'default': 'rs'},
+        }
+        params = parse_args(args, opt=opt)
+
+        from lab.hurst.store import hurst_screen
+
+        results = hurst_screen(
+            minimum=float(params['min'] if ('min' in params) else opt['min']['default']),
+            days=params['days'] if ('days' in params) else opt['days']['default'],
+            section=params['section'] if ('section' in params) else opt['section']['default'],
+            timeframe=params['timeframe'] if ('timeframe' in params) else opt['timeframe']['default'],
+            estimator=params['estimator'] if ('estimator' in params) else opt['estimator']['default'],
+        )
+        if (results):
+            printFullTable(results, struct='dictlist')
+        else:
+            print('No results')
+        return
+
+    if (subroutine == 'rolling'):
+        required = {'ticker': {'pos': 0, 'type': str}}
+        opt = {
+            'timeframe': {'type': str, 'default': '5y'},
+            'window': {'type': int, 'default': 252},
+        }
+
+        if (not args):
+            command_error(required, opt)
+            return
+
+        from lab.hurst.rolling import rolling_calculator
+        params = parse_args(args, required, opt)
+
+        print(rolling_calculator(
+            params['ticker'],
+            timeframe=params['timeframe'] if ('timeframe' in params) else opt['timeframe']['default'],
+            window=params['window'] if ('window' in params) else opt['window']['default'],
+        ))
+        return
+
+    if (subroutine):
+        command_error()
+        return
+
     required = {'ticker': {'pos': 0, 'type': str}}
     opt = {
         'timeframe': {'type': str, 'default': '1y'},
         'output': {'type': str, 'default': 'table'},
-        '--tweet': {'type': bool, 'default': False}
+        'estimator': {'type': str, 'default': 'rs'},
+        '--tweet': {'type': bool, 'default': False},
+        '--nocache': {'type': bool, 'default': False}
     }
 
     if (not args):
@@ -251,9 +382,38 @@ def hurst_controller(args):
         output=params['output'] if ('output' in params) else opt['output']['default'],
         timeframe=params['timeframe'] if ('timeframe' in params) else opt['timeframe']['default'],
         sendtweet=params['tweet'] if ('tweet' in params) else opt['--tweet']['default'],
+        estimator=params['estimator'] if ('estimator' in params) else opt['estimator']['default'],
+        cache=not (params['nocache'] if ('nocache' in params) else opt['--nocache']['default']),
     ))
 
 
+def mock_controller(subroutine, args=[]):
+    opt = {
+        'port': {'type': int, 'default': 8765},
+        'universe': {'type': int, 'default': 8000},
+        'types': {'type': str, 'default': 'quote,stats'},
+        'latency': {'type': str, 'default': '0'},
+        'jitter': {'type': str, 'default': '0'},
+        'errors': {'type': str, 'default': '0'},
+        'rate': {'type': str, 'default': '0'},
+    }
+    params = parse_args(args, opt=opt)
+    options = {
+        'latency': float(params['latency'] if ('latency' in params) else opt['latency']['default']),
+        'jitter': float(params['jitter'] if ('jitter' in params) else opt['jitter']['default']),
+        'errors': float(params['errors'] if ('errors' in params) else opt['errors']['default']),
+        'rate': float(params['rate'] if ('rate' in params) else opt['rate']['default']),
+        'universe': params['universe'] if ('universe' in params) else opt['universe']['default'],
+    }
+
+    if (subroutine == 'serve'):
+        from lab.core.api.mock import serve_mock
+        serve_mock(port=params['port'] if ('port' in params) else opt['port']['default'], **options)
+    if (subroutine == 'bench'):
+        from lab.core.api.mock import benchmark_scan
+        benchmark_scan(types=params['types'] if ('types' in params) else opt['types']['default'], **options)
+
+
 def rdb_controller(subroutine, args=[]):
     if (subroutine == 'export'):
         from lab.redisdb.export import export_rdb
@@ -261,6 +421,9 @@ def rdb_controller(subroutine, args=[]):
     if (subroutine == 'import'):
         from lab.redisdb.imports import import_rdb
         import_rdb()
+    if (subroutine == 'migrate'):
+        from lab.redisdb.migrate import migrate_rdb
+        migrate_rdb()
 
 
 def range_controller(args):
@@ -340,6 +503,30 @@ def trend_controller(subroutine, args):
         ))
         return
 
+    if (subroutine == 'stream'):
+        opt = {
+            'tickers': {'type': str, 'default': None},
+            'filters': {'type': str, 'default': 'chase,anomaly,burst'},
+            'channel': {'type': str, 'default': 'stocksUS5Second'},
+            'replay': {'type': str, 'default': None},
+            'speed': {'type': str, 'default': '0'},
+            'record': {'type': str, 'default': None},
+        }
+        params = parse_args(args, opt=opt)
+
+        from lab.trend.stream import stream_scan
+
+        tickers = params['tickers'] if ('tickers' in params) else opt['tickers']['default']
+        stream_scan(
+            tickers=tickers.upper().split(',') if (tickers) else None,
+            filters=(params['filters'] if ('filters' in params) else opt['filters']['default']).split(','),
+            channel=params['channel'] if ('channel' in params) else opt['channel']['default'],
+            replay=params['replay'] if ('replay' in params) else opt['replay']['default'],
+            speed=float(params['speed'] if ('speed' in params) else opt['speed']['default']),
+            record=params['record'] if ('record' in params) else opt['record']['default'],
+        )
+        return
+
     if (subroutine == 'earnings'):
         import lab.trend.chase.earnings
         return